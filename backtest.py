@@ -0,0 +1,134 @@
+"""
+과거 캔들 백테스트.
+
+기준 시간대(TIMEFRAME_CONFIG 중 가장 짧은 시간대) 캔들 이력을 재생하며 실제 결정 서비스(CandleAnalysisService)와
+ActionService/ActionRepo의 DCA/수수료 계산으로 페이퍼 트레이딩하고, 손익/최대 낙폭/거래 수/처리 속도를 JSON으로 출력합니다.
+상위 시간대 캔들은 기준 캔들로 집계하므로 기준 시간대 이력만 있으면 됩니다. (services.backtest_service 참고)
+
+캔들 이력:
+    --candle-store: 캔들 저장소(SQLite)에 기록된 기준 시간대 캔들
+    --fetch-days: Upbit에서 최근 N일의 기준 시간대 캔들을 받아 사용 (--candle-store가 있으면 저장도 함)
+    --synthetic-days: N일 분량의 합성 랜덤 워크 캔들 (네트워크 없이 처리 속도 확인용)
+
+사용법:
+    python backtest.py --synthetic-days 365
+    python backtest.py --market KRW-BTC --fetch-days 365 --candle-store ./candles.db
+    python backtest.py --market KRW-BTC --candle-store ./candles.db --strict --timeframes '{"5m": 125, "1h": 125}'
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from array import array
+
+from dtos.candle_series import CandleSeries
+from services.backtest_service import BacktestService
+from services.candle_analysis_service import CandleAnalysisService
+
+DEFAULT_TIMEFRAME_CONFIG = '{"5m": 125, "4h": 125}'
+
+def make_random_walk_series(market: str, minutes: int, count: int, rng: random.Random) -> CandleSeries:
+    """count개의 합성 랜덤 워크 캔들 (과거 순, 오늘 0시(UTC)에 끝남). 추세 구간이 생기도록 변동성과 기울기를 가끔 바꿈"""
+    columns = [array(CandleSeries.TIME_TYPECODE)] + [array(CandleSeries.VALUE_TYPECODE) for _ in range(5)]
+    times, opens, highs, lows, closes, volumes = columns
+    step = minutes * 60
+    start = int(time.time()) // 86400 * 86400 - count * step
+    price, drift, volatility = 120_000_000.0, 0.0, 0.002
+    for i in range(count):
+        if i % 500 == 0:
+            drift, volatility = rng.gauss(0, 0.0004), rng.uniform(0.001, 0.004)
+        open_price = price
+        close_price = max(1000.0, round(open_price * math.exp(rng.gauss(drift, volatility)), -3))
+        times.append(start + i * step)
+        opens.append(open_price)
+        highs.append(max(open_price, close_price) + rng.randint(0, 20) * 1000.0)
+        lows.append(min(open_price, close_price) - rng.randint(0, 20) * 1000.0)
+        closes.append(close_price)
+        volumes.append(round(rng.uniform(0.5, 80), 8))
+        price = close_price
+    return CandleSeries(market, *columns)
+
+async def fetch_series(market: str, timeframe: str, count: int) -> CandleSeries:
+    """Upbit에서 최근 count개의 마감 캔들을 받습니다."""
+    from clients.upbit_client import UpbitClient
+
+    client = UpbitClient(market)
+    try:
+        series = await client.fetch_candles(market, timeframe, count + 1)
+    finally:
+        await client.close()
+    return series.closed(count)
+
+def load_series(args, timeframe: str, minutes: int) -> CandleSeries:
+    per_day = 24 * 60 // minutes
+    if args.synthetic_days:
+        return make_random_walk_series(args.market, minutes, args.synthetic_days * per_day, random.Random(args.seed))
+
+    if args.fetch_days:
+        series = asyncio.run(fetch_series(args.market, timeframe, args.fetch_days * per_day))
+        if args.candle_store:
+            from repos.candle_repo import CandleRepo
+
+            repo = CandleRepo(args.candle_store, retention=max(len(series), CandleRepo.DEFAULT_RETENTION))
+            repo.save(args.market, timeframe, series)
+            repo.close()
+        return series
+
+    if args.candle_store:
+        from repos.candle_repo import CandleRepo
+
+        repo = CandleRepo(args.candle_store)
+        series = repo.get_latest_series(args.market, timeframe, sys.maxsize)
+        repo.close()
+        return series
+
+    raise SystemExit("캔들 이력이 필요합니다: --candle-store, --fetch-days 또는 --synthetic-days")
+
+def main():
+    parser = argparse.ArgumentParser(description="과거 캔들로 실제 결정/매매 경로를 재생하는 백테스트")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--timeframes", default=DEFAULT_TIMEFRAME_CONFIG, help="TIMEFRAME_CONFIG와 같은 JSON (시간대 -> 캔들 수)")
+    parser.add_argument("--candle-store", help="캔들 저장소(SQLite) 경로")
+    parser.add_argument("--fetch-days", type=int, help="Upbit에서 받을 최근 일수")
+    parser.add_argument("--synthetic-days", type=int, help="합성 캔들 일수")
+    parser.add_argument("--seed", type=int, default=7, help="합성 캔들 시드")
+    parser.add_argument("--dca", type=float, default=1.0, help="매수 시 사용할 잔고 비율(%%). DCA 환경 변수와 같음")
+    parser.add_argument("--balance", type=int, default=BacktestService.DEFAULT_INITIAL_BALANCE, help="초기 잔고(KRW)")
+    parser.add_argument("--strict", action="store_true", help="CandleAnalysisService strict 모드")
+    parser.add_argument("--tenkan", type=int, default=CandleAnalysisService.DEFAULT_TENKAN_PERIOD)
+    parser.add_argument("--kijun", type=int, default=CandleAnalysisService.DEFAULT_KIJUN_PERIOD)
+    parser.add_argument("--senkou-b", type=int, default=CandleAnalysisService.DEFAULT_SENKOU_B_PERIOD)
+    parser.add_argument("--chikou", type=int, default=CandleAnalysisService.DEFAULT_CHIKOU_OFFSET)
+    parser.add_argument("--senkou-offset", type=int, default=CandleAnalysisService.DEFAULT_SENKOU_OFFSET)
+    parser.add_argument("--trades", action="store_true", help="거래 내역도 출력")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    timeframe_config = json.loads(args.timeframes)
+    backtest_service = BacktestService(timeframe_config, dca=args.dca / 100, initial_balance=args.balance)
+    backtest_service.set_decision_service(CandleAnalysisService(
+        strict_mode=args.strict,
+        tenkan_period=args.tenkan,
+        kijun_period=args.kijun,
+        senkou_b_period=args.senkou_b,
+        chikou_offset=args.chikou,
+        senkou_offset=args.senkou_offset,
+    ))
+    base_timeframe = backtest_service.get_base_timeframe()
+    series = load_series(args, base_timeframe, backtest_service._parse_timeframe_to_minutes(base_timeframe))
+    print(f"Loaded {len(series)} {base_timeframe} candles of {args.market}", file=sys.stderr)
+
+    report = asyncio.run(backtest_service.run(args.market, series))
+    if not args.trades:
+        report.pop("trade_log")
+    text = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
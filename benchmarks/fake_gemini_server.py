@@ -0,0 +1,181 @@
+"""
+오프라인 테스트용 가짜 Gemini 엔드포인트.
+
+POST /{version}/models/{model}:generateContent 요청에 Gemini와 같은 형식의 응답을 돌려주며,
+프롬프트의 Markets 줄에 있는 마켓마다 결정을 하나씩 담은 배치 응답({"decisions": [...]})을 만듭니다.
+기본 지연 시간, 지터, 느린 꼬리(일부 요청만 크게 지연)를 주입할 수 있습니다.
+GeminiClient(base_url=...) 또는 LLM_BASE_URL 환경 변수로 연결해 마감 시간과 헤지 동작을 확인합니다.
+
+사용법:
+    # 서버만 실행
+    python -m benchmarks.fake_gemini_server --port 8090 --latency-ms 800 --jitter-ms 200 --slow-ratio 0.05 --slow-ms 8000
+
+    # 서버를 띄우고 GeminiClient로 헤지 없음/있음을 비교
+    python -m benchmarks.fake_gemini_server --bench --calls 200 --timeout 3 --hedge-percentile 95
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+
+from aiohttp import web
+
+from clients.gemini_client import GeminiClient
+
+DEFAULT_RESPONSE = {"action": "wait", "reason": "fake gemini response"}
+MARKETS_PATTERN = re.compile(r"Markets: `([^`]*)`")
+RESPONSE_SCHEME = json.dumps({
+    "type": "object",
+    "properties": {"action": {"type": "string"}, "reason": {"type": "string"}},
+    "required": ["action", "reason"],
+})
+
+def make_response(text: str) -> dict:
+    """Gemini generateContent 응답 형식"""
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+    }
+
+def make_decisions(payload: dict) -> dict:
+    """요청 프롬프트의 마켓마다 'hold' 결정을 만들고, 마켓 목록이 없으면 단일 결정을 반환합니다."""
+    prompt = "".join(
+        part.get("text", "") for content in payload.get("contents", []) for part in content.get("parts", [])
+    )
+    match = MARKETS_PATTERN.search(prompt)
+    if not match:
+        return DEFAULT_RESPONSE
+    markets = [market.strip() for market in match.group(1).split(",") if market.strip()]
+    return {"decisions": [{"market": market, "action": "hold", "reason": "fake gemini response"} for market in markets]}
+
+async def start_fake_gemini_server(latency_ms: float = 0,
+                                   jitter_ms: float = 0,
+                                   slow_ratio: float = 0,
+                                   slow_ms: float = 0,
+                                   response: dict = None,
+                                   host: str = "127.0.0.1",
+                                   port: int = 0,
+                                   seed: int = None) -> tuple:
+    """
+    가짜 Gemini 서버를 시작합니다.
+
+    Returns:
+        tuple: (AppRunner, base_url, stats). stats는 받은 요청 수와 느린 응답 수를 담은 딕셔너리
+    """
+    rng = random.Random(seed)
+    fixed_body = make_response(json.dumps(response, ensure_ascii=False)) if response else None
+    stats = {"requests": 0, "slow": 0}
+
+    async def generate_content(request: web.Request) -> web.Response:
+        if not request.match_info["model_action"].endswith(":generateContent"):
+            return web.json_response({"error": {"code": 404, "message": "not found"}}, status=404)
+        payload = await request.json()
+        body = fixed_body or make_response(json.dumps(make_decisions(payload), ensure_ascii=False))
+        stats["requests"] += 1
+        delay = latency_ms + (rng.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0)
+        if slow_ratio and rng.random() < slow_ratio:
+            stats["slow"] += 1
+            delay += slow_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        return web.json_response(body)
+
+    app = web.Application()
+    app.router.add_post("/{version}/models/{model_action}", generate_content)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}", stats
+
+async def measure(base_url: str, calls: int, concurrency: int, timeout: float, hedge_percentile: float) -> dict:
+    client = GeminiClient(
+        llm_key="fake-key",
+        llm_model="fake-model",
+        llm_response_scheme=RESPONSE_SCHEME,
+        timeout=timeout,
+        max_concurrency=concurrency,
+        hedge_percentile=hedge_percentile,
+        base_url=base_url
+    )
+    latencies = []
+
+    async def call():
+        started = time.perf_counter()
+        await client.generate_answer_async("ping")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # 동시 요청 수만큼 나눠서 실행 (헤지 기준이 되는 지연 시간 표본이 점차 쌓임)
+    for offset in range(0, calls, concurrency):
+        await asyncio.gather(*(call() for _ in range(min(concurrency, calls - offset))))
+
+    latencies.sort()
+    return {
+        "calls": calls,
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 1),
+        "max_ms": round(latencies[-1], 1),
+        **client.get_stats(),
+    }
+
+async def run_bench(args) -> dict:
+    runner, base_url, server_stats = await start_fake_gemini_server(
+        args.latency_ms, args.jitter_ms, args.slow_ratio, args.slow_ms, seed=args.seed
+    )
+    try:
+        no_hedge = await measure(base_url, args.calls, args.concurrency, args.timeout, None)
+        hedged = await measure(base_url, args.calls, args.concurrency, args.timeout, args.hedge_percentile)
+    finally:
+        await runner.cleanup()
+    return {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "slow_ratio": args.slow_ratio,
+        "slow_ms": args.slow_ms,
+        "timeout_seconds": args.timeout,
+        "no_hedge": no_hedge,
+        "hedged": hedged,
+        "server": server_stats,
+    }
+
+async def serve(args):
+    runner, base_url, _ = await start_fake_gemini_server(
+        args.latency_ms, args.jitter_ms, args.slow_ratio, args.slow_ms, port=args.port, seed=args.seed
+    )
+    print(f"Fake Gemini server listening on {base_url} (set LLM_BASE_URL={base_url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Gemini endpoint for offline latency tests")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--slow-ratio", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bench", action="store_true", help="서버를 띄우고 헤지 없음/있음을 비교한 결과를 JSON으로 출력")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--hedge-percentile", type=float, default=95)
+    args = parser.parse_args()
+
+    try:
+        if args.bench:
+            print(json.dumps(asyncio.run(run_bench(args)), indent=2))
+        else:
+            asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
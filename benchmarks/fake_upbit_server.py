@@ -0,0 +1,357 @@
+"""
+오프라인 부하/지연 테스트용 가짜 Upbit 캔들 API.
+
+GET /v1/candles/minutes/{unit}?market=...&count=...&to=... 요청에 Upbit와 같은 형식의 분봉을 최신 순으로 돌려줍니다.
+    - 캔들: 기본은 (마켓, 단위, 시각)으로 결정되는 합성 캔들이라 요청/페이지가 달라도 같은 캔들이 나오며,
+      --candle-store를 주면 로컬 캔들 저장소에 기록된 캔들을 사용합니다.
+    - 페이지: count(최대 200)와 to(UTC, exclusive) 커서를 지원합니다. to가 없으면 진행 중인 캔들부터 반환합니다.
+    - 요청 제한: 클라이언트 주소별 초당/분당 요청 수를 세어 Remaining-Req 헤더를 붙이고, 초과하면 429로 응답합니다.
+    - 주입: 기본 지연 시간, 지터, 느린 꼬리, 5xx 오류 비율, 거래 없는 구간(캔들 누락) 비율.
+UpbitClient(base_url=...) 또는 UPBIT_BASE_URL 환경 변수로 연결합니다.
+
+사용법:
+    # 서버만 실행
+    python -m benchmarks.fake_upbit_server --port 8091 --latency-ms 30 --jitter-ms 10
+
+    # 서버를 띄우고 마켓 수를 늘려 가며 한 틱 안에 캔들 차트를 모두 가져올 수 있는 마켓 수를 측정
+    python -m benchmarks.fake_upbit_server --bench --markets 5,10,20,40 --tick-budget 10 --latency-ms 30
+
+    # 클라이언트 속도를 서버 제한보다 높게 설정해 Remaining-Req/429 기반 속도 조절과 재시도를 확인
+    python -m benchmarks.fake_upbit_server --bench --markets 20 --client-per-second 20 --error-ratio 0.05
+
+    # 4h 캔들을 5m 캔들로 로컬에서 만들어 첫 틱 이후 틱당 마켓별 요청을 1건으로 줄임
+    python -m benchmarks.fake_upbit_server --bench --markets 20 --incremental --resample-base 5m --max-base-candles 6100
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+from clients.rate_limiter import RateLimiter
+from clients.upbit_client import UpbitClient
+from repos.candle_repo import CandleRepo
+
+KST = timezone(timedelta(hours=9))
+MAX_COUNT = 200 # Upbit 캔들 API의 요청당 최대 개수
+UNITS = {1: "1m", 3: "3m", 5: "5m", 10: "10m", 15: "15m", 30: "30m", 60: "1h", 240: "4h"} # 단위(분) -> 시간대
+TIMEFRAME_CONFIG = {"5m": 125, "4h": 125}
+
+# Upbit 원화 마켓 호가 단위 (가격 하한, 호가 단위)
+KRW_TICKS = (
+    (2_000_000, 1000), (1_000_000, 500), (500_000, 100), (100_000, 50), (10_000, 10),
+    (1_000, 1), (100, 0.1), (10, 0.01), (1, 0.001), (0, 0.0001),
+)
+
+def round_to_tick(price: float) -> float:
+    for floor, tick in KRW_TICKS:
+        if price >= floor:
+            return round(round(price / tick) * tick, 4)
+    return price
+
+def error_body(name: str, message: str) -> dict:
+    return {"error": {"name": name, "message": message}}
+
+class SyntheticCandles:
+    """(마켓, 단위, 캔들 번호)로 결정되는 합성 캔들. 같은 시각의 캔들은 항상 같은 값입니다."""
+
+    def __init__(self, seed: int = 0, gap_ratio: float = 0.0):
+        if not 0 <= gap_ratio < 1:
+            raise ValueError(f"gap_ratio는 0 이상 1 미만이어야 합니다: {gap_ratio}")
+        self.seed = seed
+        self.gap_ratio = gap_ratio # 거래가 없어 캔들이 생략되는 구간 비율
+        self.base_prices = {} # 마켓 -> 기준 가격
+
+    def base_price(self, market: str) -> float:
+        if market not in self.base_prices:
+            self.base_prices[market] = 10 ** random.Random(f"{self.seed}:{market}").uniform(2, 8)
+        return self.base_prices[market]
+
+    def close(self, market: str, unit: int, index: int) -> float:
+        # 느린 추세 + 빠른 파동 + 캔들별 잡음
+        minutes = index * unit
+        noise = random.Random(f"{self.seed}:{market}:{unit}:{index}").gauss(0, 0.002)
+        wave = 0.05 * math.sin(2 * math.pi * minutes / 20160) + 0.015 * math.sin(2 * math.pi * minutes / 1440)
+        return round_to_tick(self.base_price(market) * (1 + wave + noise))
+
+    def is_gap(self, market: str, unit: int, index: int) -> bool:
+        return self.gap_ratio > 0 and random.Random(f"gap:{self.seed}:{market}:{unit}:{index}").random() < self.gap_ratio
+
+    def make_candle(self, market: str, unit: int, index: int) -> dict:
+        rng = random.Random(f"{self.seed}:{market}:{unit}:{index}:range")
+        open_price = self.close(market, unit, index - 1)
+        close_price = self.close(market, unit, index)
+        spread = max(open_price, close_price) * rng.uniform(0, 0.003)
+        volume = round(rng.uniform(0.5, 80) * unit, 8)
+        open_time = datetime.fromtimestamp(index * unit * 60, timezone.utc)
+        return {
+            "market": market,
+            "candle_date_time_utc": open_time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "candle_date_time_kst": open_time.astimezone(KST).strftime('%Y-%m-%dT%H:%M:%S'),
+            "opening_price": open_price,
+            "high_price": round_to_tick(max(open_price, close_price) + spread),
+            "low_price": round_to_tick(min(open_price, close_price) - spread),
+            "trade_price": close_price,
+            "timestamp": int((index * unit * 60 + unit * 60 - 1) * 1000),
+            "candle_acc_trade_price": round(volume * close_price, 8),
+            "candle_acc_trade_volume": volume,
+            "unit": unit,
+        }
+
+    def get_page(self, market: str, unit: int, count: int, to: float) -> list:
+        """to(epoch 초, exclusive) 이전의 캔들 최대 count개를 최신 순으로 반환합니다."""
+        bucket = unit * 60
+        index = math.ceil(to / bucket) - 1
+        candles = []
+        while len(candles) < count:
+            if not self.is_gap(market, unit, index):
+                candles.append(self.make_candle(market, unit, index))
+            index -= 1
+        return candles
+
+class RecordedCandles:
+    """로컬 캔들 저장소에 기록된 캔들. 기록 구간 밖은 빈 페이지를 반환합니다."""
+
+    def __init__(self, path: str, retention: int = 100000):
+        self.repo = CandleRepo(path, retention=retention)
+        self.retention = retention
+        self.series = {} # (마켓, 단위) -> (과거 순 캔들 리스트, 과거 순 UTC epoch 리스트)
+
+    def load(self, market: str, unit: int) -> tuple:
+        key = (market, unit)
+        if key not in self.series:
+            candles = self.repo.get_latest(market, UNITS.get(unit, str(unit)), self.retention)[::-1]
+            times = [
+                datetime.fromisoformat(candle["candle_date_time_utc"]).replace(tzinfo=timezone.utc).timestamp()
+                for candle in candles
+            ]
+            self.series[key] = (candles, times)
+        return self.series[key]
+
+    def get_page(self, market: str, unit: int, count: int, to: float) -> list:
+        candles, times = self.load(market, unit)
+        end = next((i for i in range(len(times) - 1, -1, -1) if times[i] < to), -1) + 1
+        return candles[max(0, end - count):end][::-1]
+
+    def close(self):
+        self.repo.close()
+
+class ClientQuota:
+    """클라이언트 주소별 초당/분당 요청 기록 (슬라이딩 윈도우)"""
+
+    def __init__(self):
+        self.second = deque()
+        self.minute = deque()
+
+    def admit(self, now: float, per_second: int, per_minute: int) -> tuple:
+        """
+        요청 1건을 받을 수 있는지 확인하고 기록합니다.
+
+        Returns:
+            tuple: (허용 여부, 남은 분당 요청 수, 남은 초당 요청 수)
+        """
+        while self.second and now - self.second[0] >= 1:
+            self.second.popleft()
+        while self.minute and now - self.minute[0] >= 60:
+            self.minute.popleft()
+        if len(self.second) >= per_second or len(self.minute) >= per_minute:
+            return False, max(0, per_minute - len(self.minute)), 0
+        self.second.append(now)
+        self.minute.append(now)
+        return True, per_minute - len(self.minute), per_second - len(self.second)
+
+def parse_to(value: str) -> float:
+    """Upbit to 파라미터(ISO 8601, 'yyyy-MM-dd HH:mm:ss'; 시간대가 없으면 UTC)를 epoch 초로 변환합니다."""
+    parsed = datetime.fromisoformat(value.strip().replace(" ", "T"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+async def start_fake_upbit_server(latency_ms: float = 0,
+                                  jitter_ms: float = 0,
+                                  slow_ratio: float = 0,
+                                  slow_ms: float = 0,
+                                  per_second: int = RateLimiter.DEFAULT_PER_SECOND,
+                                  per_minute: int = RateLimiter.DEFAULT_PER_MINUTE,
+                                  error_ratio: float = 0,
+                                  gap_ratio: float = 0,
+                                  candle_store: str = None,
+                                  host: str = "127.0.0.1",
+                                  port: int = 0,
+                                  seed: int = None) -> tuple:
+    """
+    가짜 Upbit 서버를 시작합니다.
+
+    Returns:
+        tuple: (AppRunner, base_url, stats). stats는 받은 요청 수, 429 응답 수, 주입한 오류/느린 응답 수를 담은 딕셔너리
+    """
+    rng = random.Random(seed)
+    source = RecordedCandles(candle_store) if candle_store else SyntheticCandles(seed or 0, gap_ratio)
+    quotas = {} # 클라이언트 주소 -> ClientQuota
+    stats = {"requests": 0, "throttled": 0, "errors": 0, "slow": 0}
+
+    async def candles_handler(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        quota = quotas.setdefault(request.remote, ClientQuota())
+        admitted, remaining_min, remaining_sec = quota.admit(time.monotonic(), per_second, per_minute)
+        headers = {"Remaining-Req": f"group=candles; min={remaining_min}; sec={remaining_sec}"}
+        if not admitted:
+            stats["throttled"] += 1
+            return web.json_response(error_body("too_many_requests", "Too many API requests."), status=429, headers=headers)
+
+        try:
+            unit = int(request.match_info["unit"])
+            market = request.query["market"]
+            count = int(request.query.get("count", 1))
+            to = parse_to(request.query["to"]) if request.query.get("to") else time.time() + unit * 60
+        except (KeyError, ValueError) as e:
+            return web.json_response(error_body("validation_error", f"invalid parameter: {e}"), status=400, headers=headers)
+        if unit not in UNITS or not 1 <= count <= MAX_COUNT:
+            return web.json_response(error_body("validation_error", "unit or count out of range"), status=400, headers=headers)
+
+        delay = latency_ms + (rng.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0)
+        if slow_ratio and rng.random() < slow_ratio:
+            stats["slow"] += 1
+            delay += slow_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if error_ratio and rng.random() < error_ratio:
+            stats["errors"] += 1
+            return web.json_response(error_body("server_error", "injected server error"), status=500, headers=headers)
+        return web.json_response(source.get_page(market, unit, count, to), headers=headers)
+
+    async def close_source(app):
+        if isinstance(source, RecordedCandles):
+            source.close()
+
+    app = web.Application()
+    app.router.add_get("/v1/candles/minutes/{unit}", candles_handler)
+    app.on_cleanup.append(close_source)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}", stats
+
+async def measure(base_url: str, markets: int, ticks: int, per_second: float, per_minute: float,
+                  incremental: bool, tick_budget: float, server_stats: dict,
+                  resample_base: str = None, max_base_candles: int = UpbitClient.DEFAULT_MAX_BASE_CANDLES) -> dict:
+    """공유 RateLimiter를 쓰는 UpbitClient로 마켓 markets개의 캔들 차트를 틱마다 동시에 가져옵니다."""
+    client = UpbitClient("KRW-C0", base_url=base_url, share_until_close=False, # 틱마다 실제 요청량을 측정
+                         resample_base=resample_base, max_base_candles=max_base_candles)
+    limiter = RateLimiter(per_second, per_minute)
+    client.set_rate_limiter(limiter)
+    repo = CandleRepo(":memory:", retention=max(CandleRepo.DEFAULT_RETENTION, max_base_candles)) if incremental else None
+    if repo:
+        client.set_candle_repo(repo)
+    await client.start()
+    names = [f"KRW-C{i}" for i in range(markets)]
+    durations, failed, requests = [], 0, []
+    try:
+        for _ in range(ticks):
+            requested = server_stats["requests"]
+            started = time.perf_counter()
+            deadline = time.monotonic() + tick_budget
+            charts = await asyncio.gather(
+                *(client.fetch_candle_chart(TIMEFRAME_CONFIG, name, deadline) for name in names), return_exceptions=True
+            )
+            durations.append(time.perf_counter() - started)
+            requests.append(server_stats["requests"] - requested)
+            failed += sum(
+                1 for chart in charts
+                if isinstance(chart, Exception)
+                or any(len(chart.get_series(timeframe) or []) < count for timeframe, count in TIMEFRAME_CONFIG.items())
+            )
+    finally:
+        await client.close()
+        if repo:
+            repo.close()
+    return {
+        "markets": markets,
+        "tick_p50_seconds": round(statistics.median(durations), 3),
+        "tick_max_seconds": round(max(durations), 3),
+        "incomplete_charts": failed,
+        "requests_per_tick": requests,
+        "candle_requests": client.get_stats(),
+        "rate_limiter": limiter.get_stats(),
+    }
+
+async def run_bench(args) -> dict:
+    results = []
+    for markets in [int(value) for value in args.markets.split(",")]:
+        runner, base_url, stats = await start_fake_upbit_server(
+            args.latency_ms, args.jitter_ms, args.slow_ratio, args.slow_ms,
+            args.per_second, args.per_minute, args.error_ratio, args.gap_ratio, args.candle_store, seed=args.seed
+        )
+        try:
+            result = await measure(
+                base_url, markets, args.ticks, args.client_per_second or args.per_second, args.per_minute,
+                args.incremental, args.tick_budget, stats, args.resample_base, args.max_base_candles
+            )
+        finally:
+            await runner.cleanup()
+        result["within_budget"] = result["tick_max_seconds"] <= args.tick_budget and not result["incomplete_charts"]
+        result["server"] = stats
+        results.append(result)
+    sustained = [result["markets"] for result in results if result["within_budget"]]
+    return {
+        "timeframe_config": TIMEFRAME_CONFIG,
+        "tick_budget_seconds": args.tick_budget,
+        "latency_ms": args.latency_ms,
+        "rate_limit": {"per_second": args.per_second, "per_minute": args.per_minute},
+        "incremental": args.incremental,
+        "resample_base": args.resample_base,
+        "max_markets_within_budget": max(sustained) if sustained else 0,
+        "results": results,
+    }
+
+async def serve(args):
+    runner, base_url, _ = await start_fake_upbit_server(
+        args.latency_ms, args.jitter_ms, args.slow_ratio, args.slow_ms,
+        args.per_second, args.per_minute, args.error_ratio, args.gap_ratio, args.candle_store,
+        port=args.port, seed=args.seed
+    )
+    print(f"Fake Upbit server listening on {base_url} (set UPBIT_BASE_URL={base_url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Upbit candle API for offline load and latency tests")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--slow-ratio", type=float, default=0)
+    parser.add_argument("--slow-ms", type=float, default=1000)
+    parser.add_argument("--per-second", type=int, default=RateLimiter.DEFAULT_PER_SECOND, help="클라이언트별 초당 허용 요청 수")
+    parser.add_argument("--per-minute", type=int, default=RateLimiter.DEFAULT_PER_MINUTE, help="클라이언트별 분당 허용 요청 수")
+    parser.add_argument("--error-ratio", type=float, default=0, help="500 오류로 응답할 요청 비율")
+    parser.add_argument("--gap-ratio", type=float, default=0, help="거래가 없어 생략할 캔들 비율 (합성 캔들)")
+    parser.add_argument("--candle-store", default=None, help="기록된 캔들을 제공할 로컬 캔들 저장소(SQLite) 경로")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bench", action="store_true", help="서버를 띄우고 마켓 수별 틱 소요 시간을 JSON으로 출력")
+    parser.add_argument("--markets", default="5,10,20,40", help="측정할 마켓 수 (쉼표 구분)")
+    parser.add_argument("--ticks", type=int, default=3)
+    parser.add_argument("--tick-budget", type=float, default=10.0)
+    parser.add_argument("--client-per-second", type=float, default=None, help="클라이언트 RateLimiter 초당 속도 (기본값: 서버 제한과 같음)")
+    parser.add_argument("--incremental", action="store_true", help="캔들 저장소를 사용해 첫 틱 이후 새 구간만 요청")
+    parser.add_argument("--resample-base", default=None, help="상위 시간대를 로컬에서 만들 기준 시간대 (ex. 5m)")
+    parser.add_argument("--max-base-candles", type=int, default=UpbitClient.DEFAULT_MAX_BASE_CANDLES,
+                        help="리샘플링용 기준 시간대 윈도우 최대 캔들 수")
+    args = parser.parse_args()
+
+    try:
+        if args.bench:
+            print(json.dumps(asyncio.run(run_bench(args)), indent=2))
+        else:
+            asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,410 @@
+"""
+오프라인 테스트용 가짜 Upbit WebSocket 체결 서버.
+
+GET /websocket/v1 에 Upbit와 같은 구독 요청([{"ticket": ...}, {"type": "trade", "codes": [...]}])을 보내면
+구독한 마켓의 체결 메시지를 바이너리 프레임으로 보냅니다. 같은 체결로 만든 분봉을
+GET /v1/candles/minutes/{unit} (REST 백필용)으로도 제공하므로, 스트림이 만든 캔들과 REST 캔들을 비교할 수 있습니다.
+    - 체결: --trades로 기록한 체결(JSON Lines, Upbit trade 메시지)을 원래 간격대로 재생하며, 없으면 합성 체결을 만듭니다.
+      체결 시각은 서버 시계 기준 현재 시각으로 바꿔 보냅니다.
+    - 시계: --speed배로 빠르게 흐르는 시계를 사용합니다 (ex. 60이면 5분봉이 5초마다 마감). --bench는 같은 시계를 UpbitStream에 넣습니다.
+    - 주입: --drop-every초(서버 시계)마다 모든 연결을 끊어 재연결/재구독과 REST 백필을 확인합니다.
+UpbitStream(url=...) 또는 UPBIT_WS_URL 환경 변수로 연결하고, REST는 UPBIT_BASE_URL로 같은 서버를 지정합니다.
+
+사용법:
+    # 서버만 실행 (실시간)
+    python -m benchmarks.fake_upbit_stream --port 8092 --markets KRW-BTC,KRW-ETH
+
+    # 실제 Upbit 체결을 60초 동안 기록
+    python -m benchmarks.fake_upbit_stream --record trades.jsonl --markets KRW-BTC,KRW-ETH --seconds 60
+
+    # 기록한 체결을 재생
+    python -m benchmarks.fake_upbit_stream --port 8092 --trades trades.jsonl
+
+    # 60배속으로 30분(서버 시계) 동안 스트림을 돌려 마감 지연, REST 요청 수, 스트림/REST 캔들 일치 여부를 측정
+    python -m benchmarks.fake_upbit_stream --bench --markets KRW-C0,KRW-C1,KRW-C2 --speed 60 --minutes 30 --drop-every 600
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.fake_upbit_server import MAX_COUNT, UNITS, parse_to
+from clients.upbit_client import UpbitClient
+from clients.upbit_stream import UpbitStream
+from dtos.candle_series import epoch_to_kst
+
+class ScaledClock:
+    """speed배로 흐르는 시계. TickScheduler/UpbitStream의 clock과 같은 time()/sleep() 인터페이스"""
+
+    def __init__(self, speed: float = 1.0, origin: float = None):
+        self.speed = speed
+        self.__origin = origin if origin is not None else time.time()
+        self.__started = time.monotonic()
+
+    def time(self) -> float:
+        return self.__origin + (time.monotonic() - self.__started) * self.speed
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(max(0.0, seconds) / self.speed)
+
+class SyntheticTrades:
+    """마켓별 합성 체결. 간격은 지수 분포, 가격은 랜덤 워크이며 시작 전 이력은 1분봉으로 만듭니다."""
+
+    def __init__(self, markets: list, trades_per_second: float = 2.0, seed: int = 0):
+        self.markets = markets
+        self.rate = trades_per_second
+        self.rng = random.Random(seed)
+        self.prices = {market: 1000.0 * (index + 1) for index, market in enumerate(markets)}
+
+    def history(self, market: str, start_minute: int, minutes: int) -> list:
+        """start_minute(epoch 분) 이전 minutes개 1분봉 [(시작 epoch 초, 시가, 고가, 저가, 종가, 거래량)]을 과거 순으로 만들고, 마지막 종가를 현재가로 둡니다."""
+        rng = random.Random(f"{market}:history")
+        price = self.prices[market]
+        rows = []
+        for minute in range(start_minute - minutes, start_minute):
+            open_price = price
+            price = max(1.0, price * (1 + rng.gauss(0, 0.001)))
+            high = max(open_price, price) * (1 + abs(rng.gauss(0, 0.0005)))
+            low = min(open_price, price) * (1 - abs(rng.gauss(0, 0.0005)))
+            rows.append((minute * 60, open_price, high, low, price, rng.uniform(0.1, 5.0)))
+        self.prices[market] = price
+        return rows
+
+    def events(self, start_ms: int):
+        """start_ms 이후 체결 (timestamp_ms, market, price, volume)을 시간 순으로 끝없이 만듭니다."""
+        heap = [(start_ms + int(self.rng.expovariate(self.rate) * 1000), market) for market in self.markets]
+        heapq.heapify(heap)
+        while True:
+            timestamp, market = heapq.heappop(heap)
+            price = max(1.0, self.prices[market] * (1 + self.rng.gauss(0, 0.0003)))
+            self.prices[market] = price
+            yield timestamp, market, round(price, 4), round(self.rng.uniform(0.001, 0.5), 8)
+            heapq.heappush(heap, (timestamp + 1 + int(self.rng.expovariate(self.rate) * 1000), market))
+
+class RecordedTrades:
+    """기록한 Upbit 체결(JSON Lines)을 원래 간격대로 재생합니다. 시작 전 이력은 없습니다."""
+
+    def __init__(self, path: str):
+        with open(path, "r") as file:
+            self.trades = sorted((json.loads(line) for line in file if line.strip()), key=lambda trade: trade["trade_timestamp"])
+        self.markets = sorted({trade["code"] for trade in self.trades})
+
+    def history(self, market: str, start_minute: int, minutes: int) -> list:
+        return []
+
+    def events(self, start_ms: int):
+        if not self.trades:
+            return
+        offset = start_ms - self.trades[0]["trade_timestamp"]
+        for trade in self.trades:
+            yield trade["trade_timestamp"] + offset, trade["code"], float(trade["trade_price"]), float(trade["trade_volume"])
+
+class MinuteBook:
+    """마켓별 1분봉 (REST 응답용). 체결로 갱신하고 요청 단위로 묶어 반환합니다."""
+
+    def __init__(self):
+        self.candles = {} # 마켓 -> {시작 epoch 초: [시가, 고가, 저가, 종가, 거래량]}
+
+    def load(self, market: str, rows: list):
+        book = self.candles.setdefault(market, {})
+        for start, *values in rows:
+            book[start] = list(values)
+
+    def add(self, market: str, timestamp_ms: int, price: float, volume: float):
+        epoch = timestamp_ms // 1000
+        start = epoch - epoch % 60
+        candle = self.candles.setdefault(market, {}).get(start)
+        if candle is None:
+            self.candles[market][start] = [price, price, price, price, volume]
+            return
+        candle[1] = max(candle[1], price)
+        candle[2] = min(candle[2], price)
+        candle[3] = price
+        candle[4] += volume
+
+    def get_page(self, market: str, unit: int, count: int, to: float) -> list:
+        """to(epoch 초, exclusive) 이전에 시작한 unit분봉 최대 count개를 Upbit 형식으로 최신 순 반환합니다."""
+        bucket_seconds = unit * 60
+        buckets = {}
+        for start in sorted(self.candles.get(market, {})):
+            if start >= to:
+                break
+            open_price, high, low, close, volume = self.candles[market][start]
+            key = start - start % bucket_seconds
+            candle = buckets.get(key)
+            if candle is None:
+                buckets[key] = [open_price, high, low, close, volume]
+            else:
+                candle[1] = max(candle[1], high)
+                candle[2] = min(candle[2], low)
+                candle[3] = close
+                candle[4] += volume
+        keys = [key for key in sorted(buckets) if key < to][-count:]
+        return [{
+            "market": market,
+            "candle_date_time_utc": datetime.fromtimestamp(key, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'),
+            "candle_date_time_kst": epoch_to_kst(key),
+            "opening_price": buckets[key][0],
+            "high_price": buckets[key][1],
+            "low_price": buckets[key][2],
+            "trade_price": buckets[key][3],
+            "timestamp": (key + bucket_seconds) * 1000 - 1,
+            "candle_acc_trade_price": round(buckets[key][3] * buckets[key][4], 8),
+            "candle_acc_trade_volume": buckets[key][4],
+            "unit": unit,
+        } for key in reversed(keys)]
+
+def trade_message(market: str, timestamp_ms: int, price: float, volume: float, sequence: int) -> dict:
+    """Upbit trade 메시지 (DEFAULT 형식)"""
+    traded_at = datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc)
+    return {
+        "type": "trade",
+        "code": market,
+        "timestamp": timestamp_ms,
+        "trade_date": traded_at.strftime('%Y-%m-%d'),
+        "trade_time": traded_at.strftime('%H:%M:%S'),
+        "trade_timestamp": timestamp_ms,
+        "trade_price": price,
+        "trade_volume": volume,
+        "ask_bid": "BID" if sequence % 2 else "ASK",
+        "sequential_id": sequence,
+        "stream_type": "REALTIME",
+    }
+
+async def start_fake_upbit_stream(source, clock, history_minutes: int = 0, drop_every: float = 0,
+                                  host: str = "127.0.0.1", port: int = 0) -> tuple:
+    """
+    가짜 Upbit 체결 서버를 시작합니다.
+
+    Returns:
+        tuple: (AppRunner, REST base_url, WebSocket url, stats). stats는 연결/구독/보낸 체결/끊은 연결/REST 요청 수
+    """
+    book = MinuteBook()
+    start_minute = int(clock.time() // 60)
+    for market in source.markets:
+        book.load(market, source.history(market, start_minute, history_minutes))
+    subscribers = {} # WebSocketResponse -> 구독 마켓 set
+    stats = {"connections": 0, "subscriptions": 0, "trades": 0, "dropped": 0, "rest_requests": 0}
+
+    async def websocket_handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        stats["connections"] += 1
+        try:
+            async for message in ws:
+                if message.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    continue
+                try:
+                    fields = json.loads(message.data)
+                    codes = next(field["codes"] for field in fields if field.get("type") == "trade")
+                except (ValueError, TypeError, KeyError, StopIteration, AttributeError):
+                    await ws.send_bytes(json.dumps({"error": {"name": "WRONG_FORMAT", "message": "trade codes required"}}).encode())
+                    continue
+                subscribers[ws] = set(codes)
+                stats["subscriptions"] += 1
+        finally:
+            subscribers.pop(ws, None)
+        return ws
+
+    async def candles_handler(request: web.Request) -> web.Response:
+        stats["rest_requests"] += 1
+        try:
+            market = request.query["market"]
+            unit = int(request.match_info["unit"])
+            count = int(request.query.get("count", 1))
+            to = parse_to(request.query["to"]) if request.query.get("to") else clock.time() + unit * 60
+        except (KeyError, ValueError):
+            return web.json_response({"error": {"name": "validation_error", "message": "invalid query"}}, status=400)
+        if unit not in UNITS or not 1 <= count <= MAX_COUNT:
+            return web.json_response({"error": {"name": "validation_error", "message": "unit or count out of range"}}, status=400)
+        return web.json_response(book.get_page(market, unit, count, to))
+
+    async def produce():
+        """체결을 시계에 맞춰 구독자에게 보내고 1분봉에 반영합니다."""
+        sequence = 0
+        for timestamp, market, price, volume in source.events(int(clock.time() * 1000)):
+            wait = timestamp / 1000 - clock.time()
+            if wait > 0:
+                await clock.sleep(wait)
+            sequence += 1
+            book.add(market, timestamp, price, volume)
+            payload = json.dumps(trade_message(market, timestamp, price, volume, sequence)).encode()
+            for ws, codes in list(subscribers.items()):
+                if market in codes and not ws.closed:
+                    stats["trades"] += 1
+                    await ws.send_bytes(payload)
+
+    async def drop():
+        """drop_every초(서버 시계)마다 모든 연결을 끊습니다."""
+        while True:
+            await clock.sleep(drop_every)
+            for ws in list(subscribers):
+                stats["dropped"] += 1
+                await ws.close(code=aiohttp.WSCloseCode.GOING_AWAY, message=b"dropped by fake server")
+
+    async def start_tasks(app):
+        app["tasks"] = [asyncio.create_task(produce())] + ([asyncio.create_task(drop())] if drop_every > 0 else [])
+
+    async def stop_tasks(app):
+        for task in app["tasks"]:
+            task.cancel()
+        await asyncio.gather(*app["tasks"], return_exceptions=True)
+        for ws in list(subscribers):
+            await ws.close()
+
+    app = web.Application()
+    app.router.add_get("/websocket/v1", websocket_handler)
+    app.router.add_get("/v1/candles/minutes/{unit}", candles_handler)
+    app.on_startup.append(start_tasks)
+    app.on_shutdown.append(stop_tasks)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://{host}:{bound_port}"
+    return runner, base_url, f"ws://{host}:{bound_port}/websocket/v1", stats
+
+async def record_trades(url: str, markets: list, path: str, seconds: float) -> int:
+    """Upbit WebSocket 체결을 seconds초 동안 JSON Lines로 기록하고 기록한 체결 수를 반환합니다."""
+    recorded = 0
+    subscription = [{"ticket": str(uuid.uuid4())}, {"type": "trade", "codes": markets, "is_only_realtime": True}]
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(url, heartbeat=UpbitStream.HEARTBEAT) as ws:
+            await ws.send_str(json.dumps(subscription))
+            deadline = time.monotonic() + seconds
+            with open(path, "w") as file:
+                while (remaining := deadline - time.monotonic()) > 0:
+                    try:
+                        message = await ws.receive(timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if message.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                        break
+                    data = json.loads(message.data)
+                    if data.get("type") == "trade":
+                        file.write(json.dumps(data) + "\n")
+                        recorded += 1
+    return recorded
+
+def compare_candles(stream_series, rest_series, after: int, before: int) -> dict:
+    """[after, before) 구간(epoch 초)에 시작한 마감 캔들 중 스트림과 REST가 다른 캔들 수"""
+    def rows(series) -> dict:
+        return {series.times[i]: series.row(i) for i in range(len(series)) if after <= series.times[i] < before}
+
+    stream_rows, rest_rows = rows(stream_series), rows(rest_series)
+    common = stream_rows.keys() & rest_rows.keys()
+    mismatched = sum(
+        1 for key in common
+        if any(abs(a - b) > 1e-6 * max(1.0, abs(b)) for a, b in zip(stream_rows[key][1:], rest_rows[key][1:]))
+    )
+    return {"compared": len(common), "mismatched": mismatched, "missing": len(rest_rows.keys() - stream_rows.keys())}
+
+async def run_bench(args) -> dict:
+    markets = [market.strip() for market in args.markets.split(",") if market.strip()]
+    clock = ScaledClock(args.speed)
+    source = RecordedTrades(args.trades) if args.trades else SyntheticTrades(markets, args.trades_per_second, args.seed)
+    markets = source.markets
+    unit = args.unit
+    timeframe = UNITS[unit]
+    runner, base_url, ws_url, server_stats = await start_fake_upbit_stream(
+        source, clock, history_minutes=args.max_candles * unit + unit, drop_every=args.drop_every
+    )
+    client = UpbitClient(markets[0], base_url=base_url, share_until_close=False) # 백필 결과를 실제 시각 기준으로 재사용하지 않도록
+    stream = UpbitStream(markets, unit, url=ws_url, max_candles=args.max_candles, close_delay=args.close_delay, clock=clock)
+    stream.set_backfill(lambda market, count: client.fetch_candles(market, timeframe, count))
+    delays = []
+
+    async def on_close(boundary: float, closed: list):
+        delays.extend([(clock.time() - boundary) / clock.speed] * len(closed))
+
+    stream.set_on_close(on_close)
+    await client.start()
+    try:
+        await stream.start()
+        seeded = server_stats["rest_requests"]
+        started = clock.time()
+        await clock.sleep(args.minutes * 60)
+        steady = server_stats["rest_requests"] - seeded
+        boundary = int(clock.time() // (unit * 60)) * unit * 60
+        comparison = {"compared": 0, "mismatched": 0, "missing": 0}
+        for market in markets:
+            live = stream.get_series(market, args.max_candles)
+            if live is None:
+                continue
+            rest = await client.fetch_candles(market, timeframe, args.max_candles)
+            # 시작 후 스트림이 만든 캔들만 비교 (시작 전 캔들은 REST로 채운 것)
+            result = compare_candles(live, rest, int(started // (unit * 60)) * unit * 60, boundary)
+            for key in comparison:
+                comparison[key] += result[key]
+    finally:
+        await stream.close()
+        await client.close()
+        await runner.cleanup()
+    return {
+        "markets": len(markets),
+        "timeframe": timeframe,
+        "speed": args.speed,
+        "simulated_minutes": args.minutes,
+        "closes": len(delays),
+        "close_delay_ms": {
+            "p50": round(statistics.median(delays) * 1000, 1) if delays else None,
+            "max": round(max(delays) * 1000, 1) if delays else None,
+        },
+        "rest_requests": {"seed": seeded, "while_streaming": steady},
+        "live_candles_vs_rest": comparison,
+        "stream": stream.get_stats(),
+        "server": server_stats,
+    }
+
+async def serve(args):
+    markets = [market.strip() for market in args.markets.split(",") if market.strip()]
+    clock = ScaledClock(args.speed)
+    source = RecordedTrades(args.trades) if args.trades else SyntheticTrades(markets, args.trades_per_second, args.seed)
+    runner, base_url, ws_url, _ = await start_fake_upbit_stream(
+        source, clock, history_minutes=args.history_minutes, drop_every=args.drop_every, port=args.port
+    )
+    print(f"Fake Upbit stream listening on {ws_url} (set UPBIT_WS_URL={ws_url}, UPBIT_BASE_URL={base_url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Upbit WebSocket trade stream for offline streaming tests")
+    parser.add_argument("--port", type=int, default=8092)
+    parser.add_argument("--markets", default="KRW-C0,KRW-C1,KRW-C2", help="합성 체결 마켓 (쉼표 구분)")
+    parser.add_argument("--trades", default=None, help="재생할 기록 체결 파일 (JSON Lines)")
+    parser.add_argument("--trades-per-second", type=float, default=2.0, help="마켓별 합성 체결 빈도 (서버 시계 기준)")
+    parser.add_argument("--history-minutes", type=int, default=2000, help="REST로 제공할 시작 전 합성 1분봉 수")
+    parser.add_argument("--speed", type=float, default=1.0, help="서버 시계 배속")
+    parser.add_argument("--drop-every", type=float, default=0, help="모든 연결을 끊는 주기 (서버 시계 초, 0이면 끊지 않음)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", default=None, help="실제 Upbit 체결을 기록할 파일 경로")
+    parser.add_argument("--url", default=UpbitStream.WS_URL, help="기록할 WebSocket 주소")
+    parser.add_argument("--seconds", type=float, default=60, help="기록 시간(초)")
+    parser.add_argument("--bench", action="store_true", help="서버와 UpbitStream을 함께 띄워 측정 결과를 JSON으로 출력")
+    parser.add_argument("--unit", type=int, default=5, help="스트림 캔들 시간대 (분)")
+    parser.add_argument("--minutes", type=float, default=30, help="측정 시간 (서버 시계 분)")
+    parser.add_argument("--max-candles", type=int, default=150, help="스트림이 보관할 마감 캔들 수 (REST 한 페이지 이내)")
+    parser.add_argument("--close-delay", type=float, default=UpbitStream.CLOSE_DELAY, help="거래가 없는 마켓의 마감 대기 (서버 시계 초)")
+    args = parser.parse_args()
+
+    try:
+        if args.record:
+            markets = [market.strip() for market in args.markets.split(",") if market.strip()]
+            print(f"Recorded {asyncio.run(record_trades(args.url, markets, args.record, args.seconds))} trades to {args.record}")
+        elif args.bench:
+            print(json.dumps(asyncio.run(run_bench(args)), indent=2))
+        else:
+            asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
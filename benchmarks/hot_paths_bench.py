@@ -0,0 +1,364 @@
+"""
+결정/데이터 경로 마이크로 벤치마크 모음.
+
+네트워크와 MySQL 없이 합성 캔들(또는 로컬 캔들 저장소의 기록된 캔들)로 실행하며,
+DB 접근은 메모리 저장소(repos.in_memory)로, Upbit는 로컬 스텁 서버로 대신합니다.
+결과는 JSON 파일로 저장하고, --baseline으로 이전 결과와 비교해 느려진 항목을 보고합니다.
+
+측정 항목:
+    - CandleAnalysisService._calculate_ichimoku (윈도우 크기별)
+    - CandleAnalysisService.execute_trade_decision (윈도우 크기별, cold: 새 서비스 / tick: 캔들 1개씩 진행)
+    - CandleService.candle_to_json
+    - LLMService._generate_prompt (캔들 형식별)
+    - GeminiClient._validate_and_parse_response (정상/텍스트로 감싼/잘못된 JSON)
+    - UpbitClient.fetch_candle_chart (로컬 스텁 서버, 캔들 저장소 없음/있음)
+    - Metrics.stage 스팬 (메트릭 활성/비활성)
+    - DecisionExecutor (inline/thread/process): 여러 마켓 동시 결정의 총 시간과 이벤트 루프 최대 지연
+
+사용법:
+    python -m benchmarks.hot_paths_bench --output bench_results.json
+    python -m benchmarks.hot_paths_bench --quick --baseline bench_results.json --threshold 1.2
+    python -m benchmarks.hot_paths_bench --candle-store ./candles.db --market KRW-BTC
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.prompt_size_report import make_random_walk_candles
+from benchmarks.session_pool_bench import start_stub_server
+from clients.gemini_client import GeminiClient
+from clients.upbit_client import UpbitClient
+from dtos.candle_chart import CandleChart
+from repos.candle_repo import CandleRepo
+from repos.in_memory import InMemoryDBMS, InMemoryDecisionLogRepo
+from services.candle_analysis_service import CandleAnalysisService
+from services.candle_service import CandleService
+from services.decision_executor import DecisionExecutor
+from services.llm_service import LLMService
+from settings.metrics import Metrics
+
+LTF, LTF_MINUTES = "5m", 5
+HTF, HTF_MINUTES = "4h", 240
+WINDOWS = (125, 250, 500, 1000)
+
+class Suite:
+    """벤치마크 실행과 결과 수집"""
+
+    def __init__(self, number: int, repeat: int, only: str = None):
+        self.number = number # 한 번 측정할 때 연속 호출 수
+        self.repeat = repeat # 측정 반복 수
+        self.only = only
+        self.results = []
+
+    def selected(self, name: str) -> bool:
+        return not self.only or self.only in name
+
+    def record(self, name: str, params: dict, samples: list, number: int):
+        ordered = sorted(samples)
+        result = {
+            "name": name,
+            "params": params,
+            "number": number,
+            "repeat": len(samples),
+            "min_us": round(ordered[0], 3),
+            "median_us": round(statistics.median(ordered), 3),
+            "mean_us": round(statistics.mean(ordered), 3),
+            "max_us": round(ordered[-1], 3),
+        }
+        self.results.append(result)
+        print(f"{name:<40} {json.dumps(params):<45} median {result['median_us']:>12.1f} us", file=sys.stderr)
+
+    def run(self, name: str, params: dict, fn, number: int = None):
+        """fn()을 number번 호출하는 측정을 repeat번 반복해 호출 1회당 시간(us)을 기록합니다."""
+        if not self.selected(name):
+            return
+        number = number or self.number
+        fn() # 워밍업
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - started) / number * 1e6)
+        self.record(name, params, samples, number)
+
+    async def run_async(self, name: str, params: dict, fn, number: int = None):
+        """코루틴 함수 fn()에 대한 run()"""
+        if not self.selected(name):
+            return
+        number = number or self.number
+        await fn() # 워밍업
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                await fn()
+            samples.append((time.perf_counter() - started) / number * 1e6)
+        self.record(name, params, samples, number)
+
+def load_series(args, timeframe: str, minutes: int, length: int, rng: random.Random) -> tuple:
+    """
+    최신 순 캔들 length개. --candle-store의 기록된 캔들이 충분하면 그것을, 아니면 합성 캔들을 사용합니다.
+
+    Returns:
+        tuple: (캔들 리스트, 출처 'recorded' 또는 'synthetic')
+    """
+    if args.candle_store:
+        repo = CandleRepo(args.candle_store, retention=length)
+        try:
+            candles = repo.get_latest(args.market, timeframe, length)
+        finally:
+            repo.close()
+        if len(candles) >= length:
+            return candles, "recorded"
+    return make_random_walk_candles(args.market, minutes, length, rng), "synthetic"
+
+def make_chart(market: str, ltf_candles: list, htf_candles: list) -> CandleChart:
+    chart = CandleChart()
+    chart.set_market(market)
+    chart.set_candles(LTF, ltf_candles)
+    chart.set_candles(HTF, htf_candles)
+    chart.set_current_price(ltf_candles[0]["trade_price"])
+    return chart
+
+def make_analysis_service(executor: DecisionExecutor = None) -> CandleAnalysisService:
+    service = CandleAnalysisService()
+    if executor is not None:
+        service.set_decision_executor(executor)
+    service.set_dbms(InMemoryDBMS())
+    service.set_decision_log_repo(InMemoryDecisionLogRepo())
+    return service
+
+def bench_analysis(suite: Suite, args, rng: random.Random) -> dict:
+    sources = {}
+    ticks = suite.number * (suite.repeat + 1)
+    for window in WINDOWS:
+        # tick 모드용으로 윈도우 + 틱 수만큼 생성 (최신 순)
+        ltf_series, sources[LTF] = load_series(args, LTF, LTF_MINUTES, window + ticks, rng)
+        htf_series, sources[HTF] = load_series(args, HTF, HTF_MINUTES, window + ticks, rng)
+        params = {"window": window}
+
+        df = pd.DataFrame(sorted(ltf_series[:window], key=lambda candle: candle["candle_date_time_kst"]))
+        df = df.rename(columns={"high_price": "high", "low_price": "low", "trade_price": "close"})[["high", "low", "close"]]
+        service = make_analysis_service()
+        suite.run("candle_analysis._calculate_ichimoku", params, lambda: service._calculate_ichimoku(df.copy()))
+
+        chart = make_chart(args.market, ltf_series[:window], htf_series[:window])
+        asyncio.run(suite.run_async("candle_analysis.execute_trade_decision", {**params, "mode": "cold"},
+                                    lambda: make_analysis_service().execute_trade_decision(chart)))
+
+        # 과거에서 현재로 캔들이 하나씩 마감되는 틱을 재현 (증분 계산기 경로)
+        charts = [make_chart(args.market, ltf_series[i:i + window], htf_series[i:i + window]) for i in range(ticks, -1, -1)]
+        tick_service = make_analysis_service()
+        position = {"index": 0}
+
+        async def next_tick():
+            chart = charts[position["index"] % len(charts)]
+            position["index"] += 1
+            await tick_service.execute_trade_decision(chart)
+
+        asyncio.run(suite.run_async("candle_analysis.execute_trade_decision", {**params, "mode": "tick"}, next_tick))
+    return sources
+
+def bench_prompt(suite: Suite, args, rng: random.Random):
+    candle_service = CandleService()
+    for size in (125, 500):
+        candles, _ = load_series(args, LTF, LTF_MINUTES, size, rng)
+        suite.run("candle_service.candle_to_json", {"candles": size}, lambda: candle_service.candle_to_json(candles))
+
+    with open(args.scheme, "r") as f:
+        request_scheme = f.read()
+    chart = CandleChart()
+    chart.set_market(args.market)
+    for timeframe, minutes in (("5m", 5), ("1h", 60), ("4h", 240)):
+        chart.set_candles(timeframe, load_series(args, timeframe, minutes, 125, rng)[0])
+    chart.set_current_price(chart.get_series("5m").last_close())
+    for candle_format in (CandleService.FORMAT_JSON, CandleService.FORMAT_COMPACT):
+        llm_service = LLMService(request_scheme, candle_format=candle_format)
+        llm_service.set_candle_service(candle_service)
+        suite.run("llm_service._generate_prompt", {"format": candle_format, "timeframes": 3, "candles": 125},
+                  lambda: llm_service._generate_prompt(chart))
+
+def bench_parse(suite: Suite, args):
+    with open(args.response_scheme, "r") as f:
+        response_scheme = f.read()
+    client = GeminiClient(llm_key="offline", llm_model="offline", llm_response_scheme=response_scheme)
+    valid = json.dumps({"decisions": [
+        {"market": f"KRW-C{i}", "action": "hold", "reason": "Uptrend confirmed on 4h with rising volume. " * 4}
+        for i in range(5)
+    ]})
+    cases = {
+        "valid": valid,
+        "wrapped": f"Here is my analysis:\n```json\n{valid}\n```\nGood luck.",
+        "invalid": "I cannot decide { action: hold",
+    }
+    for case, text in cases.items():
+        suite.run("gemini_client._validate_and_parse_response", {"case": case}, lambda: client._validate_and_parse_response(text))
+
+def bench_metrics(suite: Suite):
+    for enabled in (False, True):
+        metrics = Metrics(enabled=enabled)
+
+        def span():
+            with metrics.stage("decision", "KRW-BTC"):
+                pass
+
+        suite.run("metrics.stage", {"enabled": enabled}, span, number=suite.number * 100)
+
+async def measure_loop_lag(markets: list, executor: DecisionExecutor) -> tuple:
+    """
+    markets의 결정을 동시에 실행하는 동안 1ms 주기 하트비트가 늦게 깨어난 최대 시간을 잽니다.
+
+    Returns:
+        tuple: (전체 소요 시간, 최대 루프 지연) 마이크로초
+    """
+    done = asyncio.Event()
+    lags = [0.0]
+
+    async def heartbeat():
+        while not done.is_set():
+            expected = time.perf_counter() + 0.001
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - expected)
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0) # 하트비트가 먼저 대기 상태가 되도록
+    started = time.perf_counter()
+    await asyncio.gather(*(make_analysis_service(executor).execute_trade_decision(chart) for chart in markets))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker
+    return elapsed * 1e6, max(lags) * 1e6
+
+def bench_executor(suite: Suite, args, rng: random.Random):
+    if not suite.selected("decision_executor"):
+        return
+    window = WINDOWS[-1]
+    markets = [
+        make_chart(f"{args.market}-{i}", load_series(args, LTF, LTF_MINUTES, window, rng)[0],
+                   load_series(args, HTF, HTF_MINUTES, window, rng)[0])
+        for i in range(args.executor_markets)
+    ]
+    for mode in DecisionExecutor.MODES:
+        executor = DecisionExecutor(mode, args.executor_workers)
+        try:
+            asyncio.run(measure_loop_lag(markets[:1], executor)) # 풀 기동(프로세스 spawn)은 측정에서 제외
+            elapsed, lags = [], []
+            for _ in range(suite.repeat):
+                total_us, lag_us = asyncio.run(measure_loop_lag(markets, executor))
+                elapsed.append(total_us)
+                lags.append(lag_us)
+        finally:
+            executor.close()
+        params = {"mode": mode, "workers": executor.get_stats()["workers"], "markets": len(markets), "window": window}
+        suite.record("decision_executor.markets", params, elapsed, 1)
+        suite.record("decision_executor.max_loop_lag", params, lags, 1)
+
+async def bench_fetch(suite: Suite, args):
+    if not suite.selected("upbit_client.fetch_candle_chart"):
+        return
+    timeframe_config = {LTF: 125, HTF: 125}
+    runner, base_url = await start_stub_server(args.latency_ms)
+    try:
+        for use_repo in (False, True):
+            client = UpbitClient(args.market, base_url=base_url, share_until_close=False)
+            repo = CandleRepo(":memory:") if use_repo else None
+            if repo:
+                client.set_candle_repo(repo)
+            await client.start()
+            try:
+                await suite.run_async(
+                    "upbit_client.fetch_candle_chart",
+                    {"candle_repo": use_repo, "latency_ms": args.latency_ms, "timeframes": timeframe_config},
+                    lambda: client.fetch_candle_chart(timeframe_config),
+                    number=max(1, suite.number // 10)
+                )
+            finally:
+                await client.close()
+                if repo:
+                    repo.close()
+    finally:
+        await runner.cleanup()
+
+def git_revision() -> (str | None):
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """기준 결과보다 median이 threshold배 이상 느려진 항목"""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    previous = {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if before is None or not before["median_us"]:
+            continue
+        ratio = result["median_us"] / before["median_us"]
+        result["baseline_median_us"] = before["median_us"]
+        result["ratio_vs_baseline"] = round(ratio, 3)
+        if ratio >= threshold:
+            regressions.append(result)
+    return regressions
+
+def main(args) -> int:
+    number, repeat = (5, 3) if args.quick else (args.number, args.repeat)
+    suite = Suite(number, repeat, args.only)
+    rng = random.Random(args.seed)
+
+    sources = bench_analysis(suite, args, rng)
+    bench_prompt(suite, args, rng)
+    bench_parse(suite, args)
+    bench_metrics(suite)
+    bench_executor(suite, args, rng)
+    asyncio.run(bench_fetch(suite, args))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "candle_source": sources,
+        "results": suite.results,
+    }
+    regressions = compare(suite.results, args.baseline, args.threshold) if args.baseline else []
+    report["regressions"] = [
+        {"name": r["name"], "params": r["params"], "ratio_vs_baseline": r["ratio_vs_baseline"]} for r in regressions
+    ]
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(suite.results)} results to {args.output}", file=sys.stderr)
+    for regression in report["regressions"]:
+        print(f"REGRESSION {regression['name']} {json.dumps(regression['params'])}: x{regression['ratio_vs_baseline']}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the decision and data hot paths")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=1.2, help="median이 이 배수 이상 느려지면 회귀로 보고")
+    parser.add_argument("--number", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="적은 반복으로 빠르게 실행")
+    parser.add_argument("--only", default=None, help="이름에 이 문자열이 포함된 벤치마크만 실행")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--candle-store", default=None, help="기록된 캔들을 읽을 로컬 캔들 저장소(SQLite) 경로")
+    parser.add_argument("--scheme", default="./scheme/request.scheme.md")
+    parser.add_argument("--response-scheme", default="./scheme/response.scheme.json")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="스텁 Upbit 서버 응답 지연")
+    parser.add_argument("--executor-markets", type=int, default=32, help="실행기 벤치마크에서 동시에 결정할 마켓 수")
+    parser.add_argument("--executor-workers", type=int, default=None, help="실행기 벤치마크의 풀 작업자 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(main(parser.parse_args()))
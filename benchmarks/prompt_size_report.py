@@ -0,0 +1,121 @@
+"""
+LLM 프롬프트 캔들 인코딩 형식별 크기 비교 리포트.
+
+같은 캔들 차트로 형식(json, table, delta, indexed, compact)마다 LLMService 프롬프트를 만들어
+전체/캔들 섹션 바이트 수, 추정 토큰 수, JSON 대비 비율, 토큰 예산 안에 넣을 수 있는 마켓 수를 JSON으로 출력합니다.
+기본은 시드 고정 합성 캔들(랜덤 워크)이며, --candle-store를 주면 로컬 캔들 저장소의 실제 캔들을 사용합니다.
+
+사용법:
+    python -m benchmarks.prompt_size_report --timeframes 5m,1h,4h --candles 125 --token-budget 100000
+    python -m benchmarks.prompt_size_report --candle-store ./candles.db --market KRW-BTC --timeframes 5m,4h
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from dtos.candle_chart import CandleChart
+from services.candle_service import CandleService
+from services.llm_service import LLMService
+from services.token_estimator import estimate_tokens
+
+UNIT_MINUTES = {"m": 1, "h": 60, "d": 1440, "w": 10080}
+
+def parse_minutes(timeframe: str) -> int:
+    if timeframe[-1] in UNIT_MINUTES:
+        return int(timeframe[:-1]) * UNIT_MINUTES[timeframe[-1]]
+    return int(timeframe)
+
+def make_random_walk_candles(market: str, minutes: int, count: int, rng: random.Random) -> list:
+    """Upbit 응답과 같은 형식(최신 순)의 랜덤 워크 캔들. 가격은 호가 단위(1000원), 거래량은 소수 8자리"""
+    now = datetime.fromtimestamp(int(time.time()) // (minutes * 60) * (minutes * 60))
+    price = 120_000_000.0
+    candles = []
+    for i in range(count):
+        open_price = price
+        close_price = max(1000.0, round(open_price * (1 + rng.gauss(0, 0.004)), -3))
+        high_price = max(open_price, close_price) + rng.randint(0, 20) * 1000.0
+        low_price = min(open_price, close_price) - rng.randint(0, 20) * 1000.0
+        open_time = now - timedelta(minutes=minutes * i)
+        candles.append({
+            "market": market,
+            "candle_date_time_kst": open_time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "opening_price": open_price,
+            "trade_price": close_price,
+            "high_price": high_price,
+            "low_price": low_price,
+            "candle_acc_trade_volume": round(rng.uniform(0.5, 80), 8),
+        })
+        price = close_price
+    return candles
+
+def load_chart(args) -> CandleChart:
+    chart = CandleChart()
+    chart.set_market(args.market)
+    timeframes = [timeframe.strip() for timeframe in args.timeframes.split(",") if timeframe.strip()]
+    if args.candle_store:
+        from repos.candle_repo import CandleRepo
+
+        repo = CandleRepo(args.candle_store)
+        try:
+            for timeframe in timeframes:
+                chart.set_candles(timeframe, repo.get_latest(args.market, timeframe, args.candles))
+        finally:
+            repo.close()
+    else:
+        rng = random.Random(args.seed)
+        for timeframe in timeframes:
+            chart.set_candles(timeframe, make_random_walk_candles(args.market, parse_minutes(timeframe), args.candles, rng))
+    latest = chart.get_series(timeframes[0])
+    chart.set_current_price(latest.last_close() if latest else None)
+    return chart
+
+def build_report(chart: CandleChart, request_scheme: str, token_budget: int) -> dict:
+    candle_service = CandleService()
+    # 캔들 섹션을 뺀 나머지(지시문 등) 크기
+    fixed_prompt = request_scheme.replace("$candle_data_section", "")
+    fixed_tokens = estimate_tokens(fixed_prompt)
+
+    results = {}
+    for candle_format in CandleService.FORMATS:
+        llm_service = LLMService(request_scheme, candle_format=candle_format)
+        llm_service.set_candle_service(candle_service)
+        prompt = llm_service._generate_prompt(chart)
+        section_bytes = len(prompt.encode()) - len(fixed_prompt.encode())
+        section_tokens = estimate_tokens(prompt) - fixed_tokens
+        results[candle_format] = {
+            "prompt_bytes": len(prompt.encode()),
+            "prompt_tokens_est": estimate_tokens(prompt),
+            "candle_section_bytes": section_bytes,
+            "candle_section_tokens_est": section_tokens,
+            # 지시문은 한 번만 넣고 마켓별 캔들 섹션만 반복한다고 가정
+            "markets_per_token_budget": max(0, (token_budget - fixed_tokens) // max(1, section_tokens)),
+        }
+
+    baseline = results[CandleService.FORMAT_JSON]
+    for result in results.values():
+        result["bytes_vs_json"] = round(result["candle_section_bytes"] / baseline["candle_section_bytes"], 3)
+        result["tokens_vs_json"] = round(result["candle_section_tokens_est"] / baseline["candle_section_tokens_est"], 3)
+    return {
+        "market": chart.market,
+        "timeframes": {timeframe: len(chart.get_series(timeframe) or []) for timeframe in chart.get_all_timeframes()},
+        "token_budget": token_budget,
+        "instruction_tokens_est": fixed_tokens,
+        "formats": results,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare prompt size across candle encodings")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--timeframes", default="5m,1h,4h")
+    parser.add_argument("--candles", type=int, default=125)
+    parser.add_argument("--candle-store", default=None, help="로컬 캔들 저장소(SQLite) 경로. 없으면 합성 캔들 사용")
+    parser.add_argument("--scheme", default="./scheme/request.scheme.md")
+    parser.add_argument("--token-budget", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with open(args.scheme, "r") as f:
+        request_scheme = f.read()
+    print(json.dumps(build_report(load_chart(args), request_scheme, args.token_budget), indent=2))
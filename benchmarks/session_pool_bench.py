@@ -0,0 +1,107 @@
+"""
+UpbitClient 장기 세션(커넥션 풀) vs 호출마다 새 세션 벤치마크.
+
+로컬 스텁 서버(/v1/candles/minutes/{unit})를 띄운 뒤, 틱마다 여러 마켓의 캔들 차트를
+동시에 가져오는 데 걸리는 시간을 두 방식으로 측정해 비교합니다.
+로컬 HTTP라 TLS 핸드셰이크 비용은 포함되지 않으므로, 실제 api.upbit.com에서는 차이가 더 큽니다.
+
+사용법:
+    python -m benchmarks.session_pool_bench --ticks 50 --markets 10 --latency-ms 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+from clients.upbit_client import UpbitClient
+
+TIMEFRAME_CONFIG = {"5m": 125, "4h": 125}
+
+def make_candles(market: str, unit: int, count: int) -> list:
+    """요청 형식에 맞는 합성 캔들을 최신 순으로 생성합니다."""
+    now = datetime.now().replace(second=0, microsecond=0)
+    now -= timedelta(minutes=now.minute % unit)
+    candles = []
+    for i in range(count):
+        open_time = now - timedelta(minutes=unit * i)
+        price = 100000 + (i % 50) * 10
+        candles.append({
+            "market": market,
+            "candle_date_time_utc": (open_time - timedelta(hours=9)).isoformat(),
+            "candle_date_time_kst": open_time.isoformat(),
+            "opening_price": price,
+            "high_price": price + 20,
+            "low_price": price - 20,
+            "trade_price": price + 5,
+            "timestamp": int(open_time.timestamp() * 1000),
+            "candle_acc_trade_price": 1000000.0,
+            "candle_acc_trade_volume": 10.0,
+            "unit": unit,
+        })
+    return candles
+
+async def start_stub_server(latency_ms: float) -> tuple:
+    async def candles_handler(request: web.Request) -> web.Response:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        unit = int(request.match_info["unit"])
+        count = min(int(request.query.get("count", 1)), 200)
+        return web.json_response(make_candles(request.query.get("market"), unit, count))
+
+    app = web.Application()
+    app.router.add_get("/v1/candles/minutes/{unit}", candles_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+async def measure(base_url: str, markets: int, ticks: int, pooled: bool) -> list:
+    clients = [UpbitClient(f"KRW-C{i}", base_url=base_url, share_until_close=False) for i in range(markets)]
+    if pooled:
+        for client in clients:
+            await client.start()
+    try:
+        # 워밍업 1틱 (풀 연결 생성)
+        await asyncio.gather(*(client.fetch_candle_chart(TIMEFRAME_CONFIG) for client in clients))
+        latencies = []
+        for _ in range(ticks):
+            started = time.perf_counter()
+            await asyncio.gather(*(client.fetch_candle_chart(TIMEFRAME_CONFIG) for client in clients))
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
+    finally:
+        for client in clients:
+            await client.close()
+
+def summarize(latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+async def run(args):
+    runner, base_url = await start_stub_server(args.latency_ms)
+    try:
+        results = {
+            "per_call_session": summarize(await measure(base_url, args.markets, args.ticks, pooled=False)),
+            "pooled_session": summarize(await measure(base_url, args.markets, args.ticks, pooled=True)),
+        }
+    finally:
+        await runner.cleanup()
+    print(json.dumps({"markets": args.markets, "ticks": args.ticks, "results": results}, indent=4))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UpbitClient pooled session benchmark")
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--markets", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,108 @@
+import bisect
+from array import array
+
+from dtos.candle_series import CandleSeries
+
+class ResampleState:
+    """한 (마켓, 상위 시간대)의 리샘플링 상태"""
+
+    __slots__ = ("closed", "next_start")
+
+    def __init__(self, closed: CandleSeries, next_start: int):
+        self.closed = closed # 마감된 상위 캔들 (과거 순)
+        self.next_start = next_start # 아직 마감되지 않은 첫 상위 버킷의 시작 시각(epoch 초)
+
+class CandleResampler:
+    """
+    기준 시간대(ex. 5m) 캔들 시계열로 상위 시간대(ex. 1h, 4h) OHLCV 캔들을 만드는 리샘플러.
+
+    버킷은 epoch 초를 상위 시간대 길이로 나눈 경계에 맞추며, 이는 Upbit 분봉의 KST 경계
+    (ex. 240분봉은 KST 01:00, 05:00, 09:00, ...)와 같습니다. 거래가 없어 빠진 기준 캔들은 건너뛰고
+    남은 캔들로 버킷을 만들므로, 거래가 전혀 없던 버킷은 Upbit와 마찬가지로 생기지 않습니다.
+
+    마감된 상위 캔들은 (마켓, 시간대)별로 보관하고, 호출마다 아직 열려 있는 버킷
+    (가장 최신 기준 캔들이 속한 버킷)과 그 사이에 새로 마감된 버킷의 기준 캔들만 다시 집계합니다.
+    """
+
+    def __init__(self):
+        self.__states = {} # (마켓, 상위 시간대 분) -> ResampleState
+
+    def resample(self, market: str, base: CandleSeries, unit: int, count: int) -> CandleSeries:
+        """
+        기준 시계열로 상위 시간대 캔들을 만듭니다.
+
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            base (CandleSeries): 기준 시간대 캔들 시계열 (과거 순, 마지막 캔들은 진행 중일 수 있음)
+            unit (int): 상위 시간대 (분)
+            count (int): 필요한 마감 캔들 수. 진행 중 캔들을 포함해 최대 count + 1개를 반환
+
+        Returns:
+            CandleSeries: 과거 순 상위 시간대 캔들 시계열. 기준 이력이 짧으면 count + 1개보다 적을 수 있음
+        """
+        bucket_seconds = unit * 60
+        times = base.times
+        if not len(times):
+            return CandleSeries(market)
+
+        key = (market, unit)
+        state = self.__states.get(key)
+        first_start = self.__first_full_bucket(times, bucket_seconds)
+        if first_start is None:
+            return CandleSeries(market)
+        if state is None or not self.__can_continue(state, times, first_start, count):
+            # 처음이거나 기준 윈도우가 보관 상태와 이어지지 않음 (재시작, 오래 멈춘 경우 등) -> 윈도우 전체로 다시 계산
+            state = self.__states[key] = ResampleState(CandleSeries(market), first_start)
+
+        start = bisect.bisect_left(times, state.next_start)
+        buckets = self.__aggregate(market, base, start, bucket_seconds)
+        last = len(buckets) - 1
+        if last > 0:
+            # 가장 최신 버킷 이전의 버킷은 모든 기준 캔들이 마감됨
+            state.closed = state.closed.merge(buckets.slice(0, last)).tail(count)
+            state.next_start = buckets.times[last]
+        return state.closed.merge(buckets.slice(last)).tail(count + 1)
+
+    def __can_continue(self, state: ResampleState, times, first_start: int, count: int) -> bool:
+        """보관 상태에 이어서 집계할 수 있는지 여부"""
+        if state.next_start < times[0] or state.next_start > times[-1]:
+            return False
+        # 마감 캔들이 모자라는데 기준 윈도우가 더 과거까지 있다면 (요청 개수 증가, 이력 보충) 다시 계산
+        earliest = state.closed.times[0] if len(state.closed) else state.next_start
+        return len(state.closed) >= count or first_start >= earliest
+
+    def __first_full_bucket(self, times, bucket_seconds: int) -> (int | None):
+        """
+        윈도우의 첫 버킷은 앞부분이 잘려 있을 수 있으므로, 첫 캔들이 버킷 시작과 같지 않으면 다음 버킷부터 사용합니다.
+        사용할 수 있는 버킷이 없으면 None
+        """
+        first = times[0] - times[0] % bucket_seconds
+        if times[0] == first:
+            return first
+        following = first + bucket_seconds
+        return following if following <= times[-1] else None
+
+    def __aggregate(self, market: str, base: CandleSeries, start: int, bucket_seconds: int) -> CandleSeries:
+        """base[start:]를 상위 버킷별 OHLCV로 집계합니다."""
+        times, opens, highs, lows, closes, volumes = base.columns()
+        out_times = array(CandleSeries.TIME_TYPECODE)
+        out_opens, out_highs, out_lows, out_closes, out_volumes = (array(CandleSeries.VALUE_TYPECODE) for _ in range(5))
+        current = None
+        for i in range(start, len(times)):
+            bucket = times[i] - times[i] % bucket_seconds
+            if bucket != current:
+                current = bucket
+                out_times.append(bucket)
+                out_opens.append(opens[i])
+                out_highs.append(highs[i])
+                out_lows.append(lows[i])
+                out_closes.append(closes[i])
+                out_volumes.append(volumes[i])
+                continue
+            if highs[i] > out_highs[-1]:
+                out_highs[-1] = highs[i]
+            if lows[i] < out_lows[-1]:
+                out_lows[-1] = lows[i]
+            out_closes[-1] = closes[i]
+            out_volumes[-1] += volumes[i]
+        return CandleSeries(market, out_times, out_opens, out_highs, out_lows, out_closes, out_volumes)
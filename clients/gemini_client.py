@@ -1,19 +1,70 @@
+import asyncio
 import json
-from google import genai
-from google.genai import types
+import math
+import time
+from collections import deque
+from typing import TYPE_CHECKING
 import re # 정규 표현식 모듈 추가
 
+if TYPE_CHECKING:
+    from google.genai import types
+
 class GeminiClient:
     # 매직 문자열을 상수로 정의
     ACTION_KEY = "action"
     REASON_KEY = "reason"
     WAIT_ACTION = "wait"
 
-    def __init__(self, llm_key: str, llm_model: str, llm_response_scheme: str, debug = False):
-        self.__client = genai.Client(api_key=llm_key) # LLM API 클라이언트 초기화
+    DEFAULT_TIMEOUT = 30.0 # 호출 1건의 기본 마감 시간(초)
+    DEFAULT_MAX_CONCURRENCY = 4 # 동시에 진행할 수 있는 LLM 요청 수
+    LATENCY_WINDOW = 100 # 헤지 기준 백분위를 계산할 최근 지연 시간 표본 수
+    MIN_HEDGE_SAMPLES = 10 # 헤지를 시작하기 전 필요한 최소 표본 수
+
+    def __init__(self,
+                 llm_key: str,
+                 llm_model: str,
+                 llm_response_scheme: str,
+                 debug = False,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 hedge_percentile: float = None,
+                 base_url: str = None):
+        """
+        Args:
+            llm_key (str): LLM API 키
+            llm_model (str): LLM 모델 이름
+            llm_response_scheme (str): LLM 응답 구조 (JSON 문자열)
+            debug (bool): 디버그 모드 활성화 여부
+            timeout (float): 비동기 호출 1건의 마감 시간(초). 넘기면 'wait' 응답을 반환
+            max_concurrency (int): 동시에 진행할 수 있는 LLM 요청 수
+            hedge_percentile (float): 첫 요청이 최근 지연 시간의 이 백분위(ex. 95)를 넘기면 두 번째 요청을 보냄. None이면 헤지하지 않음
+            base_url (str): Gemini API 주소. 로컬 가짜 서버로 테스트할 때 지정
+        """
+        self.__llm_key = llm_key
+        self.__base_url = base_url
+        self.__client = None # google.genai 임포트 비용이 커서 첫 요청 때 생성
         self.__llm_model = llm_model
         self.__llm_response_scheme = json.loads(llm_response_scheme) # LLM 응답 구조 초기화
         self.__debug = debug
+        self.__timeout = timeout
+        self.__max_concurrency = max_concurrency
+        self.__semaphore: asyncio.Semaphore = None # 이벤트 루프 안에서 처음 사용할 때 생성
+        self.__hedge_percentile = hedge_percentile
+        self.__latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.__stats = {"calls": 0, "timeouts": 0, "errors": 0, "hedged": 0, "hedge_wins": 0}
+
+    def __get_client(self):
+        """LLM API 클라이언트. 처음 호출할 때 google.genai를 임포트하고 생성합니다."""
+        if self.__client is None:
+            from google import genai
+            from google.genai import types
+
+            http_options = types.HttpOptions(base_url=self.__base_url) if self.__base_url else None
+            self.__client = genai.Client(api_key=self.__llm_key, http_options=http_options)
+        return self.__client
+
+    def get_model(self) -> str:
+        return self.__llm_model
 
     def _create_error_response(self, reason: str) -> str:
         """지정된 이유로 기본 오류 JSON 응답을 생성합니다."""
@@ -75,30 +126,140 @@ class GeminiClient:
             print(f"GeminiClient: Sending prompt to LLM: {prompt}")
 
         try:
-            response = self.__client.models.generate_content(
+            response = self.__get_client().models.generate_content(
                 model=self.__llm_model,
                 contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.0,
-                    response_mime_type="application/json",
-                    response_schema=self.__llm_response_scheme,
-                )
+                config=self.__build_config()
             )
+            return self.__parse_raw_response(response.text)
+        except Exception as e: # 기타 예외 처리
+            if self.__debug:
+                print(f"GeminiClient: Unexpected error during LLM API call: {str(e)}")
+            # 예기치 않은 오류 발생 시 - 헬퍼 사용
+            return self._create_error_response(f"Unexpected Error: {str(e)}")
 
-            raw_response_text = response.text
+    async def generate_answer_async(self, prompt: str, timeout: float = None) -> str:
+        """
+        generate_answer의 비동기 버전. 이벤트 루프를 막지 않으며 마감 시간과 동시 요청 수 제한을 적용합니다.
+        hedge_percentile이 설정되어 있으면, 첫 요청이 최근 지연 시간의 해당 백분위를 넘길 때
+        같은 요청을 한 번 더 보내 먼저 도착한 응답을 사용합니다.
+        Args:
+            prompt (str): LLM에 제공할 프롬프트 문자열.
+            timeout (float): 이 호출의 마감 시간(초). None이면 생성 시 지정한 값 사용.
+        Returns:
+            str: LLM이 생성하고 검증한 유효한 JSON 문자열. 마감 시간 초과나 오류 시 기본 'wait' JSON을 반환합니다.
+        """
+        if self.__debug:
+            print(f"GeminiClient: Sending prompt to LLM (async): {prompt}")
 
+        deadline = timeout if timeout is not None else self.__timeout
+        self.__stats["calls"] += 1
+        try:
+            raw_response_text = await asyncio.wait_for(self.__request_with_hedge(prompt), timeout=deadline)
+            return self.__parse_raw_response(raw_response_text)
+        except asyncio.TimeoutError:
+            self.__stats["timeouts"] += 1
+            if self.__debug:
+                print(f"GeminiClient: LLM call exceeded deadline of {deadline}s")
+            return self._create_error_response(f"LLM deadline exceeded ({deadline}s)")
+        except Exception as e:
+            self.__stats["errors"] += 1
             if self.__debug:
-                print(f"GeminiClient: Received raw response from LLM: {raw_response_text}")
+                print(f"GeminiClient: Unexpected error during async LLM API call: {str(e)}")
+            return self._create_error_response(f"Unexpected Error: {str(e)}")
 
-            # 응답 유효성 검사 및 파싱 위임
-            parsed_response = self._validate_and_parse_response(raw_response_text)
+    def get_hedge_delay(self) -> float:
+        """헤지 요청을 보내기까지 기다릴 시간(초). 헤지를 사용하지 않거나 표본이 부족하면 None"""
+        if self.__hedge_percentile is None or len(self.__latencies) < self.MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self.__latencies)
+        index = min(len(ordered) - 1, math.ceil(self.__hedge_percentile / 100 * len(ordered)) - 1)
+        return ordered[max(0, index)]
 
-            if self.__debug:
-                print(f"GeminiClient: Parsed response: {parsed_response}")
+    def get_stats(self) -> dict:
+        """비동기 호출 수, 마감 초과 수, 오류 수, 헤지 요청 수, 헤지 요청이 먼저 도착한 수"""
+        stats = dict(self.__stats)
+        stats["hedge_delay_seconds"] = self.get_hedge_delay()
+        return stats
 
-            return parsed_response
-        except Exception as e: # 기타 예외 처리
-            if self.__debug:
-                print(f"GeminiClient: Unexpected error during LLM API call: {str(e)}")
-            # 예기치 않은 오류 발생 시 - 헬퍼 사용
-            return self._create_error_response(f"Unexpected Error: {str(e)}")
\ No newline at end of file
+    def __build_config(self) -> "types.GenerateContentConfig":
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            temperature=0.0,
+            response_mime_type="application/json",
+            response_schema=self.__llm_response_scheme,
+        )
+
+    def __parse_raw_response(self, raw_response_text: str) -> str:
+        if self.__debug:
+            print(f"GeminiClient: Received raw response from LLM: {raw_response_text}")
+
+        # 응답 유효성 검사 및 파싱 위임
+        parsed_response = self._validate_and_parse_response(raw_response_text)
+
+        if self.__debug:
+            print(f"GeminiClient: Parsed response: {parsed_response}")
+
+        return parsed_response
+
+    async def __request(self, prompt: str, acquired: asyncio.Event = None) -> str:
+        """
+        동시 요청 수 제한 안에서 비동기 요청 1건을 보내고, 성공한 요청의 지연 시간을 기록합니다.
+
+        Args:
+            prompt (str): LLM에 보낼 프롬프트
+            acquired (asyncio.Event, optional): 동시 요청 슬롯을 얻으면 설정할 이벤트
+        """
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+        async with self.__semaphore:
+            if acquired is not None:
+                acquired.set()
+            started = time.monotonic()
+            response = await self.__get_client().aio.models.generate_content(
+                model=self.__llm_model,
+                contents=prompt,
+                config=self.__build_config()
+            )
+            self.__latencies.append(time.monotonic() - started)
+            return response.text
+
+    async def __request_with_hedge(self, prompt: str) -> str:
+        hedge_delay = self.get_hedge_delay()
+        if hedge_delay is None:
+            return await self.__request(prompt)
+
+        acquired = asyncio.Event()
+        primary = asyncio.create_task(self.__request(prompt, acquired))
+        tasks = {primary}
+        try:
+            # 지연 시간 표본처럼 동시 요청 슬롯을 얻은 뒤부터 헤지 대기 시간을 잼
+            # (슬롯이 모두 차서 줄 서 있는 동안 헤지를 보내면 과부하일 때 부하만 늘어남)
+            acquiring = asyncio.create_task(acquired.wait())
+            try:
+                await asyncio.wait({primary, acquiring}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                acquiring.cancel()
+            if not primary.done():
+                await asyncio.wait(tasks, timeout=hedge_delay)
+            if not primary.done():
+                # 첫 요청이 느린 꼬리에 걸렸으므로 같은 요청을 한 번 더 보냄
+                self.__stats["hedged"] += 1
+                if self.__debug:
+                    print(f"GeminiClient: No response after {hedge_delay:.3f}s, sending hedged request")
+                tasks.add(asyncio.create_task(self.__request(prompt)))
+
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.__stats["hedge_wins"] += 1
+                        return task.result()
+                if not tasks:
+                    # 모든 요청이 실패한 경우 마지막 오류를 그대로 전달
+                    raise done.pop().exception()
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,174 @@
+import bisect
+from array import array
+
+from dtos.candle_chart import CandleChart
+from dtos.candle_series import CandleSeries
+
+class HistoricalCandleClient:
+    """
+    백테스트용 UpbitClient 대용품. 기준 시간대(ex. 5m) 캔들 이력을 재생하며, 커서 시점에 Upbit가 돌려줬을
+    다중 시간대 캔들 차트를 커서 이후의 데이터 없이(룩어헤드 없이) 구성합니다.
+
+    커서 index는 기준 캔들 index가 막 마감된 시점(그 캔들의 시작 + 기준 시간대 길이)이며, 실거래 루프가
+    캔들 마감 직후 차트를 조회하는 시점과 같습니다. 이때 Upbit 응답은 시간대마다 마감 캔들 count개와 진행 중 캔들 1개입니다.
+    - 기준 시간대: 커서까지의 마감 캔들 + 방금 열린 진행 중 캔들
+    - 상위 시간대: 기준 캔들로 미리 집계한 마감 캔들 + 커서까지의 기준 캔들만으로 집계한 진행 중 캔들
+    방금 열린 캔들의 거래는 아직 알 수 없으므로, 진행 중 캔들이 커서 시점에 시작하는 경우에는
+    직전 종가의 평평한 캔들(시가=고가=저가=종가, 거래량 0)로 둡니다. 현재가는 방금 마감된 기준 캔들의 종가입니다.
+    상위 버킷 경계는 CandleResampler와 같이 epoch 초를 시간대 길이로 나눈 경계(Upbit 분봉의 KST 경계)입니다.
+    """
+
+    def __init__(self, market: str, base: CandleSeries, base_unit: int, timeframe_units: dict):
+        """
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            base (CandleSeries): 기준 시간대 캔들 이력 (과거 순, 모두 마감된 캔들)
+            base_unit (int): 기준 시간대 (분)
+            timeframe_units (dict): 시간대 -> 분 (ex. {'5m': 5, '4h': 240}). 기준 시간대의 배수여야 함
+        """
+        self.market = market
+        self.__base = base
+        self.__base_seconds = base_unit * 60
+        self.__units = {}
+        self.__closed = {} # 상위 시간대 -> 마감된 상위 캔들 시계열
+        self.__partial = {} # 상위 시간대 -> 기준 캔들 index별 (버킷 시작, 시가, 고가, 저가, 거래량) 누적 집계 열
+        for timeframe, unit in timeframe_units.items():
+            if unit % base_unit:
+                raise ValueError(f"{timeframe}({unit}분)는 기준 시간대({base_unit}분)의 배수가 아닙니다.")
+            self.__units[timeframe] = unit * 60
+            if unit != base_unit:
+                self.__closed[timeframe], self.__partial[timeframe] = self.__aggregate(unit * 60)
+        self.__index = None
+
+    def __len__(self) -> int:
+        return len(self.__base)
+
+    def __aggregate(self, bucket_seconds: int) -> tuple:
+        """
+        기준 캔들 전체를 상위 버킷으로 한 번에 집계합니다.
+        마감 캔들은 모든 기준 캔들이 이력 안에 있는 버킷만 담고, 앞부분이 잘린 첫 버킷은 제외합니다.
+        누적 집계 열의 i번째 값은 기준 캔들 i가 속한 버킷을 i까지만 집계한 값입니다. (종가는 기준 캔들 i의 종가)
+        """
+        times, opens, highs, lows, closes, volumes = self.__base.columns()
+        starts = array(CandleSeries.TIME_TYPECODE)
+        partial_opens, partial_highs, partial_lows, partial_volumes = (array(CandleSeries.VALUE_TYPECODE) for _ in range(4))
+        closed = [array(CandleSeries.TIME_TYPECODE)] + [array(CandleSeries.VALUE_TYPECODE) for _ in range(5)]
+        current = None
+        open_price = high = low = volume = 0.0
+        for i in range(len(times)):
+            bucket = times[i] - times[i] % bucket_seconds
+            if bucket != current:
+                if current is not None and current != self.__first_partial(times[0], bucket_seconds):
+                    self.__append(closed, current, open_price, high, low, closes[i - 1], volume)
+                current = bucket
+                open_price, high, low, volume = opens[i], highs[i], lows[i], volumes[i]
+            else:
+                if highs[i] > high:
+                    high = highs[i]
+                if lows[i] < low:
+                    low = lows[i]
+                volume += volumes[i]
+            starts.append(bucket)
+            partial_opens.append(open_price)
+            partial_highs.append(high)
+            partial_lows.append(low)
+            partial_volumes.append(volume)
+        # 마지막 버킷은 이력 끝에서 버킷이 끝나야 마감
+        if current is not None and len(times) and times[-1] + self.__base_seconds >= current + bucket_seconds \
+                and current != self.__first_partial(times[0], bucket_seconds):
+            self.__append(closed, current, open_price, high, low, closes[-1], volume)
+        partial = (memoryview(starts), memoryview(partial_opens), memoryview(partial_highs),
+                   memoryview(partial_lows), memoryview(partial_volumes))
+        return CandleSeries(self.market, *closed), partial
+
+    def __first_partial(self, first_time: int, bucket_seconds: int) -> (int | None):
+        """이력의 첫 캔들이 버킷 시작이 아니면 그 (앞부분이 잘린) 버킷의 시작 시각"""
+        bucket = first_time - first_time % bucket_seconds
+        return bucket if bucket != first_time else None
+
+    def __append(self, columns: list, start: int, open_price: float, high: float, low: float, close: float, volume: float):
+        for column, value in zip(columns, (start, open_price, high, low, close, volume)):
+            column.append(value)
+
+    def first_ready_index(self, timeframe_config: dict) -> int:
+        """
+        모든 시간대에 마감 캔들이 count개 이상 쌓이는 첫 커서 (실거래처럼 꽉 찬 윈도우로 시작하기 위한 워밍업 끝).
+        이력이 모자라면 len(self)
+        """
+        times = self.__base.times
+        ready = 0
+        for timeframe, count in timeframe_config.items():
+            if timeframe not in self.__closed:
+                ready = max(ready, count - 1)
+                continue
+            closed_times = self.__closed[timeframe].times
+            if len(closed_times) < count:
+                return len(times)
+            # count번째 마감 캔들의 끝 시각이 커서 시점 이전이어야 함
+            closes_at = closed_times[count - 1] + self.__units[timeframe] - self.__base_seconds
+            ready = max(ready, bisect.bisect_left(times, closes_at))
+        return min(ready, len(times))
+
+    def get_closed_candles(self, timeframe: str) -> CandleSeries:
+        """이력 전체의 마감 캔들 (기준 시간대는 이력 그대로, 상위 시간대는 집계된 마감 캔들)"""
+        return self.__closed.get(timeframe, self.__base)
+
+    def count_closed(self, timeframe: str, index: int) -> int:
+        """커서 index 시점에 마감되어 보이는 캔들 수 (get_closed_candles(timeframe) 앞에서부터)"""
+        if timeframe not in self.__closed:
+            return index + 1
+        # 커서 시점까지 끝난 버킷만 마감 캔들
+        now = self.__base.times[index] + self.__base_seconds
+        return bisect.bisect_right(self.__closed[timeframe].times, now - self.__units[timeframe])
+
+    def seek(self, index: int):
+        """커서를 기준 캔들 index가 막 마감된 시점으로 옮깁니다."""
+        self.__index = index
+
+    def now(self) -> int:
+        """커서 시점 (epoch 초)"""
+        return self.__base.times[self.__index] + self.__base_seconds
+
+    def current_price(self) -> float:
+        """커서 시점의 현재가 (방금 마감된 기준 캔들의 종가)"""
+        return self.__base.closes[self.__index]
+
+    def build_chart(self, timeframe_config: dict) -> CandleChart:
+        """커서 시점의 캔들 차트 (시간대마다 마감 캔들 최대 count개 + 진행 중 캔들)"""
+        index = self.__index
+        now = self.now()
+        price = self.current_price()
+        opening = (now, price, price, price, price, 0.0)
+
+        chart = CandleChart()
+        chart.set_market(self.market)
+        chart.set_current_price(price)
+        for timeframe, count in timeframe_config.items():
+            if timeframe not in self.__units:
+                raise ValueError(f"{timeframe}는 백테스트 데이터에 없는 시간대입니다.")
+            end = self.count_closed(timeframe, index)
+            closed = self.get_closed_candles(timeframe).slice(max(end - count, 0), end)
+            if timeframe not in self.__closed:
+                chart.set_candles(timeframe, self.__append_live(closed, opening))
+                continue
+            if now % self.__units[timeframe] == 0:
+                live = opening # 상위 버킷도 방금 열림
+            else:
+                starts, opens, highs, lows, volumes = self.__partial[timeframe]
+                live = (starts[index], opens[index], highs[index], lows[index], price, volumes[index])
+            chart.set_candles(timeframe, self.__append_live(closed, live))
+        return chart
+
+    def __append_live(self, closed: CandleSeries, live: tuple) -> CandleSeries:
+        """마감 캔들 뒤에 진행 중 캔들 한 행을 붙인 새 시계열 (CandleSeries.merge의 이어 붙이기와 같되 행 하나만)"""
+        columns = []
+        for column, value in zip(closed.columns(), live):
+            values = array(column.format)
+            values.frombytes(column.cast('B'))
+            values.append(value)
+            columns.append(values)
+        return CandleSeries(self.market, *columns)
+
+    async def fetch_candle_chart(self, timeframe_config: dict, market: str = None, deadline: float = None) -> CandleChart:
+        """UpbitClient.fetch_candle_chart와 같은 인터페이스. 커서 시점의 차트를 반환합니다."""
+        return self.build_chart(timeframe_config)
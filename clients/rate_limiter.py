@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """토큰 1개를 쓸 수 있을 때까지 남은 시간(초)"""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+class RateLimiter:
+    """
+    여러 마켓이 공유하는 Upbit 요청 스케줄러.
+    초당/분당 할당량을 각각 토큰 버킷으로 관리하며, 초당 버킷의 용량(burst)을 작게 두어
+    틱 시작 시점(0초)에 요청이 몰리지 않고 틱 전체에 고르게 퍼지도록 합니다.
+    대기 중인 요청은 도착 순서대로 처리됩니다.
+
+    응답의 Remaining-Req 헤더로 남은 할당량을 알려 주면 버킷의 토큰을 서버 기준으로 맞추고(update_remaining),
+    429 응답을 받으면 초당 속도를 절반으로 줄이고 잠시 요청을 멈춥니다(record_throttled).
+    이후 성공 응답마다 설정된 최대 속도까지 조금씩 다시 올립니다(AIMD).
+    """
+
+    DEFAULT_PER_SECOND = 10 # Upbit 시세 조회 API 초당 제한
+    DEFAULT_PER_MINUTE = 600 # Upbit 시세 조회 API 분당 제한
+    MIN_PER_SECOND = 1.0 # 429를 반복해서 받아도 내려가지 않는 최소 초당 속도
+    DECREASE_FACTOR = 0.5 # 429 응답 시 초당 속도에 곱하는 값
+    INCREASE_PER_SECOND = 1.0 # 성공 응답이 이어질 때 1초 동안 늘리는 초당 속도 (대략)
+    THROTTLE_PAUSE = 1.0 # 429 응답 후 모든 요청을 멈추는 시간(초). Upbit 초당 제한 창 크기
+
+    def __init__(self, per_second: float = DEFAULT_PER_SECOND, per_minute: float = DEFAULT_PER_MINUTE, burst: int = 1):
+        self.__max_per_second = per_second
+        self.__second_bucket = TokenBucket(per_second, burst)
+        self.__minute_bucket = TokenBucket(per_minute / 60, per_minute)
+        self.__lock = asyncio.Lock()
+        self.__blocked_until = 0.0 # 이 시각(monotonic)까지 요청하지 않음
+        self.__acquired = 0
+        self.__delayed = 0
+        self.__total_wait = 0.0
+        self.__throttled = 0
+        self.__remaining = {} # 마지막 Remaining-Req 헤더 값 (ex. {'min': 599, 'sec': 9})
+
+    async def acquire(self, deadline: float = None) -> bool:
+        """
+        요청 1건을 보낼 수 있을 때까지 대기한 뒤 토큰을 소비합니다.
+
+        Args:
+            deadline (float, optional): 이 시각(monotonic)까지 보낼 수 없으면 기다리지 않고 포기
+
+        Returns:
+            bool: 토큰을 얻었으면 True, 대기 시간이 deadline을 넘겨 포기했으면 False (토큰은 소비하지 않음)
+        """
+        if deadline is None:
+            await self.__lock.acquire()
+        else:
+            # 앞선 요청들의 대기 뒤에 줄 서는 시간도 deadline 안에서만 기다림
+            try:
+                await asyncio.wait_for(self.__lock.acquire(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                return False
+        try:
+            waited = False
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self.__second_bucket.wait_time(now),
+                    self.__minute_bucket.wait_time(now),
+                    self.__blocked_until - now
+                )
+                if wait <= 0:
+                    break
+                if deadline is not None and now + wait >= deadline:
+                    return False
+                waited = True
+                self.__total_wait += wait
+                await asyncio.sleep(wait)
+            self.__second_bucket.consume()
+            self.__minute_bucket.consume()
+            self.__acquired += 1
+            if waited:
+                self.__delayed += 1
+            return True
+        finally:
+            self.__lock.release()
+
+    def update_remaining(self, header: str):
+        """
+        Remaining-Req 헤더(ex. 'group=candles; min=599; sec=9')의 남은 할당량에 맞춰 토큰을 줄입니다.
+        응답 순서가 뒤바뀌어 오래된 값이 와도 토큰을 늘리지는 않으므로 안전한 쪽으로만 맞춰집니다.
+        """
+        remaining = {}
+        for part in header.split(";"):
+            key, _, value = part.strip().partition("=")
+            if key in ("min", "sec"):
+                try:
+                    remaining[key] = int(value)
+                except ValueError:
+                    pass
+        if not remaining:
+            return
+        self.__remaining = remaining
+        now = time.monotonic()
+        if "sec" in remaining:
+            self.__second_bucket.refill(now)
+            self.__second_bucket.tokens = min(self.__second_bucket.tokens, remaining["sec"])
+        if "min" in remaining:
+            self.__minute_bucket.refill(now)
+            self.__minute_bucket.tokens = min(self.__minute_bucket.tokens, remaining["min"])
+
+    def record_success(self):
+        """성공 응답. 초당 속도를 설정된 최대값까지 조금씩 올립니다."""
+        bucket = self.__second_bucket
+        if bucket.rate < self.__max_per_second:
+            bucket.refill(time.monotonic())
+            bucket.rate = min(self.__max_per_second, bucket.rate + self.INCREASE_PER_SECOND / bucket.rate)
+
+    def record_throttled(self, retry_after: float = None):
+        """
+        429 응답. 초당 속도를 줄이고 남은 토큰을 비운 뒤 잠시 모든 요청을 멈춥니다.
+
+        Args:
+            retry_after (float, optional): 서버가 알려 준 재시도 대기 시간(초)
+        """
+        now = time.monotonic()
+        bucket = self.__second_bucket
+        bucket.refill(now)
+        bucket.rate = max(self.MIN_PER_SECOND, bucket.rate * self.DECREASE_FACTOR)
+        bucket.tokens = min(bucket.tokens, 0)
+        self.__blocked_until = max(self.__blocked_until, now + (retry_after or self.THROTTLE_PAUSE))
+        self.__throttled += 1
+
+    def get_rate(self) -> float:
+        """현재 초당 요청 속도"""
+        return self.__second_bucket.rate
+
+    def get_stats(self) -> dict:
+        """지금까지의 요청 수, 대기한 요청 수, 누적 대기 시간(초), 429 응답 수, 현재 초당 속도, 마지막 남은 할당량"""
+        return {
+            "acquired": self.__acquired,
+            "delayed": self.__delayed,
+            "total_wait_seconds": round(self.__total_wait, 3),
+            "throttled": self.__throttled,
+            "rate_per_second": round(self.__second_bucket.rate, 2),
+            "remaining": dict(self.__remaining),
+        }
@@ -1,12 +1,79 @@
 import asyncio
+import contextvars
+import math
+import random
+import time
 import aiohttp
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from clients.candle_resampler import CandleResampler
+from clients.rate_limiter import RateLimiter
+from clients.upbit_stream import UpbitStream
 from dtos.candle_chart import CandleChart
+from dtos.candle_series import CandleSeries
+from repos.candle_repo import CandleRepo
+from settings.metrics import Metrics
+
+KST = timezone(timedelta(hours=9))
+
+# fetch_candle_chart(deadline=...)로 받은 틱 마감 시각(monotonic). 하위 요청 태스크에 그대로 전달됩니다.
+_request_deadline = contextvars.ContextVar("upbit_request_deadline", default=None)
+# fetch_candle_chart()의 틱 길이(초, 구성 중 가장 작은 시간대). 최근 결과는 이 틱의 마감까지만 재사용합니다.
+_tick_seconds = contextvars.ContextVar("upbit_tick_seconds", default=None)
+
+class UpbitRequestError(Exception):
+    """재시도 후에도 실패했거나 재시도할 수 없는 Upbit 요청 오류"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+class SharedCandles:
+    """같은 (마켓, 시간대) 캔들 요청을 공유하기 위한 진행 중 요청 또는 최근 결과"""
+
+    __slots__ = ("count", "task", "data", "valid_until")
+
+    def __init__(self, count: int, task: asyncio.Task = None, data: CandleSeries = None, valid_until: float = 0.0):
+        self.count = count # 요청한 캔들 수 (응답은 진행 중 캔들을 포함해 count + 1개)
+        self.task = task
+        self.data = data # 과거 순 캔들 시계열
+        self.valid_until = valid_until # 이 시각(epoch 초, 다음 캔들 또는 틱 마감 중 이른 시각)까지 재사용
 
 class UpbitClient:
-    def __init__(self, market: str, debug = False):
+    BASE_URL = "https://api.upbit.com"
+    MAX_CANDLES_PER_REQUEST = 200 # Upbit 캔들 API의 요청당 최대 개수
+    PAGE_CONCURRENCY = 4 # 페이지 요청 동시 실행 수
+
+    # 장기 세션 커넥터 설정
+    CONNECTION_LIMIT = 100 # 전체 동시 연결 수
+    CONNECTION_LIMIT_PER_HOST = 30 # 호스트당 동시 연결 수
+    DNS_CACHE_TTL = 300 # DNS 캐시 유지 시간(초)
+    KEEPALIVE_TIMEOUT = 60 # 유휴 연결 유지 시간(초)
+    REQUEST_TIMEOUT = 10 # 요청 전체 타임아웃(초)
+
+    # 429/5xx/연결 오류 재시도 설정 (지터를 준 지수 백오프)
+    MAX_RETRIES = 4 # 첫 요청 이후 최대 재시도 횟수
+    RETRY_BASE_DELAY = 0.2 # 첫 재시도 대기 상한(초). 재시도마다 2배
+    RETRY_MAX_DELAY = 5.0 # 재시도 대기 상한(초)
+
+    DEFAULT_MAX_BASE_CANDLES = 2000 # 리샘플링용 기준 시간대 윈도우 최대 캔들 수
+
+    def __init__(self, market: str, debug = False, base_url: str = BASE_URL, share_until_close: bool = True,
+                 resample_base: str = None, max_base_candles: int = DEFAULT_MAX_BASE_CANDLES):
+        """
+        Args:
+            market (str): 기본 거래소 마켓 (ex. KRW-BTC)
+            debug (bool): 디버그 모드 활성화 여부
+            base_url (str): Upbit API 주소. 로컬 가짜 서버 사용 시 지정
+            share_until_close (bool): 받은 캔들을 다음 캔들 마감까지 재사용할지 여부.
+                캔들 차트에서는 진행 중 캔들이 매 틱 갱신되도록 가장 작은 시간대의 다음 마감(틱 경계)까지만 재사용합니다.
+                False여도 동시에 들어온 같은 요청은 하나로 합칩니다.
+            resample_base (str, optional): 상위 시간대를 로컬에서 만들 기준 시간대 (ex. '5m'). 없으면 시간대별로 요청
+            max_base_candles (int): 리샘플링을 위해 유지할 기준 시간대 윈도우의 최대 캔들 수.
+                상위 시간대에 필요한 기준 캔들이 이보다 많으면 그 시간대는 직접 요청합니다.
+        """
         self.__market = market
+        self.__base_url = base_url.rstrip('/')
         # 지원하는 시간대와 각 시간대별 분 단위 매핑
         self.__timeframe_unit = {
             '1m': 1,
@@ -18,13 +85,218 @@ class UpbitClient:
             '1h': 60,
             '4h': 240
         }
+        if resample_base is not None and resample_base not in self.__timeframe_unit:
+            raise ValueError(f"지원하지 않는 리샘플링 기준 시간대입니다: {resample_base}")
+        if max_base_candles < 1:
+            raise ValueError("max_base_candles는 1 이상이어야 합니다.")
         self.__debug = debug
+        self.__resample_base = resample_base
+        self.__max_base_candles = max_base_candles
+        self.__resampler = CandleResampler()
+        self.__candle_repo: CandleRepo = None
+        self.__candle_stream: UpbitStream = None
+        self.__rate_limiter: RateLimiter = None
+        self.__page_semaphore = asyncio.Semaphore(self.PAGE_CONCURRENCY)
+        self.__session: aiohttp.ClientSession = None
+        self.__metrics = Metrics() # 기본값은 비활성 (수집하지 않음)
+        # 단일 비행(single-flight): (마켓, 시간대) -> 진행 중 요청 / 다음 마감까지 재사용할 최근 결과
+        self.__share_until_close = share_until_close
+        self.__inflight = {}
+        self.__recent = {}
+        self.__share_stats = {"fetched": 0, "coalesced": 0, "cached": 0, "resampled": 0, "resample_fallback": 0, "streamed": 0}
+
+    def set_candle_repo(self, candle_repo: CandleRepo):
+        """로컬 캔들 저장소를 설정합니다. 설정 시 마지막 저장 캔들 이후 구간만 요청합니다."""
+        self.__candle_repo = candle_repo
+
+    def set_candle_stream(self, candle_stream: UpbitStream):
+        """
+        WebSocket 캔들 스트림을 설정합니다. 스트림 시간대의 캔들은 스트림이 가진 캔들로 REST 요청 없이 구성하고,
+        스트림이 아직 준비되지 않았거나 캔들이 모자라면 REST로 요청합니다.
+        """
+        self.__candle_stream = candle_stream
+
+    def set_rate_limiter(self, rate_limiter: RateLimiter):
+        """여러 마켓이 공유하는 요청 스케줄러를 설정합니다. 모든 HTTP 요청 전에 토큰을 획득합니다."""
+        self.__rate_limiter = rate_limiter
+
+    def set_metrics(self, metrics: Metrics):
+        """시간대별 캔들 조회 시간과 응답 상태/재시도/요청 속도를 기록할 메트릭 레지스트리를 설정합니다."""
+        self.__metrics = metrics
+        metrics.describe("upbit_responses_total", "Upbit candle API responses by HTTP status.")
+        metrics.describe("upbit_retries_total", "Upbit candle API retries by reason (HTTP status, invalid_json or connection error).")
+        metrics.describe("upbit_rate_limit_per_second", "Current adaptive Upbit request rate per second.")
+        metrics.describe("upbit_candle_requests_total", "Candle requests by result (fetched, coalesced into an in-flight request, cached until close, "
+                         "resampled from the base timeframe, resample_fallback to a direct fetch, streamed from the WebSocket stream).")
+
+    async def start(self):
+        """
+        keep-alive 커넥션 풀을 가진 장기 세션을 생성합니다.
+        실행 중인 이벤트 루프 안에서 호출해야 하며, 시작하지 않으면 호출마다 임시 세션을 사용합니다.
+        """
+        if self.__session is not None and not self.__session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.CONNECTION_LIMIT,
+            limit_per_host=self.CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+        )
+        self.__session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT),
+        )
+        if self.__debug:
+            print("UpbitClient: Started pooled HTTP session")
+
+    async def close(self):
+        """장기 세션과 커넥션 풀을 닫습니다."""
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+            if self.__debug:
+                print("UpbitClient: Closed pooled HTTP session")
+        self.__session = None
         
     async def __req_data(self, unit: int, params: dict, session):
-        url = f"https://api.upbit.com/v1/candles/minutes/{unit}"
+        """
+        캔들 API를 요청합니다. 응답의 Remaining-Req 헤더를 RateLimiter에 전달하고,
+        429/5xx/연결 오류/JSON이 아닌 200 응답은 지터를 준 지수 백오프로 틱 마감 시각 안에서 재시도합니다.
+
+        Raises:
+            UpbitRequestError: 재시도할 수 없는 응답이거나, 재시도 횟수나 틱 마감 시각을 넘긴 경우
+        """
+        url = f"{self.__base_url}/v1/candles/minutes/{unit}"
         headers = {"accept": "application/json"}
-        async with session.get(url, params=params, headers=headers) as response:
-            return await response.json()
+        deadline = _request_deadline.get()
+        limiter = self.__rate_limiter
+        metrics = self.__metrics
+        for attempt in range(self.MAX_RETRIES + 1):
+            if limiter is not None and not await limiter.acquire(deadline):
+                raise UpbitRequestError("Tick deadline exceeded while waiting for Upbit rate limit")
+            # 토큰을 기다린 뒤에도 틱 마감 전인지 다시 확인
+            if deadline is not None and time.monotonic() >= deadline:
+                raise UpbitRequestError("Tick deadline exceeded before Upbit request")
+            retry_after = None
+            try:
+                async with session.get(url, params=params, headers=headers) as response:
+                    status = response.status
+                    metrics.inc("upbit_responses_total", status=str(status))
+                    remaining = response.headers.get("Remaining-Req")
+                    if remaining and limiter is not None:
+                        limiter.update_remaining(remaining)
+                    reason = str(status)
+                    if status == 200:
+                        if limiter is not None:
+                            limiter.record_success()
+                            metrics.set_gauge("upbit_rate_limit_per_second", limiter.get_rate())
+                        try:
+                            return await response.json()
+                        except (aiohttp.ContentTypeError, ValueError):
+                            # 프록시/점검 HTML 페이지 등 JSON이 아닌 200 응답은 5xx처럼 재시도
+                            reason = "invalid_json"
+                    elif status == 429:
+                        retry_after = self.__parse_retry_after(response.headers.get("Retry-After"))
+                        if limiter is not None:
+                            limiter.record_throttled(retry_after)
+                            metrics.set_gauge("upbit_rate_limit_per_second", limiter.get_rate())
+                    elif status < 500:
+                        raise UpbitRequestError(f"Upbit request failed with HTTP {status}: {await response.text()}", status)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                status = None
+                reason = type(e).__name__
+
+            if attempt == self.MAX_RETRIES:
+                break
+            # 전체 지터: 0 ~ min(상한, 기본값 * 2^attempt) 사이에서 무작위 대기
+            delay = max(retry_after or 0, random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt)))
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                break
+            metrics.inc("upbit_retries_total", reason=reason)
+            if self.__debug:
+                print(f"UpbitClient: Retrying {url} ({reason}) in {delay:.2f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+        raise UpbitRequestError(f"Upbit request failed after {attempt + 1} attempt(s): {reason}", status)
+
+    def __parse_retry_after(self, value: str) -> (float | None):
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    async def __req_page(self, market: str, unit: int, count: int, to: str, session) -> list:
+        """
+        `to` 커서 이전(exclusive)의 캔들을 최대 count개 요청합니다.
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC).
+            unit (int): 분 단위 시간대.
+            count (int): 요청할 캔들 개수 (최대 200).
+            to (str): UTC 기준 커서 시각. None이면 가장 최근 캔들부터.
+            session: aiohttp 클라이언트 세션 객체.
+        Returns:
+            list: 최신 순으로 정렬된 캔들 데이터 리스트.
+        """
+        params = {
+            'market': market,
+            'count': count,
+        }
+        if to is not None:
+            params['to'] = to
+        async with self.__page_semaphore:
+            data = await self.__req_data(unit, params, session)
+        # 오류 응답(dict 등)은 빈 페이지로 취급
+        return data if isinstance(data, list) else []
+
+    async def __get_paginated_candles(self, market: str, unit: int, count: int, session) -> list:
+        """
+        요청당 200개 제한을 넘는 구간을 `to` 커서로 나눠 가져온 뒤 중복을 제거하고 이어 붙입니다.
+        커서는 시간대 단위로 미리 계산해 동시에 요청하고, 거래가 없어 비어 있는 구간 때문에
+        개수가 모자라면 가장 오래된 캔들부터 순차적으로 보충합니다.
+
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC).
+            unit (int): 분 단위 시간대.
+            count (int): 필요한 캔들 개수.
+            session: aiohttp 클라이언트 세션 객체.
+        Returns:
+            list: 과거 순으로 정렬된 캔들 데이터 리스트 (최대 count개).
+        """
+        page_size = self.MAX_CANDLES_PER_REQUEST
+        if count <= page_size:
+            data = await self.__req_page(market, unit, count, None, session)
+            return data[::-1]
+
+        # 현재(진행 중) 캔들의 시작 시각을 기준으로 페이지별 커서 계산 (Upbit 분봉은 UTC 기준 정렬)
+        bucket_seconds = unit * 60
+        current_start = int(time.time()) // bucket_seconds * bucket_seconds
+        pages = math.ceil(count / page_size)
+        tasks = []
+        for page in range(pages):
+            size = min(page_size, count - page * page_size)
+            if page == 0:
+                cursor = None
+            else:
+                cursor_time = current_start - (page * page_size - 1) * bucket_seconds
+                cursor = datetime.fromtimestamp(cursor_time, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            tasks.append(self.__req_page(market, unit, size, cursor, session))
+        results = await asyncio.gather(*tasks)
+
+        merged = {}
+        for page_data in results:
+            for candle in page_data:
+                merged[candle['candle_date_time_utc']] = candle
+
+        # 거래가 없던 구간이 있으면 모자란 만큼 가장 오래된 캔들 이전부터 순차 요청
+        while merged and len(merged) < count:
+            oldest = min(merged).replace('T', ' ')
+            page_data = await self.__req_page(market, unit, min(page_size, count - len(merged)), oldest, session)
+            new_candles = [candle for candle in page_data if candle['candle_date_time_utc'] not in merged]
+            if not new_candles:
+                break # 상장 이전 등 더 이상 과거 데이터가 없음
+            for candle in new_candles:
+                merged[candle['candle_date_time_utc']] = candle
+
+        chronological = [merged[key] for key in sorted(merged)]
+        return chronological[-count:]
 
     def __get_timeframe_unit(self, timeframe: str) -> int:
         """
@@ -89,68 +361,299 @@ class UpbitClient:
         
         return data
         
-    async def __get_candle_data(self, count: int, timeframe: str, session):
+    async def __get_candle_data(self, market: str, count: int, timeframe: str, session):
         """
         주어진 시장, 개수, 시간대에 따라 캔들 데이터를 비동기적으로 가져옵니다.
         Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC).
             count (int): 요청할 캔들 데이터의 개수.
             timeframe (str): 시간대 (예: '15m', '1h').
             session: aiohttp 클라이언트 세션 객체.
         Returns:
-            list: 과거 순으로 정렬된 캔들 데이터 리스트.
+            CandleSeries: 과거 순 캔들 시계열 (응답 dict는 바로 열 배열로 변환)
         """
         unit = self.__get_timeframe_unit(timeframe)
+        window = count + 1 # 진행 중인 캔들을 고려해 하나 더 요청
+        request_count = self.__get_request_count(market, window, timeframe)
         
-        params = {
-            'market': self.__market,
-            'count': count + 1,  # 진행 중인 캔들을 고려해 하나 더 요청
-        }
-        
-        data = await self.__req_data(unit, params, session)
+        # 200개를 넘는 윈도우는 페이지로 나눠 요청
+        data = CandleSeries.from_upbit(await self.__get_paginated_candles(market, unit, request_count, session), market)
+        if self.__debug:
+            print(f"UpbitClient: Requested {request_count} candles for {timeframe} (window {window})")
         # completed_time = self.__get_completed_candle_time(timeframe)
-        
-        return data
+
+        if self.__candle_repo is None:
+            return data
+
+        # 받은 구간을 저장소에 병합하고 전체 윈도우는 저장소에서 구성
+        self.__candle_repo.save(market, timeframe, data)
+        return self.__candle_repo.get_latest_series(market, timeframe, window)
+
+    async def __get_timed_candle_data(self, market: str, count: int, timeframe: str, session):
+        """
+        __get_candle_data()를 실행하고 시간대별 조회 시간을 candle_fetch 단계로 기록합니다.
+        스트림이 같은 시간대의 캔들을 충분히 가지고 있으면 요청하지 않고 그 캔들을 사용합니다.
+        """
+        stream = self.__candle_stream
+        if stream is not None and stream.unit == self.__get_timeframe_unit(timeframe):
+            series = stream.get_series(market, count + 1)
+            if series is not None:
+                self.__share_stats["streamed"] += 1
+                self.__metrics.inc("upbit_candle_requests_total", result="streamed")
+                return series
+        with self.__metrics.stage("candle_fetch", market, timeframe):
+            return await self.__get_shared_candle_data(market, count, timeframe, session)
+
+    async def __get_shared_candle_data(self, market: str, count: int, timeframe: str, session) -> list:
+        """
+        같은 (마켓, 시간대)의 요청을 하나로 합쳐 __get_candle_data()를 실행합니다.
+        - 같은 또는 더 큰 count의 요청이 진행 중이면 그 결과를 기다려 최신 count + 1개만 잘라 씁니다.
+        - share_until_close이면 다음 캔들 마감 전까지 같은 또는 더 큰 count의 최근 결과를 잘라 씁니다.
+          캔들 차트 요청에서는 틱 경계(가장 작은 시간대의 다음 마감)를 넘겨 재사용하지 않으므로
+          상위 시간대의 진행 중 캔들(현재가가 반영된 종가)도 매 틱 새로 받습니다.
+        시계열은 불변이고 tail()은 복사 없는 뷰이므로 호출자끼리 서로 영향을 주지 않습니다.
+
+        Returns:
+            CandleSeries: 과거 순 캔들 시계열 (최대 count + 1개)
+        """
+        key = (market, timeframe)
+        window = count + 1
+        metrics = self.__metrics
+
+        now = time.time()
+        tick_close = self.__next_close(now, _tick_seconds.get())
+        recent = self.__recent.get(key)
+        # 틱 경계 이후까지 유효한 결과(다른 틱 길이로 받은 결과)는 이 틱에서 받은 것이 아닐 수 있으므로 다시 요청
+        if recent is not None and recent.count >= count and now < recent.valid_until <= tick_close:
+            self.__share_stats["cached"] += 1
+            metrics.inc("upbit_candle_requests_total", result="cached")
+            return recent.data.tail(window)
+
+        flight = self.__inflight.get(key)
+        if flight is not None and flight.count >= count:
+            self.__share_stats["coalesced"] += 1
+            metrics.inc("upbit_candle_requests_total", result="coalesced")
+            # 먼저 요청한 호출자가 취소되어도 요청은 끝까지 진행되도록 shield
+            return (await asyncio.shield(flight.task)).tail(window)
+
+        self.__share_stats["fetched"] += 1
+        metrics.inc("upbit_candle_requests_total", result="fetched")
+        # 요청 시작 시점 기준 다음 캔들 마감과 틱 마감 중 이른 시각
+        valid_until = min(self.__next_close(now, self.__get_timeframe_unit(timeframe) * 60), tick_close)
+        flight = SharedCandles(count, asyncio.ensure_future(self.__get_candle_data(market, count, timeframe, session)))
+        self.__inflight[key] = flight
+
+        def settle(task: asyncio.Task):
+            if self.__inflight.get(key) is flight:
+                del self.__inflight[key]
+            if task.cancelled() or task.exception() is not None:
+                return # 실패한 결과는 공유하지 않음 (기다리던 호출자는 같은 예외를 받음)
+            current = self.__recent.get(key)
+            if self.__share_until_close and (current is None or current.count <= count or time.time() >= current.valid_until):
+                self.__recent[key] = SharedCandles(count, data=task.result(), valid_until=valid_until)
+
+        flight.task.add_done_callback(settle)
+        return (await asyncio.shield(flight.task)).tail(window)
+
+    def __next_close(self, now: float, bucket_seconds: int = None) -> float:
+        """now 이후 첫 bucket_seconds 경계(epoch 초). bucket_seconds가 없으면 무한대"""
+        if not bucket_seconds:
+            return math.inf
+        return (now // bucket_seconds + 1) * bucket_seconds
+
+    def get_stats(self) -> dict:
+        """
+        (마켓, 시간대) 캔들 요청 중 실제로 요청한 수, 진행 중 요청에 합친 수, 최근 결과를 재사용한 수,
+        기준 시간대에서 리샘플링한 수, 기준 이력이 짧아 직접 요청으로 돌린 수, 스트림 캔들을 사용한 수
+        """
+        return dict(self.__share_stats)
+
+    def __get_request_count(self, market: str, window: int, timeframe: str) -> int:
+        """
+        실제로 Upbit에 요청할 캔들 개수를 계산합니다.
+        저장소에 충분한 윈도우가 있다면 마지막 저장 캔들(진행 중이었을 수 있음)부터 현재까지만 요청합니다.
+
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC).
+            window (int): 필요한 전체 캔들 개수.
+            timeframe (str): 시간대 (예: '15m', '1h').
+
+        Returns:
+            int: 요청할 캔들 개수.
+        """
+        if self.__candle_repo is None:
+            return window
+        if self.__candle_repo.count(market, timeframe) < window:
+            return window # 저장된 윈도우가 부족하면 전체 요청
+        last_time = self.__candle_repo.get_last_time(market, timeframe)
+        unit = self.__get_timeframe_unit(timeframe)
+        elapsed = datetime.now(KST).replace(tzinfo=None) - datetime.fromisoformat(last_time)
+        # 마지막 저장 캔들부터 현재 캔들까지 + 여유 1개
+        missing = int(elapsed.total_seconds() // (unit * 60)) + 2
+        return max(1, min(window, missing))
     
-    async def fetch_candle_chart(self, timeframe_config=None) -> CandleChart:
+    async def fetch_candles(self, market: str, timeframe: str, count: int, deadline: float = None) -> CandleSeries:
+        """
+        REST로 최신 캔들을 가져옵니다. 스트림을 거치지 않으므로 스트림 백필에 사용합니다.
+
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            timeframe (str): 시간대 (예: '5m')
+            count (int): 진행 중 캔들을 포함한 캔들 수
+            deadline (float, optional): 마감 시각(time.monotonic() 기준). 이 시각을 넘기는 재시도는 하지 않습니다.
+
+        Returns:
+            CandleSeries: 과거 순 캔들 시계열 (마지막 캔들은 진행 중일 수 있음)
+        """
+        token = _request_deadline.set(deadline)
+        try:
+            with self.__metrics.stage("candle_backfill", market, timeframe):
+                if self.__session is not None and not self.__session.closed:
+                    return await self.__get_shared_candle_data(market, max(count - 1, 1), timeframe, self.__session)
+                async with aiohttp.ClientSession() as session:
+                    return await self.__get_shared_candle_data(market, max(count - 1, 1), timeframe, session)
+        finally:
+            _request_deadline.reset(token)
+
+    async def fetch_candle_chart(self, timeframe_config=None, market: str = None, deadline: float = None) -> CandleChart:
         """
         주어진 시장에 대한 캔들 차트를 비동기적으로 가져옵니다.
         Args:
             timeframe_config (dict, optional): 시간대별 캔들 개수 구성. 기본값은 None.
                 예: {'15m': 20, '1h': 5, '4h': 10}
+            market (str, optional): 거래소 마켓 (ex. KRW-BTC). 기본값은 생성 시 지정한 마켓.
+            deadline (float, optional): 틱 마감 시각(time.monotonic() 기준). 이 시각을 넘기는 재시도는 하지 않습니다.
 
         Returns:
             CandleChart: 요청한 시간대의 캔들 데이터와 현재 가격이 설정된 CandleChart 객체.
+
+        Raises:
+            UpbitRequestError: 재시도 후에도 캔들을 가져오지 못한 경우
         """
+        market = market or self.__market
         if self.__debug:
-            print(f"UpbitClient: Fetching candle chart for market {self.__market} with config: {timeframe_config}")
+            print(f"UpbitClient: Fetching candle chart for market {market} with config: {timeframe_config}")
 
-        candle_chart = CandleChart()
-        candle_chart.set_market(self.__market)
+        # 시간대별 요청 태스크가 마감 시각과 틱 길이를 물려받도록 설정하고, 끝나면 호출자의 값으로 되돌림
+        token = _request_deadline.set(deadline)
+        tick_token = _tick_seconds.set(min(self.__get_timeframe_unit(timeframe) for timeframe in timeframe_config) * 60)
+        try:
+            if self.__session is not None and not self.__session.closed:
+                candle_chart = await self.__build_candle_chart(market, timeframe_config, self.__session)
+            else:
+                # start()로 장기 세션을 만들지 않은 경우 호출마다 임시 세션 사용
+                async with aiohttp.ClientSession() as session:
+                    candle_chart = await self.__build_candle_chart(market, timeframe_config, session)
+        finally:
+            _tick_seconds.reset(tick_token)
+            _request_deadline.reset(token)
 
-        async with aiohttp.ClientSession() as session:
-            tasks = []
+        if self.__debug:
+            print(f"UpbitClient: Successfully fetched candle chart for market {market}")
 
-            # 각 시간대별 캔들 데이터 요청 태스크 생성
-            for timeframe, count in timeframe_config.items():
-                tasks.append(self.__get_candle_data(count, timeframe, session))
+        return candle_chart
 
-            # 모든 요청 동시 처리
-            results = await asyncio.gather(*tasks)
+    def __plan_resample(self, timeframe_config: dict) -> tuple:
+        """
+        기준 시간대에서 만들 상위 시간대와 기준 시간대 요청 개수를 정합니다.
+        상위 시간대 분이 기준 시간대 분의 배수이고, 필요한 기준 캔들이 max_base_candles 이하인 경우만 리샘플링합니다.
+        저장소가 없으면 매 틱 기준 윈도우 전체를 요청하므로, 기준 시간대 요청 페이지 수가 늘지 않는 범위로 제한합니다.
 
-            # 결과 처리 및 CandleChart에 설정
-            for i, timeframe in enumerate(timeframe_config.keys()):
-                candles = results[i]
-                candle_chart.set_candles(timeframe, candles)
+        Args:
+            timeframe_config (dict): 시간대별 캔들 개수 구성
 
-            # 현재 가격 설정 (가장 작은 시간대의 마지막 캔들 종가 사용)
-            smallest_timeframe = min(timeframe_config.keys(),
-                                    key=lambda x: self.__get_timeframe_unit(x))
-            if results[list(timeframe_config.keys()).index(smallest_timeframe)]:
-                candle_chart.set_current_price(
-                    results[list(timeframe_config.keys()).index(smallest_timeframe)][0]['trade_price']
-                )
+        Returns:
+            tuple: (기준 시간대 요청 개수, {리샘플링할 시간대: 캔들 개수}). 리샘플링하지 않으면 (0, {})
+        """
+        base = self.__resample_base
+        if base is None:
+            return 0, {}
+        base_unit = self.__get_timeframe_unit(base)
+        base_count = timeframe_config.get(base, 0)
+        limit = self.__max_base_candles
+        if self.__candle_repo is None:
+            pages = max(1, math.ceil((base_count + 1) / self.MAX_CANDLES_PER_REQUEST))
+            limit = min(limit, pages * self.MAX_CANDLES_PER_REQUEST)
+
+        resampled = {}
+        for timeframe, count in timeframe_config.items():
+            unit = self.__get_timeframe_unit(timeframe)
+            if unit <= base_unit or unit % base_unit:
+                continue
+            # 잘린 첫 버킷과 진행 중 버킷을 고려해 (count + 2)개 버킷 분량
+            needed = (count + 2) * (unit // base_unit)
+            if needed > limit:
+                continue
+            resampled[timeframe] = count
+            base_count = max(base_count, needed - 1)
+        return (base_count, resampled) if resampled else (0, {})
+
+    async def __get_resampled_candle_data(self, market: str, base_task: asyncio.Task, count: int, timeframe: str, session):
+        """
+        기준 시간대 캔들로 상위 시간대 캔들을 만듭니다. 기준 이력이 짧아 count + 1개를 만들 수 없으면 직접 요청합니다.
 
+        Returns:
+            CandleSeries: 과거 순 캔들 시계열 (최대 count + 1개)
+        """
+        base_series = await base_task
+        unit = self.__get_timeframe_unit(timeframe)
+        with self.__metrics.stage("candle_resample", market, timeframe):
+            series = self.__resampler.resample(market, base_series, unit, count)
+        if len(series) >= count + 1:
+            self.__share_stats["resampled"] += 1
+            self.__metrics.inc("upbit_candle_requests_total", result="resampled")
+            return series
+
+        self.__share_stats["resample_fallback"] += 1
+        self.__metrics.inc("upbit_candle_requests_total", result="resample_fallback")
         if self.__debug:
-            print(f"UpbitClient: Successfully fetched candle chart for market {self.__market}")
+            print(f"UpbitClient: Base history too short to resample {timeframe} for {market} ({len(series)}/{count + 1}), fetching directly")
+        return await self.__get_timed_candle_data(market, count, timeframe, session)
+
+    async def __tail_of(self, task: asyncio.Task, window: int):
+        """task 결과 시계열의 최신 window개"""
+        return (await task).tail(window)
+
+    async def __build_candle_chart(self, market: str, timeframe_config: dict, session) -> CandleChart:
+        """주어진 세션으로 모든 시간대의 캔들을 동시에 가져와 CandleChart를 구성합니다."""
+        candle_chart = CandleChart()
+        candle_chart.set_market(market)
+
+        tasks = []
+
+        # 기준 시간대를 한 번만 요청하고 가능한 상위 시간대는 그 캔들로 만듦
+        base_count, resampled = self.__plan_resample(timeframe_config)
+        base_task = None
+        if resampled:
+            base_task = asyncio.ensure_future(self.__get_timed_candle_data(market, base_count, self.__resample_base, session))
+
+        # 각 시간대별 캔들 데이터 요청 태스크 생성
+        for timeframe, count in timeframe_config.items():
+            if timeframe in resampled:
+                tasks.append(self.__get_resampled_candle_data(market, base_task, count, timeframe, session))
+            elif base_task is not None and timeframe == self.__resample_base:
+                tasks.append(self.__tail_of(base_task, count + 1))
+            else:
+                tasks.append(self.__get_timed_candle_data(market, count, timeframe, session))
+
+        # 모든 요청 동시 처리
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            if base_task is not None and not base_task.done():
+                base_task.cancel()
+
+        # 결과 처리 및 CandleChart에 설정
+        for i, timeframe in enumerate(timeframe_config.keys()):
+            candles = results[i]
+            candle_chart.set_candles(timeframe, candles)
+
+        # 현재 가격 설정 (가장 작은 시간대의 마지막 캔들 종가 사용)
+        smallest_timeframe = min(timeframe_config.keys(),
+                                key=lambda x: self.__get_timeframe_unit(x))
+        if results[list(timeframe_config.keys()).index(smallest_timeframe)]:
+            candle_chart.set_current_price(
+                results[list(timeframe_config.keys()).index(smallest_timeframe)].last_close()
+            )
 
         return candle_chart
\ No newline at end of file
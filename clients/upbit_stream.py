@@ -0,0 +1,378 @@
+import asyncio
+import json
+import random
+import uuid
+import aiohttp
+
+from array import array
+from dtos.candle_series import CandleSeries
+from services.tick_scheduler import SystemClock
+from settings.metrics import Metrics
+
+class LiveCandle:
+    """체결로 만드는 진행 중 캔들"""
+
+    __slots__ = ("start", "open", "high", "low", "close", "volume", "trusted")
+
+    def __init__(self, start: int, price: float, volume: float, trusted: bool):
+        self.start = start # 캔들 시작 시각 (epoch 초)
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.trusted = trusted # 캔들 구간 전체 동안 연결되어 있어 모든 체결을 받았는지 여부
+
+    def add(self, price: float, volume: float):
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += volume
+
+    def to_series(self, market: str) -> CandleSeries:
+        return CandleSeries(market, array(CandleSeries.TIME_TYPECODE, [self.start]),
+                            *(array(CandleSeries.VALUE_TYPECODE, [value])
+                              for value in (self.open, self.high, self.low, self.close, self.volume)))
+
+class MarketCandles:
+    """한 마켓의 스트리밍 캔들 상태"""
+
+    __slots__ = ("closed", "live", "ready", "exhausted", "emitted", "last_sequence")
+
+    def __init__(self, market: str):
+        self.closed = CandleSeries(market) # 마감 캔들 (과거 순)
+        self.live: LiveCandle = None # 진행 중 캔들
+        self.ready = False # REST로 이력을 채웠는지 여부
+        self.exhausted = False # REST 이력이 요청보다 짧아 더 과거 캔들이 없는지 여부
+        self.emitted = 0 # 마지막으로 마감을 알린 경계 (epoch 초)
+        self.last_sequence = None # 마지막 체결 번호 (재연결 시 중복 체결 무시)
+
+class UpbitStream:
+    """
+    Upbit WebSocket 체결(trade) 피드를 구독해 기준 시간대 캔들을 메모리에서 만드는 스트림.
+
+    - 캔들: 체결 시각(trade_timestamp)으로 버킷을 정해 OHLCV를 갱신하고, 다음 버킷의 체결이 오면
+      (거래가 없는 마켓은 경계 + CLOSE_DELAY 시각에) 마감합니다. 마감 시 on_close(boundary, markets)를 호출합니다.
+    - 백필: 시작 시 REST로 이력을 채우고, 연결되지 않은 동안 진행된 캔들(시작 직후, 끊긴 동안, 재연결 직후)은
+      체결을 모두 받지 못했으므로 마감 시 REST로 다시 받아 덮어씁니다. 연결이 유지되는 동안에는 REST를 쓰지 않습니다.
+    - 재연결: 연결이 끊기면 지터를 준 지수 백오프로 다시 연결하고 모든 마켓을 다시 구독합니다.
+
+    시계(clock)는 TickScheduler와 같은 time()/sleep() 인터페이스이며, 가속 재생 테스트에서 바꿀 수 있습니다.
+    """
+
+    WS_URL = "wss://api.upbit.com/websocket/v1"
+    HEARTBEAT = 30 # ping 주기(초). Upbit는 120초 동안 메시지가 없으면 연결을 끊음
+    CLOSE_DELAY = 0.3 # 경계 후 거래가 없는 마켓의 캔들을 마감할 때까지 기다릴 시간(초)
+    RECONNECT_BASE_DELAY = 0.5 # 첫 재연결 대기 상한(초). 실패마다 2배
+    RECONNECT_MAX_DELAY = 30.0 # 재연결 대기 상한(초)
+    DEFAULT_MAX_CANDLES = 2000 # 마켓별 보관할 마감 캔들 수
+
+    def __init__(self, markets: list, unit: int, url: str = WS_URL, max_candles: int = DEFAULT_MAX_CANDLES,
+                 close_delay: float = CLOSE_DELAY, clock=None, debug = False):
+        """
+        Args:
+            markets (list): 구독할 마켓 리스트 (ex. ['KRW-BTC', 'KRW-ETH'])
+            unit (int): 만들 캔들 시간대 (분). 보통 TIMEFRAME_CONFIG의 가장 작은 시간대
+            url (str): WebSocket 주소. 로컬 재생 서버 사용 시 지정
+            max_candles (int): 마켓별 보관할 마감 캔들 수 (리샘플링에 필요한 기준 윈도우 이상)
+            close_delay (float): 경계 후 거래가 없는 마켓의 캔들을 마감할 때까지 기다릴 시간(초)
+            clock: time()/sleep()을 제공하는 시계 객체. 기본값은 SystemClock
+            debug (bool): 디버그 모드 활성화 여부
+        """
+        if not markets:
+            raise ValueError("UpbitStream에는 하나 이상의 마켓이 필요합니다.")
+        if max_candles < 1:
+            raise ValueError("max_candles는 1 이상이어야 합니다.")
+        self.markets = list(markets)
+        self.unit = unit
+        self.__bucket_seconds = unit * 60
+        self.__url = url
+        self.__max_candles = max_candles
+        self.__close_delay = close_delay
+        self.__clock = clock or SystemClock()
+        self.__debug = debug
+        self.__states = {market: MarketCandles(market) for market in self.markets}
+        self.__backfill = None # async (market, count) -> CandleSeries
+        self.__on_close = None # async (boundary, markets) -> None
+        self.__metrics = Metrics() # 기본값은 비활성 (수집하지 않음)
+        self.__session: aiohttp.ClientSession = None
+        self.__tasks = set()
+        self.__connected_since = None # 현재 연결을 구독한 시각 (epoch 초). 끊겨 있으면 None
+        self.__stopped = False
+        self.__stats = {"connects": 0, "disconnects": 0, "trades": 0, "duplicates": 0, "late": 0,
+                        "closed": 0, "backfills": 0, "backfill_errors": 0}
+
+    def _log_debug(self, message: str, shouldDebugMode: bool = True):
+        """디버그 메시지를 출력하는 헬퍼 메서드"""
+        if self.__debug or not shouldDebugMode:
+            print(f"UpbitStream: {message}")
+
+    def set_backfill(self, backfill):
+        """
+        REST 백필 함수를 설정합니다. (ex. UpbitClient.fetch_candles를 감싼 함수)
+
+        Args:
+            backfill: async def backfill(market: str, count: int) -> CandleSeries (과거 순, 마지막 캔들은 진행 중일 수 있음)
+        """
+        self.__backfill = backfill
+
+    def set_on_close(self, on_close):
+        """
+        캔들 마감 콜백을 설정합니다. 마감된 캔들은 콜백 호출 전에 get_series()에 반영되어 있습니다.
+
+        Args:
+            on_close: async def on_close(boundary: float, markets: list)
+        """
+        self.__on_close = on_close
+
+    def set_metrics(self, metrics: Metrics):
+        """체결/재연결/백필 카운터와 마감 지연 시간을 기록할 메트릭 레지스트리를 설정합니다."""
+        self.__metrics = metrics
+        metrics.describe("upbit_stream_events_total", "Upbit WebSocket stream events (connect, disconnect, trade, duplicate, late, closed).")
+        metrics.describe("upbit_stream_backfills_total", "REST backfills for candles the stream did not fully observe, by result.")
+        metrics.describe("upbit_stream_close_delay_seconds", "Delay from candle boundary to the stream close callback.")
+
+    def is_connected(self) -> bool:
+        return self.__connected_since is not None
+
+    def get_stats(self) -> dict:
+        return {**self.__stats, "connected": self.is_connected()}
+
+    def get_series(self, market: str, window: int) -> (CandleSeries | None):
+        """
+        최신 window개 캔들(마지막은 진행 중 캔들)을 반환합니다.
+        이력을 아직 채우지 못했거나 마감 캔들이 모자라면 None (호출자는 REST로 요청)
+
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            window (int): 진행 중 캔들을 포함한 캔들 수
+        """
+        state = self.__states.get(market)
+        if state is None or not state.ready:
+            return None
+        closed = state.closed.tail(window - 1 if state.live is not None else window)
+        series = closed.merge(state.live.to_series(market)) if state.live is not None else closed
+        if len(series) < window and not state.exhausted:
+            return None
+        return series
+
+    async def start(self):
+        """REST로 모든 마켓의 이력을 채우고, 연결과 경계 마감 태스크를 시작합니다. 이벤트 루프 안에서 호출해야 합니다."""
+        self.__stopped = False
+        boundary = self.__bucket_start(self.__clock.time())
+        await asyncio.gather(*(self.__fill(market, self.__max_candles, boundary) for market in self.markets))
+        self.__session = aiohttp.ClientSession()
+        for coro in (self.__run_connection(), self.__run_close_timer()):
+            task = asyncio.create_task(coro)
+            self.__tasks.add(task)
+            task.add_done_callback(self.__tasks.discard)
+
+    async def close(self):
+        """연결과 태스크를 정리합니다."""
+        self.__stopped = True
+        for task in list(self.__tasks):
+            task.cancel()
+        if self.__tasks:
+            await asyncio.gather(*self.__tasks, return_exceptions=True)
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+        self.__connected_since = None
+
+    async def __run_connection(self):
+        """연결이 끊길 때마다 백오프 후 다시 연결하고 구독합니다."""
+        failures = 0
+        while not self.__stopped:
+            try:
+                async with self.__session.ws_connect(self.__url, heartbeat=self.HEARTBEAT) as ws:
+                    await ws.send_str(json.dumps(self.__subscription()))
+                    self.__connected_since = self.__clock.time()
+                    self.__count("connects", "connect")
+                    self._log_debug(f"Subscribed to {len(self.markets)} markets at {self.__url}")
+                    failures = 0
+                    await self.__read(ws)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                self._log_debug(f"Connection error: {e!r}", False)
+            finally:
+                if self.__connected_since is not None:
+                    self.__disconnected()
+            if self.__stopped:
+                break
+            failures += 1
+            delay = random.uniform(0, min(self.RECONNECT_MAX_DELAY, self.RECONNECT_BASE_DELAY * 2 ** (failures - 1)))
+            self._log_debug(f"Reconnecting in {delay:.2f}s (attempt {failures})", False)
+            await asyncio.sleep(delay)
+
+    def __subscription(self) -> list:
+        """Upbit 구독 요청. 재연결 시 이전 체결(스냅샷)은 받지 않도록 실시간만 구독"""
+        return [
+            {"ticket": str(uuid.uuid4())},
+            {"type": "trade", "codes": self.markets, "is_only_realtime": True},
+        ]
+
+    async def __read(self, ws: aiohttp.ClientWebSocketResponse):
+        """연결이 닫힐 때까지 메시지를 읽어 체결을 반영합니다. Upbit는 바이너리 프레임으로 JSON을 보냄"""
+        async for message in ws:
+            if message.type in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+                try:
+                    data = json.loads(message.data)
+                    if data.get("type") == "trade":
+                        self.__on_trade(data["code"], float(data["trade_price"]), float(data["trade_volume"]),
+                                        int(data["trade_timestamp"]), data.get("sequential_id"))
+                    elif "error" in data:
+                        self._log_debug(f"Server error: {data['error']}", False)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    self._log_debug(f"Ignored malformed message: {e!r}", False)
+            elif message.type == aiohttp.WSMsgType.ERROR:
+                raise ws.exception() or aiohttp.ClientError("WebSocket error")
+
+    def __disconnected(self):
+        """끊긴 동안의 체결은 받지 못하므로 진행 중 캔들을 REST로 다시 받을 대상으로 표시"""
+        self.__connected_since = None
+        self.__count("disconnects", "disconnect")
+        for state in self.__states.values():
+            if state.live is not None:
+                state.live.trusted = False
+
+    def __on_trade(self, market: str, price: float, volume: float, timestamp_ms: int, sequence: int = None):
+        state = self.__states.get(market)
+        if state is None:
+            return
+        if sequence is not None and sequence == state.last_sequence:
+            self.__count("duplicates", "duplicate")
+            return
+        state.last_sequence = sequence
+        self.__count("trades", "trade")
+
+        epoch = timestamp_ms // 1000
+        start = epoch - epoch % self.__bucket_seconds
+        live = state.live
+        if live is not None and start == live.start:
+            live.add(price, volume)
+            return
+        if (live is not None and start < live.start) or start <= (state.closed.last_time() or -1) or start < state.emitted:
+            # 이미 마감한 캔들의 늦은 체결은 반영하지 않음
+            self.__count("late", "late")
+            return
+        if live is not None:
+            # 다음 버킷의 첫 체결 -> 진행 중 캔들 마감
+            self.__close(market, state, start)
+        state.live = LiveCandle(start, price, volume, trusted=self.__is_observed(start))
+
+    def __bucket_start(self, now: float) -> int:
+        """now가 속한 버킷의 시작 시각 (epoch 초)"""
+        return int(now // self.__bucket_seconds) * self.__bucket_seconds
+
+    def __is_observed(self, start: int) -> bool:
+        """start에 시작하는 캔들의 체결을 모두 받을 수 있는지 (캔들 시작 전부터 연결되어 있는지)"""
+        return self.__connected_since is not None and self.__connected_since <= start
+
+    def __close(self, market: str, state: MarketCandles, boundary: int):
+        """진행 중 캔들을 마감하고, 완전히 관측한 캔들이 아니면 REST 백필 후 마감을 알립니다."""
+        live = state.live
+        state.live = None
+        state.emitted = boundary
+        self.__count("closed", "closed")
+        if live.trusted and state.ready:
+            state.closed = state.closed.merge(live.to_series(market)).tail(self.__max_candles)
+            self.__spawn(self.__notify(boundary, [market]))
+        else:
+            self.__spawn(self.__backfill_and_notify(boundary, [market]))
+
+    async def __run_close_timer(self):
+        """경계 + close_delay마다 거래가 없어 아직 마감하지 못한 마켓의 캔들을 마감합니다."""
+        boundary = self.__bucket_start(self.__clock.time()) + self.__bucket_seconds
+        while not self.__stopped:
+            wait = boundary + self.__close_delay - self.__clock.time()
+            if wait > 0:
+                await self.__clock.sleep(wait)
+            # 이벤트 루프 정체 등으로 지나친 경계는 건너뜀
+            boundary = max(boundary, self.__bucket_start(self.__clock.time()))
+            observed, unobserved = [], []
+            for market, state in self.__states.items():
+                if state.emitted >= boundary:
+                    continue # 다음 버킷 체결로 이미 마감
+                live = state.live
+                if live is not None and live.start < boundary:
+                    state.live = None
+                    self.__count("closed", "closed")
+                    if live.trusted and state.ready:
+                        state.closed = state.closed.merge(live.to_series(market)).tail(self.__max_candles)
+                    else:
+                        unobserved.append(market)
+                        state.emitted = boundary
+                        continue
+                elif not self.__is_observed(boundary - self.__bucket_seconds) or not state.ready:
+                    # 끊겨 있어 거래가 없었는지 알 수 없음
+                    unobserved.append(market)
+                    state.emitted = boundary
+                    continue
+                state.emitted = boundary
+                observed.append(market)
+            if observed:
+                self.__spawn(self.__notify(boundary, observed))
+            if unobserved:
+                self.__spawn(self.__backfill_and_notify(boundary, unobserved))
+            boundary += self.__bucket_seconds
+
+    async def __fill(self, market: str, count: int, boundary: int) -> bool:
+        """REST로 boundary 이전 마감 캔들을 받아 병합합니다. REST의 진행 중 캔들은 관측하지 못한 캔들로 둠"""
+        state = self.__states[market]
+        if self.__backfill is None:
+            return False
+        try:
+            series = await self.__backfill(market, count)
+        except Exception as e:
+            self.__stats["backfill_errors"] += 1
+            self.__metrics.inc("upbit_stream_backfills_total", result="error")
+            self._log_debug(f"Backfill failed for {market}: {e}", False)
+            return False
+        self.__stats["backfills"] += 1
+        self.__metrics.inc("upbit_stream_backfills_total", result="ok")
+        times = series.times
+        closed_count = len(times)
+        while closed_count and times[closed_count - 1] >= boundary:
+            closed_count -= 1
+        if not state.ready:
+            state.exhausted = len(series) < count
+        state.closed = state.closed.merge(series.slice(0, closed_count)).tail(self.__max_candles)
+        if not state.ready and state.live is None and closed_count < len(series) and times[closed_count] == boundary:
+            # 시작 시에는 현재가를 위해 REST의 진행 중 캔들로 시작 (마감 시 다시 백필)
+            state.live = LiveCandle(boundary, series.opens[closed_count], 0.0, trusted=False)
+            state.live.high, state.live.low = series.highs[closed_count], series.lows[closed_count]
+            state.live.close, state.live.volume = series.closes[closed_count], series.volumes[closed_count]
+        state.ready = True
+        return True
+
+    async def __backfill_and_notify(self, boundary: int, markets: list):
+        """관측하지 못한 캔들을 REST로 채운 뒤 마감을 알립니다. 백필에 실패한 마켓은 get_series()가 REST로 돌립니다."""
+        async def fill(market: str):
+            state = self.__states[market]
+            last_time = state.closed.last_time()
+            if not state.ready or last_time is None:
+                count = self.__max_candles
+            else:
+                # 마지막 마감 캔들 이후부터 방금 마감된 캔들 + 진행 중 캔들까지
+                count = min(self.__max_candles, int((boundary - last_time) // self.__bucket_seconds) + 1)
+            if not await self.__fill(market, count, boundary):
+                state.ready = False
+
+        await asyncio.gather(*(fill(market) for market in markets))
+        await self.__notify(boundary, markets)
+
+    async def __notify(self, boundary: int, markets: list):
+        self.__metrics.observe("upbit_stream_close_delay_seconds", max(0.0, self.__clock.time() - boundary))
+        if self.__on_close is not None:
+            await self.__on_close(boundary, markets)
+
+    def __spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__finished)
+
+    def __finished(self, task: asyncio.Task):
+        self.__tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._log_debug(f"Close callback failed: {task.exception()!r}", False)
+
+    def __count(self, stat: str, event: str):
+        self.__stats[stat] += 1
+        self.__metrics.inc("upbit_stream_events_total", event=event)
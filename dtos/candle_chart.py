@@ -1,24 +1,29 @@
 import json
 
+from dtos.candle_series import CandleSeries
+
 class CandleChart:
     def __init__(self):
-        self.candles = {}  # 시간대별 캔들 데이터를 저장하는 딕셔너리
+        self.candles = {}  # 시간대별 캔들 시계열(CandleSeries)을 저장하는 딕셔너리
         self.current_price: int = None
         self.market: str = None
         
     def set_candles(self, timeframe, candles):
         """
-        특정 시간대의 캔들 데이터를 설정합니다.
+        특정 시간대의 캔들 데이터를 설정합니다. Upbit 응답 형식의 dict 리스트는 CandleSeries로 변환해 보관합니다.
         
         Args:
             timeframe (str): 캔들 시간대 (예: '15m', '1h', '4h', '1d')
-            candles (list): 캔들 데이터 리스트
+            candles (CandleSeries | list): 캔들 시계열 또는 캔들 데이터 리스트
         """
+        if not isinstance(candles, CandleSeries):
+            candles = CandleSeries.from_upbit(candles or [], self.market)
         self.candles[timeframe] = candles
         
     def get_candles(self, timeframe):
         """
-        특정 시간대의 캔들 데이터를 가져옵니다.
+        특정 시간대의 캔들 데이터를 Upbit 응답 형식(최신 순 dict 리스트)으로 가져옵니다.
+        호출할 때마다 시계열에서 새로 만드므로, 반복 처리에는 get_series()를 사용합니다.
         
         Args:
             timeframe (str): 캔들 시간대 (예: '15m', '1h', '4h', '1d')
@@ -26,6 +31,19 @@ class CandleChart:
         Returns:
             list: 해당 시간대의 캔들 데이터 리스트, 없으면 None
         """
+        series = self.candles.get(timeframe)
+        return series.to_upbit() if series is not None else None
+
+    def get_series(self, timeframe) -> CandleSeries:
+        """
+        특정 시간대의 캔들 시계열(과거 순 열 배열)을 가져옵니다.
+        
+        Args:
+            timeframe (str): 캔들 시간대 (예: '15m', '1h', '4h', '1d')
+            
+        Returns:
+            CandleSeries: 해당 시간대의 캔들 시계열, 없으면 None
+        """
         return self.candles.get(timeframe)
     
     def get_all_timeframes(self):
@@ -46,7 +64,7 @@ class CandleChart:
     def __str__(self):
         """json 형태로 출력"""
         return json.dumps({
-            "candles": self.candles,
+            "candles": {timeframe: series.to_upbit() for timeframe, series in self.candles.items()},
             "current_price": self.current_price,
             "market": self.market
         }, indent=4, ensure_ascii=False)
\ No newline at end of file
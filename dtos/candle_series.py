@@ -0,0 +1,170 @@
+import bisect
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+
+_UTC_EPOCH = datetime(1970, 1, 1)
+_KST_EPOCH = datetime(1970, 1, 1, 9) # epoch 0의 KST 시각 (naive). tz 변환 없이 더하고 빼기만 하도록
+
+def kst_to_epoch(text: str) -> int:
+    """Upbit candle_date_time_kst 문자열(ex. 2025-01-01T09:00:00)을 epoch 초로 변환합니다."""
+    return (datetime.fromisoformat(text) - _KST_EPOCH) // timedelta(seconds=1)
+
+@lru_cache(maxsize=16384)
+def epoch_to_kst(epoch: int) -> str:
+    """
+    epoch 초를 Upbit candle_date_time_kst 형식 문자열로 변환합니다.
+    캔들 시각은 틱마다, 그리고 마켓끼리도 같은 격자에서 반복되므로 결과를 캐시합니다.
+    """
+    return (_KST_EPOCH + timedelta(seconds=epoch)).isoformat()
+
+def _concat(typecode: str, views: list) -> array:
+    """같은 형식의 버퍼들을 이어 붙인 새 배열"""
+    values = array(typecode)
+    for view in views:
+        values.frombytes(memoryview(view).cast('B'))
+    return values
+
+class CandleSeries:
+    """
+    한 (마켓, 시간대)의 캔들을 열 단위로 보관하는 불변 시계열.
+    캔들 시작 시각은 int64 epoch 초, OHLCV는 float64 배열이며 과거 순으로 정렬됩니다.
+    열은 memoryview라서 tail()/slice()는 데이터를 복사하지 않고, 병합(merge)은 새 배열을 만듭니다.
+    캔들 하나를 dict(필드 10여 개)로 들고 있을 때보다 메모리를 훨씬 적게 쓰며,
+    기존 코드와의 호환이 필요하면 to_upbit()로 Upbit 응답 형식(최신 순 dict 리스트)을 만들 수 있습니다.
+    """
+
+    __slots__ = ("market", "times", "opens", "highs", "lows", "closes", "volumes")
+
+    TIME_TYPECODE = "q"
+    VALUE_TYPECODE = "d"
+    # 값 열 이름과 Upbit 응답 필드 (시가, 고가, 저가, 종가, 거래량)
+    VALUE_COLUMNS = ("opens", "highs", "lows", "closes", "volumes")
+    UPBIT_KEYS = ('opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume')
+
+    def __init__(self, market: str = None, times=None, opens=None, highs=None, lows=None, closes=None, volumes=None):
+        """
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            times: 캔들 시작 시각(epoch 초) 버퍼 (array('q') 또는 그 memoryview). 과거 순
+            opens, highs, lows, closes, volumes: times와 같은 길이의 array('d') 또는 그 memoryview
+        """
+        self.market = market
+        self.times = memoryview(times if times is not None else array(self.TIME_TYPECODE))
+        self.opens = memoryview(opens if opens is not None else array(self.VALUE_TYPECODE))
+        self.highs = memoryview(highs if highs is not None else array(self.VALUE_TYPECODE))
+        self.lows = memoryview(lows if lows is not None else array(self.VALUE_TYPECODE))
+        self.closes = memoryview(closes if closes is not None else array(self.VALUE_TYPECODE))
+        self.volumes = memoryview(volumes if volumes is not None else array(self.VALUE_TYPECODE))
+
+    @classmethod
+    def from_upbit(cls, candles: list, market: str = None) -> "CandleSeries":
+        """
+        Upbit 캔들 응답(dict 리스트, 순서 무관)으로 시계열을 만듭니다. 같은 시각의 캔들은 나중 것을 사용합니다.
+
+        Args:
+            candles (list): Upbit 캔들 dict 리스트
+            market (str, optional): 거래소 마켓. 없으면 캔들의 market 필드
+        """
+        if candles and market is None:
+            market = candles[0].get('market')
+        by_time = {candle['candle_date_time_kst']: candle for candle in candles}
+        keys = sorted(by_time)
+        ordered = [by_time[key] for key in keys]
+        columns = [array(cls.VALUE_TYPECODE, map(itemgetter(key), ordered)) for key in cls.UPBIT_KEYS]
+        return cls(market, array(cls.TIME_TYPECODE, map(kst_to_epoch, keys)), *columns)
+
+    def to_upbit(self) -> list:
+        """Upbit 응답과 같은 형식(최신 순 dict 리스트)으로 변환합니다. 기존 dict 기반 코드와의 호환용"""
+        candles = []
+        for index in range(len(self.times) - 1, -1, -1):
+            epoch = self.times[index]
+            candles.append({
+                'market': self.market,
+                'candle_date_time_utc': (_UTC_EPOCH + timedelta(seconds=epoch)).isoformat(),
+                'candle_date_time_kst': epoch_to_kst(epoch),
+                'opening_price': self.opens[index],
+                'high_price': self.highs[index],
+                'low_price': self.lows[index],
+                'trade_price': self.closes[index],
+                'candle_acc_trade_volume': self.volumes[index],
+            })
+        return candles
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __reduce__(self):
+        # memoryview는 피클할 수 없으므로 배열로 복사해 전달
+        return (CandleSeries, (self.market, *self.columns_copy()))
+
+    def columns(self) -> tuple:
+        """(times, opens, highs, lows, closes, volumes) memoryview"""
+        return (self.times, self.opens, self.highs, self.lows, self.closes, self.volumes)
+
+    def columns_copy(self) -> list:
+        """열을 새 array로 복사합니다."""
+        return [_concat(self.TIME_TYPECODE, [self.times])] + [
+            _concat(self.VALUE_TYPECODE, [getattr(self, name)]) for name in self.VALUE_COLUMNS
+        ]
+
+    def slice(self, start: int = None, stop: int = None) -> "CandleSeries":
+        """[start:stop] 구간을 복사 없이 반환합니다."""
+        return CandleSeries(self.market, *(column[start:stop] for column in self.columns()))
+
+    def tail(self, count: int) -> "CandleSeries":
+        """최신 count개 캔들을 복사 없이 반환합니다."""
+        if count <= 0:
+            return self.slice(0, 0)
+        return self.slice(-count)
+
+    def closed(self, count: int = None) -> "CandleSeries":
+        """
+        진행 중일 수 있는 마지막 캔들을 제외한 최신 count개(없으면 전부) 마감 캔들을 복사 없이 반환합니다.
+        """
+        size = max(len(self) - 1, 0)
+        count = size if count is None else min(count, size)
+        return self.slice(size - count, size)
+
+    def row(self, index: int) -> tuple:
+        """(시각, 시가, 고가, 저가, 종가, 거래량)"""
+        return tuple(column[index] for column in self.columns())
+
+    def last_time(self) -> (int | None):
+        """가장 최신 캔들의 시작 시각(epoch 초). 비어 있으면 None"""
+        return self.times[-1] if len(self.times) else None
+
+    def last_close(self) -> (float | None):
+        """가장 최신 캔들의 종가. 비어 있으면 None"""
+        return self.closes[-1] if len(self.closes) else None
+
+    def nbytes(self) -> int:
+        """열 데이터가 차지하는 바이트 수 (뷰 기준)"""
+        return sum(column.nbytes for column in self.columns())
+
+    def merge(self, other: "CandleSeries") -> "CandleSeries":
+        """
+        다른 시계열을 병합한 새 시계열을 반환합니다. 같은 시각의 캔들은 other 값을 사용합니다.
+        other가 이 시계열의 마지막 부분부터 이어지는 경우(진행 중 캔들 갱신 + 새 캔들 추가)는 배열을 이어 붙이기만 합니다.
+        """
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        start = bisect.bisect_left(self.times, other.times[0])
+        overlap = self.times[start:]
+        if len(overlap) <= len(other) and overlap == other.times[:len(overlap)]:
+            kept = self.slice(0, start)
+            return CandleSeries(self.market or other.market,
+                                _concat(self.TIME_TYPECODE, [kept.times, other.times]),
+                                *(_concat(self.VALUE_TYPECODE, [getattr(kept, name), getattr(other, name)])
+                                  for name in self.VALUE_COLUMNS))
+
+        # 드문 경우: 중간에 빠진 캔들이 채워지는 등 순서가 섞인 병합
+        rows = {row[0]: row for row in map(self.row, range(len(self)))}
+        rows.update((row[0], row) for row in map(other.row, range(len(other))))
+        ordered = [rows[key] for key in sorted(rows)]
+        return CandleSeries(self.market or other.market,
+                            array(self.TIME_TYPECODE, [row[0] for row in ordered]),
+                            *(array(self.VALUE_TYPECODE, [row[i] for row in ordered]) for i in range(1, 6)))
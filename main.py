@@ -2,6 +2,7 @@ import asyncio
 import datetime
 import traceback
 
+from services.tick_scheduler import Tick, TickScheduler
 from services.trade_service import TradeService
 from settings.singleton_pack import SingletonPack
 
@@ -10,26 +11,85 @@ async def main(trade_service: TradeService, s_pack: SingletonPack):
         # 가장 작은 시간 간격(분) 가져오기
         smallest_interval_minutes = s_pack.get_smallest_timeframe_minutes()
         print(f"Detected smallest timeframe interval: {smallest_interval_minutes} minutes.")
-        print(f"Trade logic will run every {smallest_interval_minutes} minutes at the start of the minute.")
+        if s_pack.STREAM_MODE:
+            print(f"Trade logic will run on each {smallest_interval_minutes}-minute candle close from the WebSocket stream.")
+        else:
+            print(f"Trade logic will run every {smallest_interval_minutes} minutes, "
+                  f"{s_pack.POST_CLOSE_DELAY_SECONDS}s after each candle close.")
     except ValueError as e:
         print(f"Error initializing main loop: {e}")
         return # 오류 발생 시 종료
 
-    while(True):
-        now = datetime.datetime.now()
-        # 현재 초가 0이고, 현재 분이 가장 작은 시간 간격으로 나누어 떨어질 때 실행
-        if now.second == 0 and now.minute % smallest_interval_minutes == 0:
-            print(f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] Running trade logic...")
-            try:
-                # execute_trade_logic 호출 (user_id는 예시로 1을 사용)
-                await trade_service.execute_trade_logic(1)
-            except Exception as e:
-                # 실행 중 오류 발생 시 로그 출력 후 계속 진행
-                print(f"Error during trade logic execution: {e}")
-                traceback.print_exc()
-        
-        # 다음 초까지 대기 (CPU 사용량 감소)
-        await asyncio.sleep(1)
+    # 이벤트 루프 안에서 장기 HTTP 세션 등 비동기 자원 시작
+    await s_pack.startup()
+    try:
+        await run_loop(trade_service, s_pack)
+    finally:
+        await s_pack.shutdown()
+
+async def run_markets(trade_service: TradeService, s_pack: SingletonPack, markets: list):
+    """마켓들의 거래 로직을 실행하고 결과를 출력합니다. 오류는 출력 후 다음 틱을 위해 삼킵니다."""
+    try:
+        if s_pack.BATCH_MODE:
+            # 마켓별 결정을 모든 회원에게 일괄 적용
+            report = await trade_service.execute_batch_trade_logic(markets, s_pack.TICK_BUDGET_SECONDS)
+            print(f"Batch tick finished: {report['decided']}/{report['markets']} markets decided, "
+                  f"{report['buys']} buys / {report['sells']} sells across {report['members']} members "
+                  f"in {report['elapsed_seconds']}s. Rate limiter: {s_pack.rate_limiter.get_stats()}")
+        else:
+            # 설정된 모든 마켓에 대해 동시에 실행 (user_id는 예시로 1을 사용)
+            report = await trade_service.execute_trade_logic_for_markets(1, markets, s_pack.TICK_BUDGET_SECONDS)
+            print(f"Tick finished: {report['within_budget']}/{report['markets']} markets within budget "
+                  f"({report['over_budget']} over, {report['failed']} failed) in {report['elapsed_seconds']}s. "
+                  f"Rate limiter: {s_pack.rate_limiter.get_stats()}")
+    except Exception as e:
+        # 실행 중 오류 발생 시 로그 출력 후 계속 진행
+        print(f"Error during trade logic execution: {e}")
+        traceback.print_exc()
+
+async def run_loop(trade_service: TradeService, s_pack: SingletonPack):
+    if s_pack.upbit_stream is not None:
+        await run_stream_loop(trade_service, s_pack)
+        return
+
+    scheduler = TickScheduler(
+        timeframe_minutes=s_pack.get_timeframe_minutes(),
+        post_close_delay=s_pack.POST_CLOSE_DELAY_SECONDS,
+        debug=s_pack.DEBUG
+    )
+
+    async def on_tick(tick: Tick):
+        print(f"[{datetime.datetime.fromtimestamp(tick.fired_at).strftime('%Y-%m-%d %H:%M:%S')}] Running trade logic... {tick}")
+        await run_markets(trade_service, s_pack, tick.markets)
+        print(f"Scheduler: {scheduler.get_stats()}")
+
+    # 다음 캔들 마감 시각까지 대기했다가 실행 (매초 폴링하지 않음)
+    await scheduler.run(s_pack.MARKETS, on_tick)
+
+async def run_stream_loop(trade_service: TradeService, s_pack: SingletonPack):
+    """스트림이 캔들 마감을 알릴 때마다 해당 마켓의 거래 로직을 실행합니다. 같은 마켓은 동시에 두 번 실행하지 않습니다."""
+    stream = s_pack.upbit_stream
+    running = set()
+
+    async def on_close(boundary: float, markets: list):
+        runnable = [market for market in markets if market not in running]
+        if len(runnable) < len(markets):
+            print(f"Previous run still in progress for {len(markets) - len(runnable)} market(s); skipping them.")
+        if not runnable:
+            return
+        running.update(runnable)
+        try:
+            closed_at = datetime.datetime.fromtimestamp(boundary).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Candle closed at {closed_at} "
+                  f"for {len(runnable)} market(s). Running trade logic...")
+            await run_markets(trade_service, s_pack, runnable)
+            print(f"Stream: {stream.get_stats()}")
+        finally:
+            running.difference_update(runnable)
+
+    stream.set_on_close(on_close)
+    # 연결/재연결과 마감 감지는 스트림 태스크가 담당
+    await asyncio.Event().wait()
 
 if __name__ == "__main__":
     try:
@@ -46,11 +106,28 @@ if __name__ == "__main__":
 
         # 설정값 출력
         print("================ Settings ================")
-        print(f"  Decision Service: {s_pack.decision_service.__class__.__name__}")
-        print(f"  Market: {s_pack.MARKET}")
+        print(f"  Decision Service: {s_pack.decision_service.__class__.__name__} ({s_pack.DECISION_SERVICE})")
+        print(f"  Decision Executor: {s_pack.DECISION_EXECUTOR}"
+              f"{'' if s_pack.decision_executor.is_inline() else f' ({s_pack.decision_executor.max_workers} workers)'}")
+        print(f"  Markets: {', '.join(s_pack.MARKETS)}")
+        print(f"  Upbit API: {s_pack.UPBIT_BASE_URL}")
+        print(f"  Upbit Rate Limit: {s_pack.UPBIT_RATE_PER_SECOND}/s, {s_pack.UPBIT_RATE_PER_MINUTE}/min")
+        print(f"  Tick Budget: {s_pack.TICK_BUDGET_SECONDS}s")
+        print(f"  Post-Close Delay: {s_pack.POST_CLOSE_DELAY_SECONDS}s")
+        print(f"  Stream: {f'{s_pack.UPBIT_WS_URL} (close delay {s_pack.STREAM_CLOSE_DELAY_SECONDS}s)' if s_pack.STREAM_MODE else 'Disabled'}")
+        print(f"  Batch Mode: {'Enabled' if s_pack.BATCH_MODE else 'Disabled'}")
         print(f"  DCA Percentage: {s_pack.DCA * 100:.2f}%") # 소수점 표시 개선
         print(f"  Timeframe Config: {s_pack.TIMEFRAME_CONFIG}")
+        print(f"  Candle Store: {s_pack.CANDLE_STORE_PATH}")
+        print(f"  Resample: {f'from {s_pack.RESAMPLE_BASE_TIMEFRAME} (up to {s_pack.RESAMPLE_MAX_BASE_CANDLES} base candles)' if s_pack.RESAMPLE_BASE_TIMEFRAME else 'Disabled'}")
+        print(f"  Decision Log: batch {s_pack.DECISION_LOG_BATCH_SIZE}, every {s_pack.DECISION_LOG_FLUSH_INTERVAL}s, "
+              f"queue {s_pack.DECISION_LOG_QUEUE_SIZE} ({s_pack.DECISION_LOG_OVERFLOW_POLICY})")
+        print(f"  Metrics: {f'{s_pack.METRICS_HOST}:{s_pack.METRICS_PORT}/metrics' if s_pack.METRICS_PORT else 'Disabled'}")
         print(f"  Debug Mode: {'Enabled' if s_pack.DEBUG else 'Disabled'}")
+        startup_report = s_pack.get_startup_report()
+        print(f"  Startup: {startup_report['total_ms']} ms {startup_report['steps_ms']}, "
+              f"schema {'created' if startup_report['schema_created'] else 'up to date'}, "
+              f"lazy: {', '.join(startup_report['lazy_pending']) or 'none'}")
         print("==========================================")
         print("\nStarting bot...\n")
 
@@ -73,4 +150,8 @@ if __name__ == "__main__":
             print("Closing database connection...")
             s_pack.dbms.close_all()
             print("Database connection closed.")
+        if 's_pack' in locals() and hasattr(s_pack, 'candle_repo') and s_pack.candle_repo:
+            s_pack.candle_repo.close()
+        if 's_pack' in locals() and s_pack.is_initialized('decision_cache'):
+            s_pack.decision_cache.close()
         print("Bot stopped.")
\ No newline at end of file
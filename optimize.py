@@ -0,0 +1,83 @@
+"""
+CandleAnalysisService Ichimoku 파라미터 최적화.
+
+tenkan/kijun/senkou_b 기간, chikou/senkou 오프셋, strict 모드 조합을 과거 캔들로 평가하고 순위표를 CSV로 저장합니다.
+조합 평가는 프로세스 풀에서 실행하며, 캔들과 롤링 고가/저가 열은 공유 메모리로 한 번만 전달합니다.
+결과는 같은 파라미터로 backtest.py를 실행한 결과와 같습니다. (services.parameter_optimizer 참고)
+
+파라미터 값 형식: 시작:끝[:간격] (끝 포함) 또는 쉼표 목록 (ex. --tenkan 7:12 --kijun 20:30:2 --senkou-b 44,52,60)
+
+사용법:
+    python optimize.py --synthetic-days 365 --tenkan 7:12 --kijun 20:32:2 --senkou-b 40:60:4 --output ranking.csv
+    python optimize.py --candle-store ./candles.db --market KRW-BTC --random 2000 --tenkan 5:20 --kijun 15:40 \\
+        --senkou-b 30:90 --chikou 10:30 --senkou-offset 10:30 --strict both --walk-forward 4
+"""
+import argparse
+import json
+import sys
+
+from backtest import DEFAULT_TIMEFRAME_CONFIG, load_series
+from services.parameter_optimizer import PARAM_NAMES, ParameterOptimizer
+
+def parse_values(text: str) -> list:
+    """'7:12', '20:30:2' (끝 포함) 또는 '44,52,60' 형식의 정수 후보 목록"""
+    if ":" in text:
+        parts = [int(part) for part in text.split(":")]
+        start, stop, step = parts[0], parts[1], parts[2] if len(parts) > 2 else 1
+        return list(range(start, stop + 1, step))
+    return [int(part) for part in text.split(",") if part.strip()]
+
+def parse_strict(text: str) -> list:
+    return {"off": [False], "on": [True], "both": [False, True]}[text]
+
+def main():
+    parser = argparse.ArgumentParser(description="CandleAnalysisService Ichimoku 파라미터 그리드/랜덤 탐색")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--timeframes", default=DEFAULT_TIMEFRAME_CONFIG, help="TIMEFRAME_CONFIG와 같은 JSON (시간대 -> 캔들 수)")
+    parser.add_argument("--candle-store", help="캔들 저장소(SQLite) 경로")
+    parser.add_argument("--fetch-days", type=int, help="Upbit에서 받을 최근 일수")
+    parser.add_argument("--synthetic-days", type=int, help="합성 캔들 일수")
+    parser.add_argument("--seed", type=int, default=7, help="합성 캔들/랜덤 탐색 시드")
+    parser.add_argument("--dca", type=float, default=1.0, help="매수 시 사용할 잔고 비율(%%). DCA 환경 변수와 같음")
+    parser.add_argument("--balance", type=int, default=10_000_000, help="구간마다 시작하는 잔고(KRW)")
+    parser.add_argument("--tenkan", type=parse_values, default="9")
+    parser.add_argument("--kijun", type=parse_values, default="26")
+    parser.add_argument("--senkou-b", type=parse_values, default="52")
+    parser.add_argument("--chikou", type=parse_values, default="26")
+    parser.add_argument("--senkou-offset", type=parse_values, default="26")
+    parser.add_argument("--strict", type=parse_strict, default="off", help="off, on, both")
+    parser.add_argument("--random", type=int, help="전체 그리드 대신 무작위로 고를 조합 수")
+    parser.add_argument("--objective", choices=ParameterOptimizer.OBJECTIVES, default=ParameterOptimizer.OBJECTIVE_RETURN)
+    parser.add_argument("--walk-forward", type=int, default=0, help="워크포워드 검증 구간 수 (0이면 전체 기간 하나로 평가)")
+    parser.add_argument("--train-blocks", type=int, default=ParameterOptimizer.DEFAULT_TRAIN_BLOCKS, help="워크포워드 학습 구간의 블록 수")
+    parser.add_argument("--workers", type=int, help="프로세스 풀 작업자 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--top", type=int, default=20, help="출력할 상위 조합 수")
+    parser.add_argument("--output", default="ranking.csv", help="순위표 CSV 경로")
+    parser.add_argument("--summary", help="요약(JSON) 파일 경로")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    timeframe_config = json.loads(args.timeframes)
+    optimizer = ParameterOptimizer(timeframe_config, dca=args.dca / 100, initial_balance=args.balance,
+                                   objective=args.objective, max_workers=args.workers, debug=args.debug)
+    space = dict(zip(PARAM_NAMES, (args.tenkan, args.kijun, args.senkou_b, args.chikou, args.senkou_offset, args.strict)))
+    combinations = optimizer.sample(space, args.random, args.seed) if args.random else optimizer.grid(space)
+
+    base_timeframe = optimizer.get_base_timeframe()
+    series = load_series(args, base_timeframe, optimizer.get_minutes(base_timeframe))
+    print(f"Loaded {len(series)} {base_timeframe} candles of {args.market}, evaluating {len(combinations)} combinations", file=sys.stderr)
+
+    report = optimizer.run(args.market, series, combinations, args.walk_forward, args.train_blocks)
+    optimizer.write_table(args.output, report["ranking"])
+
+    summary = {key: value for key, value in report.items() if key != "ranking"}
+    summary["top"] = report["ranking"][:args.top]
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    print(text)
+    print(f"Ranking of {len(report['ranking'])} combinations written to {args.output}", file=sys.stderr)
+    if args.summary:
+        with open(args.summary, "w") as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,23 @@ from tables.action import Action, ActionType
 from tables.coin import Coin
 from tables.member import Member
 from dtos.decision import Decision
+from sqlalchemy import insert
 from sqlalchemy.orm import scoped_session
 
 class ActionRepo:
     def __init__(self):
         self.__fee = 0.9995
     
+    def calculate_buy_amount(self, decision: Decision, total_price: int) -> Decimal:
+        """수수료를 반영한 구매 수량"""
+        return Decimal(total_price) / Decimal(decision.current_price) * Decimal(self.__fee)
+
+    def calculate_sell_price(self, decision: Decision, amount: Decimal) -> int:
+        """수수료를 반영한 판매 금액 (소수점 이하 버림)"""
+        return Decimal(decision.current_price) * Decimal(amount) * Decimal(self.__fee) // 1
+    
     def buy_coin(self, member: Member, decision: Decision, total_price: int, session: scoped_session) -> Decimal:
-        amount = Decimal(total_price) / Decimal(decision.current_price) * Decimal(self.__fee)
+        amount = self.calculate_buy_amount(decision, total_price)
         
         action = Action(
             action = ActionType.BUY,
@@ -26,7 +35,7 @@ class ActionRepo:
     
     def sell_coin(self, coin: Coin, decision: Decision, session: scoped_session) -> int:
         member: Member = coin.member
-        price = Decimal(decision.current_price) * Decimal(coin.amount) * Decimal(self.__fee) // 1
+        price = self.calculate_sell_price(decision, coin.amount)
         action = Action(
             action = ActionType.SELL,
             market = decision.market,
@@ -36,4 +45,9 @@ class ActionRepo:
             member = member
         )
         session.add(action)
-        return price
\ No newline at end of file
+        return price
+
+    def bulk_insert_actions(self, actions: list[dict], session: scoped_session):
+        """Action 컬럼 값 딕셔너리 리스트를 다중 행 INSERT로 저장합니다."""
+        if actions:
+            session.execute(insert(Action), actions)
@@ -0,0 +1,112 @@
+import json
+import sqlite3
+
+from dtos.candle_series import CandleSeries, epoch_to_kst
+
+class CandleRepo:
+    """
+    (마켓, 시간대)별 Upbit 캔들을 로컬 SQLite 파일에 보관하는 저장소.
+    UpbitClient가 마지막으로 저장된 캔들 이후의 구간만 요청할 수 있도록 하며,
+    재시작 직후에도 저장된 윈도우를 바로 사용할 수 있게 합니다.
+    조회는 메모리 캐시(열 단위 CandleSeries)에서 처리하고, 변경분만 SQLite에 기록합니다.
+    """
+
+    DEFAULT_RETENTION = 1000 # (마켓, 시간대)별 보관할 최대 캔들 수
+
+    def __init__(self, path: str, retention: int = DEFAULT_RETENTION):
+        self.__retention = retention
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS candle ("
+            " market TEXT NOT NULL,"
+            " timeframe TEXT NOT NULL,"
+            " candle_date_time_kst TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " PRIMARY KEY (market, timeframe, candle_date_time_kst))"
+        )
+        self.__connection.commit()
+        # (마켓, 시간대) -> 과거 순 캔들 시계열. 저장할 때마다 새 시계열로 교체(불변)하므로 내보낸 뷰는 그대로 유효
+        self.__cache = {}
+
+    def __load(self, market: str, timeframe: str) -> CandleSeries:
+        key = (market, timeframe)
+        series = self.__cache.get(key)
+        if series is None:
+            rows = self.__connection.execute(
+                "SELECT data FROM candle WHERE market = ? AND timeframe = ?"
+                " ORDER BY candle_date_time_kst DESC LIMIT ?",
+                (market, timeframe, self.__retention)
+            ).fetchall()
+            series = CandleSeries.from_upbit([json.loads(row[0]) for row in rows], market)
+            self.__cache[key] = series
+        return series
+
+    def get_last_time(self, market: str, timeframe: str) -> (str | None):
+        """저장된 가장 최신 캔들의 candle_date_time_kst. 없으면 None"""
+        last_time = self.__load(market, timeframe).last_time()
+        return epoch_to_kst(last_time) if last_time is not None else None
+
+    def count(self, market: str, timeframe: str) -> int:
+        """저장된 캔들 수"""
+        return len(self.__load(market, timeframe))
+
+    def get_latest_series(self, market: str, timeframe: str, count: int) -> CandleSeries:
+        """
+        저장된 최신 캔들 count개를 과거 순 시계열로 반환합니다. (복사 없음)
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            timeframe (str): 시간대 (예: '15m', '1h')
+            count (int): 반환할 최대 캔들 수
+        Returns:
+            CandleSeries: 과거 순 캔들 시계열
+        """
+        return self.__load(market, timeframe).tail(count)
+
+    def get_latest(self, market: str, timeframe: str, count: int) -> list:
+        """
+        저장된 최신 캔들을 Upbit 응답과 같은 순서(최신 순)의 dict 리스트로 반환합니다.
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            timeframe (str): 시간대 (예: '15m', '1h')
+            count (int): 반환할 최대 캔들 수
+        Returns:
+            list: 최신 순으로 정렬된 캔들 데이터 리스트
+        """
+        return self.get_latest_series(market, timeframe, count).to_upbit()
+
+    def save(self, market: str, timeframe: str, candles):
+        """
+        Upbit에서 받은 캔들을 병합합니다. 같은 시간의 캔들은 새 값으로 교체합니다.
+        (진행 중이던 캔들이 마감된 값으로 갱신되는 경우)
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            timeframe (str): 시간대 (예: '15m', '1h')
+            candles (CandleSeries | list): 캔들 시계열 또는 Upbit 응답 캔들 데이터 리스트 (순서 무관)
+        """
+        if not isinstance(candles, CandleSeries):
+            candles = CandleSeries.from_upbit(candles, market)
+        if not len(candles):
+            return
+        merged = self.__load(market, timeframe).merge(candles)
+        overflow = len(merged) - self.__retention
+        if overflow > 0:
+            # 오래된 캔들은 뷰에서 잘라냄 (다음 병합 때 새 배열에서도 빠짐)
+            merged = merged.tail(self.__retention)
+        self.__cache[(market, timeframe)] = merged
+
+        with self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO candle (market, timeframe, candle_date_time_kst, data) VALUES (?, ?, ?, ?)",
+                [(market, timeframe, candle['candle_date_time_kst'], json.dumps(candle)) for candle in candles.to_upbit()]
+            )
+            # 보관 개수를 넘는 오래된 캔들 정리
+            if overflow > 0:
+                self.__connection.execute(
+                    "DELETE FROM candle WHERE market = ? AND timeframe = ? AND candle_date_time_kst < ?",
+                    (market, timeframe, epoch_to_kst(merged.times[0]))
+                )
+
+    def close(self):
+        self.__connection.close()
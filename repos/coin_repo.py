@@ -2,6 +2,7 @@ from decimal import Decimal
 from tables.coin import Coin
 from tables.member import Member
 from dtos.decision import Decision
+from sqlalchemy import delete, insert
 from sqlalchemy.orm import scoped_session
 
 class CoinRepo:
@@ -11,4 +12,14 @@ class CoinRepo:
             amount = amount,
             member = member
         )
-        session.add(coin)
\ No newline at end of file
+        session.add(coin)
+
+    def bulk_insert_coins(self, coins: list[dict], session: scoped_session):
+        """Coin 컬럼 값 딕셔너리 리스트를 다중 행 INSERT로 저장합니다."""
+        if coins:
+            session.execute(insert(Coin), coins)
+
+    def bulk_delete_coins(self, coin_ids: list[int], session: scoped_session):
+        """판매된 코인들을 한 번의 DELETE로 삭제합니다."""
+        if coin_ids:
+            session.execute(delete(Coin).where(Coin.id.in_(coin_ids)))
@@ -0,0 +1,144 @@
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+
+from dtos.candle_chart import CandleChart
+from dtos.candle_series import CandleSeries
+from dtos.decision import Decision
+
+class DecisionCache:
+    """
+    캔들 차트 지문(fingerprint)을 키로 LLM 결정을 보관하는 캐시.
+    키는 마켓, 모델, 요청 스킴 템플릿, 시간대별 마감된 캔들로 만들며,
+    $current_time/$current_price처럼 매 틱 바뀌는 값은 치환 전 템플릿을 쓰므로 키에 포함되지 않습니다.
+    메모리 계층은 TTL과 LRU로 관리하고, path를 지정하면 재시작 후에도 유지되는 SQLite 계층을 함께 사용합니다.
+    """
+
+    DEFAULT_TTL_SECONDS = 3600 # 캐시 항목 유효 시간(초)
+    DEFAULT_MAX_ENTRIES = 1024 # 메모리 계층 최대 항목 수
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES, path: str = None):
+        """
+        Args:
+            ttl_seconds (float): 캐시 항목 유효 시간(초)
+            max_entries (int): 메모리 계층 최대 항목 수. 넘으면 가장 오래 사용하지 않은 항목부터 제거
+            path (str): 디스크 계층(SQLite) 경로. None이면 메모리 계층만 사용
+        """
+        self.__ttl_seconds = ttl_seconds
+        self.__max_entries = max_entries
+        # 키 -> (만료 시각(epoch 초), action, reason). 최근 사용한 항목이 뒤쪽
+        self.__entries = OrderedDict()
+        # (마켓, 시간대) -> (마감 캔들 서명, 지문)
+        self.__fingerprints = {}
+        self.__stats = {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+        self.__connection = None
+        if path:
+            self.__connection = sqlite3.connect(path, check_same_thread=False)
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS decision_cache ("
+                " key TEXT PRIMARY KEY,"
+                " action TEXT NOT NULL,"
+                " reason TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self.__connection.execute("DELETE FROM decision_cache WHERE expires_at <= ?", (time.time(),))
+            self.__connection.commit()
+
+    def make_key(self, market: str, model: str, request_scheme: str, candle_chart: CandleChart) -> str:
+        """
+        캔들 차트 지문 키를 만듭니다. 각 시간대의 가장 최신 캔들은 아직 마감되지 않았을 수 있으므로 제외합니다.
+
+        Args:
+            market (str): 마켓 (ex. KRW-BTC)
+            model (str): LLM 모델 이름
+            request_scheme (str): 플레이스홀더 치환 전 요청 스킴 템플릿
+            candle_chart (CandleChart): 캔들 차트
+
+        Returns:
+            str: 16진수 해시 키
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{market}\x1f{model}\x1f".encode())
+        digest.update(request_scheme.encode())
+        for timeframe in sorted(candle_chart.get_all_timeframes()):
+            series = candle_chart.get_series(timeframe) or CandleSeries()
+            digest.update(f"\x1e{timeframe}\x1f".encode())
+            # 마지막 캔들(진행 중일 수 있음)을 제외
+            digest.update(self.__fingerprint_candles(market, timeframe, series.closed()))
+        return digest.hexdigest()
+
+    def __fingerprint_candles(self, market: str, timeframe: str, completed: CandleSeries) -> bytes:
+        """
+        마감된 캔들 시계열의 지문 (시각, OHLCV 열의 바이트를 그대로 해시).
+        마감된 캔들은 바뀌지 않으므로 캔들 수, 가장 오래된 캔들, 가장 최신 마감 캔들 시각이
+        이전과 같으면 이전 지문을 재사용합니다. (틱마다 수백 개의 캔들을 다시 해시하지 않음)
+        """
+        if not len(completed):
+            return b""
+        signature = (len(completed), completed.row(0), completed.last_time())
+        memo = self.__fingerprints.get((market, timeframe))
+        if memo is not None and memo[0] == signature:
+            return memo[1]
+        hasher = hashlib.blake2b(digest_size=20)
+        for column in completed.columns():
+            hasher.update(column)
+        fingerprint = hasher.digest()
+        self.__fingerprints[(market, timeframe)] = (signature, fingerprint)
+        return fingerprint
+
+    def get(self, key: str) -> (Decision | None):
+        """캐시된 결정을 반환합니다. 없거나 만료되었으면 None"""
+        now = time.time()
+        entry = self.__entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self.__entries.move_to_end(key)
+                self.__stats["hits"] += 1
+                return Decision({"action": entry[1], "reason": entry[2]})
+            del self.__entries[key]
+            self.__stats["expired"] += 1
+
+        if self.__connection is not None:
+            row = self.__connection.execute(
+                "SELECT expires_at, action, reason FROM decision_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                self.__remember(key, tuple(row))
+                self.__stats["disk_hits"] += 1
+                return Decision({"action": row[1], "reason": row[2]})
+
+        self.__stats["misses"] += 1
+        return None
+
+    def put(self, key: str, decision: Decision):
+        """결정을 캐시에 저장합니다."""
+        entry = (time.time() + self.__ttl_seconds, decision.action, decision.reason)
+        self.__remember(key, entry)
+        if self.__connection is not None:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO decision_cache (key, action, reason, expires_at) VALUES (?, ?, ?, ?)",
+                (key, entry[1], entry[2], entry[0])
+            )
+            self.__connection.commit()
+
+    def get_stats(self) -> dict:
+        """적중/디스크 적중/미스/만료/제거 횟수와 메모리 계층 항목 수"""
+        stats = dict(self.__stats)
+        stats["entries"] = len(self.__entries)
+        return stats
+
+    def close(self):
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __remember(self, key: str, entry: tuple):
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+            self.__stats["evicted"] += 1
@@ -1,3 +1,4 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import scoped_session
 from tables.decision_log import DecisionLog
 from dtos.decision import Decision
@@ -10,4 +11,9 @@ class DecisionLogRepo:
             price = decision.current_price,
             market = decision.market
         )
-        session.add(decision_log)
\ No newline at end of file
+        session.add(decision_log)
+
+    def bulk_log_decisions(self, rows: list[dict], session: scoped_session):
+        """DecisionLog 컬럼 값 딕셔너리 리스트를 다중 행 INSERT로 저장합니다."""
+        if rows:
+            session.execute(insert(DecisionLog), rows)
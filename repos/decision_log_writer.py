@@ -0,0 +1,172 @@
+import asyncio
+from collections import deque
+from datetime import datetime
+from enum import Enum
+
+from dtos.decision import Decision
+from repos.decision_log_repo import DecisionLogRepo
+from settings.db_connection import DBMS
+
+class DecisionLogWriter:
+    """
+    결정 로그를 메모리 큐에 쌓아 두었다가 백그라운드 태스크가 다중 행 INSERT로 일괄 기록하는 write-behind 로거.
+    결정 경로에서는 큐에 넣기만 하므로 DB 왕복 없이 반환됩니다.
+    큐가 가득 차면 overflow_policy에 따라 가장 오래된 로그를 버리거나(drop_oldest),
+    새 로그를 버리거나(drop_newest), 자리가 날 때까지 기다립니다(block).
+    stop()이 호출된 뒤에 들어온 로그는 기록하지 않고 rejected로 셉니다.
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BLOCK = "block"
+
+    def __init__(self,
+                 dbms: DBMS,
+                 decision_log_repo: DecisionLogRepo,
+                 max_queue_size: int = 10000,
+                 batch_size: int = 500,
+                 flush_interval: float = 1.0,
+                 overflow_policy: str = DROP_OLDEST,
+                 debug = False):
+        """
+        Args:
+            dbms (DBMS): 기록에 사용할 DBMS
+            decision_log_repo (DecisionLogRepo): 결정 로그 저장소
+            max_queue_size (int): 큐에 쌓을 수 있는 최대 로그 수
+            batch_size (int): 이 개수만큼 쌓이면 즉시 기록
+            flush_interval (float): 개수와 무관하게 기록하는 주기(초)
+            overflow_policy (str): 큐가 가득 찼을 때의 정책 (drop_oldest, drop_newest, block)
+            debug (bool): 디버그 모드 활성화 여부
+        """
+        if overflow_policy not in (self.DROP_OLDEST, self.DROP_NEWEST, self.BLOCK):
+            raise ValueError(f"지원하지 않는 overflow_policy입니다: {overflow_policy}")
+        self.__dbms = dbms
+        self.__decision_log_repo = decision_log_repo
+        self.__max_queue_size = max_queue_size
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__overflow_policy = overflow_policy
+        self.__debug = debug
+
+        self.__queue = deque()
+        self.__wake = asyncio.Event()
+        self.__space_available = asyncio.Event()
+        self.__task: asyncio.Task = None
+        self.__stopping = False
+        self.__stats = {"queued": 0, "written": 0, "dropped": 0, "failed": 0, "rejected": 0, "flushes": 0}
+
+    def _log_debug(self, message: str):
+        """디버그 메시지를 출력하는 헬퍼 메서드"""
+        if self.__debug:
+            print(f"DecisionLogWriter: {message}")
+
+    def start(self):
+        """백그라운드 기록 태스크를 시작합니다. 실행 중인 이벤트 루프 안에서 호출해야 합니다."""
+        if self.__task is None or self.__task.done():
+            self.__stopping = False
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        """새 기록을 멈추고 큐에 남은 로그를 모두 기록한 뒤 태스크를 종료합니다."""
+        self.__stopping = True
+        self.__wake.set()
+        if self.__task is not None:
+            await self.__task
+            self.__task = None
+
+    async def put(self, decision: Decision):
+        """
+        결정 로그를 큐에 넣습니다. block 정책에서 큐가 가득 찼을 때만 대기합니다.
+        기록 태스크가 없으면(start() 전) block 정책은 가장 오래된 배치를 직접 기록해 자리를 만들고,
+        stop()이 호출된 뒤에는 로그를 받지 않습니다(rejected).
+        """
+        if self.__stopping:
+            self.__stats["rejected"] += 1
+            print(f"DecisionLogWriter: Rejected decision log for {decision.market} after stop()")
+            return
+        row = self.__to_row(decision)
+        if len(self.__queue) >= self.__max_queue_size:
+            if self.__overflow_policy == self.BLOCK:
+                # 백프레셔: 기록 태스크가 자리를 비울 때까지 대기 (태스크가 없으면 직접 기록)
+                while len(self.__queue) >= self.__max_queue_size:
+                    if self.__task is None or self.__task.done():
+                        await self.__write_batch(self.__take_batch())
+                        continue
+                    self.__space_available.clear()
+                    self.__wake.set()
+                    await self.__space_available.wait()
+            elif self.__overflow_policy == self.DROP_NEWEST:
+                self.__stats["dropped"] += 1
+                return
+            else:
+                self.__queue.popleft()
+                self.__stats["dropped"] += 1
+
+        self.__queue.append(row)
+        self.__stats["queued"] += 1
+        if len(self.__queue) >= self.__batch_size:
+            self.__wake.set()
+
+    def get_stats(self) -> dict:
+        stats = dict(self.__stats)
+        stats["pending"] = len(self.__queue)
+        return stats
+
+    def flush_sync(self):
+        """
+        큐에 남은 로그를 동기 세션으로 모두 기록합니다.
+        이벤트 루프가 이미 종료된 뒤 DBMS.close_all()에서 호출됩니다.
+        """
+        while self.__queue:
+            batch = self.__take_batch()
+            try:
+                with self.__dbms.get_session() as session:
+                    self.__decision_log_repo.bulk_log_decisions(batch, session)
+                self.__stats["written"] += len(batch)
+                self.__stats["flushes"] += 1
+            except Exception as e:
+                self.__stats["failed"] += len(batch)
+                print(f"DecisionLogWriter: Failed to write {len(batch)} decision logs on shutdown: {e}")
+
+    def __to_row(self, decision: Decision) -> dict:
+        action = decision.action
+        return {
+            "action": action.value if isinstance(action, Enum) else action,
+            "reason": decision.reason,
+            "price": decision.current_price,
+            "market": decision.market,
+            "created_at": datetime.now(), # 기록 시점이 아닌 결정 시점
+        }
+
+    def __take_batch(self) -> list:
+        batch = []
+        while self.__queue and len(batch) < self.__batch_size:
+            batch.append(self.__queue.popleft())
+        self.__space_available.set()
+        return batch
+
+    async def __run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.__wake.wait(), timeout=self.__flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.__wake.clear()
+
+            while self.__queue:
+                await self.__write_batch(self.__take_batch())
+
+            if self.__stopping:
+                break
+
+    async def __write_batch(self, batch: list):
+        try:
+            await self.__dbms.run_in_session(
+                lambda session: self.__decision_log_repo.bulk_log_decisions(batch, session)
+            )
+            self.__stats["written"] += len(batch)
+            self.__stats["flushes"] += 1
+            self._log_debug(f"Wrote {len(batch)} decision logs")
+        except Exception as e:
+            self.__stats["failed"] += len(batch)
+            print(f"DecisionLogWriter: Failed to write {len(batch)} decision logs: {e}")
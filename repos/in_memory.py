@@ -0,0 +1,175 @@
+from contextlib import asynccontextmanager, contextmanager
+from decimal import Decimal
+
+from sqlalchemy import inspect
+
+from dtos.decision import Decision
+from repos.action_repo import ActionRepo
+from repos.coin_repo import CoinRepo
+from repos.decision_log_repo import DecisionLogRepo
+from repos.member_repo import MemberRepo
+from tables.action import ActionType
+from tables.coin import Coin
+from tables.member import Member
+
+class InMemorySession:
+    """
+    MySQL 없이 서비스를 실행하기 위한 세션 대용품. (벤치마크, 백테스트용)
+    add()로 받은 객체를 보관만 하고 실제 I/O는 하지 않습니다.
+    """
+
+    def __init__(self):
+        self.added = []
+        self.deleted = [] # 커밋 전까지 대기 중인 삭제 객체
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    def add_all(self, instances):
+        self.added.extend(instances)
+
+    def delete(self, instance):
+        self.deleted.append(instance)
+
+    def flush(self):
+        # DB에서 행이 지워진 뒤 다시 조회한 것처럼, 삭제한 객체를 가리키던 단일 관계를 끊음 (ex. coin.member.coin)
+        for instance in self.deleted:
+            state = inspect(instance, raiseerr=False)
+            if state is None:
+                continue
+            for relationship in state.mapper.relationships:
+                if not relationship.uselist:
+                    setattr(instance, relationship.key, None)
+        self.deleted.clear()
+
+    def commit(self):
+        self.flush()
+
+    def rollback(self):
+        self.deleted.clear()
+
+    def close(self):
+        pass
+
+class InMemoryDBMS:
+    """DBMS와 같은 세션 인터페이스(get_session, run_in_session)를 제공하는 메모리 DBMS"""
+
+    def __init__(self):
+        self.session = InMemorySession()
+
+    def is_async(self) -> bool:
+        return False
+
+    @contextmanager
+    def get_session(self):
+        yield self.session
+        self.session.commit()
+
+    @asynccontextmanager
+    async def get_async_session(self):
+        yield self.session
+        self.session.commit()
+
+    async def run_in_session(self, work):
+        with self.get_session() as session:
+            return work(session)
+
+    def add_close_hook(self, hook):
+        pass
+
+    def close_all(self):
+        pass
+
+    async def close_async(self):
+        pass
+
+class InMemoryDecisionLogRepo(DecisionLogRepo):
+    """결정 로그를 리스트에 보관하는 저장소"""
+
+    def __init__(self):
+        self.logs = []
+
+    def log_decision(self, decision: Decision, session):
+        self.logs.append({
+            "action": decision.action,
+            "reason": decision.reason,
+            "price": decision.current_price,
+            "market": decision.market,
+        })
+
+    def bulk_log_decisions(self, rows: list[dict], session):
+        self.logs.extend(rows)
+
+class InMemoryMemberRepo(MemberRepo):
+    """회원을 딕셔너리(ID -> Member)에 보관하는 저장소"""
+
+    def __init__(self, members: list[Member] = None):
+        self.members = {member.id: member for member in members or []}
+
+    def get_member_by_id(self, member_id: int, session) -> (Member | None):
+        return self.members.get(member_id)
+
+    def get_all_members_with_coin(self, session) -> list[Member]:
+        return list(self.members.values())
+
+    def bulk_update_balances(self, balances: list[dict], session):
+        for row in balances:
+            self.members[row["id"]].balance = row["balance"]
+
+class InMemoryCoinRepo(CoinRepo):
+    """보유 코인을 회원 객체(member.coin)에 직접 연결하는 저장소. 코인 ID는 생성 순서대로 부여"""
+
+    def __init__(self, member_repo: InMemoryMemberRepo):
+        self.__member_repo = member_repo
+        self.__next_id = 1
+
+    def __create(self, market: str, amount: Decimal, member: Member) -> Coin:
+        coin = Coin(id=self.__next_id, market=market, amount=amount, member_id=member.id, member=member)
+        self.__next_id += 1
+        return coin
+
+    def buy_coin(self, member: Member, decision: Decision, amount: Decimal, session):
+        session.add(self.__create(decision.market, amount, member))
+
+    def bulk_insert_coins(self, coins: list[dict], session):
+        for row in coins:
+            self.__create(row["market"], row["amount"], self.__member_repo.members[row["member_id"]])
+
+    def bulk_delete_coins(self, coin_ids: list[int], session):
+        sold = set(coin_ids)
+        for member in self.__member_repo.members.values():
+            if member.coin is not None and member.coin.id in sold:
+                member.coin = None
+
+class InMemoryActionRepo(ActionRepo):
+    """
+    매수/매도 계산(수수료, 수량)은 ActionRepo를 그대로 사용하고, 기록한 거래를 리스트에 보관하는 저장소.
+    actions 항목: {'action', 'market', 'amount', 'entry_price', 'total_price', 'member_id'}
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.actions = []
+
+    def buy_coin(self, member: Member, decision: Decision, total_price: int, session) -> Decimal:
+        amount = super().buy_coin(member, decision, total_price, session)
+        self.__record(ActionType.BUY, decision, amount, total_price, member.id)
+        return amount
+
+    def sell_coin(self, coin: Coin, decision: Decision, session) -> int:
+        price = super().sell_coin(coin, decision, session)
+        self.__record(ActionType.SELL, decision, coin.amount, price, coin.member.id)
+        return price
+
+    def bulk_insert_actions(self, actions: list[dict], session):
+        self.actions.extend(actions)
+
+    def __record(self, action: ActionType, decision: Decision, amount: Decimal, total_price, member_id: int):
+        self.actions.append({
+            "action": action,
+            "market": decision.market,
+            "amount": amount,
+            "entry_price": decision.current_price,
+            "total_price": int(total_price),
+            "member_id": member_id,
+        })
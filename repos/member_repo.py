@@ -1,7 +1,18 @@
-from sqlalchemy.orm import scoped_session
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload, scoped_session
 
 from tables.member import Member
 
 class MemberRepo:
     def get_member_by_id(self, member_id: int, session: scoped_session) -> (Member | None):
-        return session.query(Member).filter(Member.id == member_id).first()
\ No newline at end of file
+        # 보유 코인을 함께 로드해 추가 조회(lazy load) 왕복을 없앰
+        return session.query(Member).options(joinedload(Member.coin)).filter(Member.id == member_id).first()
+
+    def get_all_members_with_coin(self, session: scoped_session) -> list[Member]:
+        """모든 회원과 보유 코인을 한 번의 쿼리(JOIN)로 가져옵니다."""
+        return session.query(Member).options(joinedload(Member.coin)).all()
+
+    def bulk_update_balances(self, balances: list[dict], session: scoped_session):
+        """[{'id': 회원 ID, 'balance': 잔고}, ...]를 기본키 기준 일괄 UPDATE로 반영합니다."""
+        if balances:
+            session.execute(update(Member), balances)
@@ -4,6 +4,8 @@ from tables.member import Member
 from dtos.decision import Decision
 from repos.action_repo import ActionRepo
 from repos.coin_repo import CoinRepo
+from repos.member_repo import MemberRepo
+from tables.action import ActionType
 from sqlalchemy.orm import scoped_session
 
 class ActionService:
@@ -16,6 +18,13 @@ class ActionService:
         
     def set_coin_repo(self, coin_repo: CoinRepo):
         self.__coin_repo = coin_repo
+        
+    def set_member_repo(self, member_repo: MemberRepo):
+        self.__member_repo = member_repo
+
+    def _calculate_total_price(self, balance: int) -> Decimal:
+        """DCA 비율에 따라 구매할 금액을 계산 (소수점 이하를 버림하여 정수로 변환)"""
+        return Decimal(balance) * Decimal(self.__dca) // 1
     
     def sell_coin(self, coin: Coin, decision: Decision, session: scoped_session):
         print(f"ActionService: Selling coin {coin.market} for member {coin.member_id} based on decision: {decision.action}")
@@ -38,7 +47,7 @@ class ActionService:
         # 현재 잔액을 가져옴
         balance = Decimal(member.balance)
         # DCA 비율에 따라 구매할 금액을 계산 (소수점 이하를 버림하여 정수로 변환)
-        total_price: int = balance * Decimal(self.__dca) // 1
+        total_price: int = self._calculate_total_price(balance)
         if self.__debug:
             print(f"ActionService: Calculated purchase price: {total_price} based on balance {balance} and DCA {self.__dca}")
         # 코인 구매 로직 실행 및 구매량 반환
@@ -58,4 +67,63 @@ class ActionService:
         # 잔액 업데이트
         member.minus_balance(total_price)
         session.add(member)
-        print(f"ActionService: Coin purchased. Amount: {amount}. Member {member.id}'s new balance: {member.balance}")
\ No newline at end of file
+        print(f"ActionService: Coin purchased. Amount: {amount}. Member {member.id}'s new balance: {member.balance}")
+
+    def apply_decisions_bulk(self, members: list[Member], decisions: dict, session: scoped_session) -> dict:
+        """
+        마켓별 결정을 모든 회원에게 한 트랜잭션 안에서 일괄 적용합니다.
+        매수/매도 계산은 buy_coin()/sell_coin()과 같은 DCA 비율과 수수료를 사용하고,
+        결과는 ORM 객체 단위가 아닌 다중 행 INSERT/UPDATE/DELETE로 기록합니다.
+
+        - 코인을 보유한 회원: 보유 마켓의 결정이 'SELL'이면 매도합니다.
+        - 코인이 없는 회원: decisions 순서상 첫 번째 'BUY' 마켓을 매수합니다. (회원당 코인은 하나)
+
+        Args:
+            members (list[Member]): coin이 미리 로드된 회원 리스트.
+            decisions (dict): 마켓 -> Decision.
+            session (scoped_session): 트랜잭션 세션.
+        Returns:
+            dict: 매수/매도 건수.
+        """
+        buy_decision = next((decision for decision in decisions.values() if decision.action == "BUY"), None)
+
+        actions, new_coins, sold_coin_ids, balances = [], [], [], []
+        for member in members:
+            coin = member.coin
+            if coin is not None:
+                decision = decisions.get(coin.market)
+                if decision is None or decision.action != "SELL":
+                    continue
+                price = self.__action_repo.calculate_sell_price(decision, coin.amount)
+                actions.append({
+                    "action": ActionType.SELL,
+                    "market": decision.market,
+                    "amount": coin.amount,
+                    "entry_price": decision.current_price,
+                    "total_price": int(price),
+                    "member_id": member.id,
+                })
+                sold_coin_ids.append(coin.id)
+                balances.append({"id": member.id, "balance": int(member.balance + price)})
+            elif buy_decision is not None:
+                total_price = self._calculate_total_price(member.balance)
+                amount = self.__action_repo.calculate_buy_amount(buy_decision, total_price)
+                actions.append({
+                    "action": ActionType.BUY,
+                    "market": buy_decision.market,
+                    "amount": amount,
+                    "entry_price": buy_decision.current_price,
+                    "total_price": int(total_price),
+                    "member_id": member.id,
+                })
+                new_coins.append({"market": buy_decision.market, "amount": amount, "member_id": member.id})
+                balances.append({"id": member.id, "balance": int(member.balance - total_price)})
+
+        self.__action_repo.bulk_insert_actions(actions, session)
+        self.__coin_repo.bulk_delete_coins(sold_coin_ids, session)
+        self.__coin_repo.bulk_insert_coins(new_coins, session)
+        self.__member_repo.bulk_update_balances(balances, session)
+
+        result = {"buys": len(new_coins), "sells": len(sold_coin_ids)}
+        print(f"ActionService: Applied decisions in bulk to {len(members)} members: {result}")
+        return result
@@ -0,0 +1,195 @@
+import contextlib
+import io
+import re
+import time
+from collections import Counter
+
+from clients.historical_candle_client import HistoricalCandleClient
+from dtos.candle_series import CandleSeries, epoch_to_kst
+from repos.in_memory import InMemoryActionRepo, InMemoryCoinRepo, InMemoryDBMS, InMemoryDecisionLogRepo, InMemoryMemberRepo
+from services.action_service import ActionService
+from services.decision_service import DecisionService
+from services.trade_service import TradeService
+from tables.action import ActionType
+from tables.member import Member
+
+class BacktestService:
+    """
+    과거 캔들을 시간 순서대로 재생하며 실거래와 같은 경로(TradeService -> DecisionService -> ActionService/ActionRepo)를
+    그대로 실행하는 이벤트 기반 백테스터.
+
+    이벤트는 기준 시간대(설정 중 가장 짧은 시간대) 캔들의 마감이며, 이벤트마다 HistoricalCandleClient가 그 시점의
+    다중 시간대 캔들 차트를 룩어헤드 없이 만들어 실제 결정 서비스에 전달합니다. 매수/매도는 ActionService(DCA 비율)와
+    ActionRepo(수수료 0.9995)를 그대로 사용하고, MySQL 대신 메모리 저장소(repos.in_memory)에 기록합니다.
+    결과로 손익, 최대 낙폭, 거래 수, 처리 속도를 보고합니다.
+    """
+
+    DEFAULT_INITIAL_BALANCE = 10_000_000 # 초기 잔고(KRW)
+    MEMBER_ID = 1 # 백테스트 회원 ID
+    MEMBER_NAME = "backtest"
+
+    def __init__(self, timeframe_config: dict, dca: float = 0.01, initial_balance: int = DEFAULT_INITIAL_BALANCE,
+                 quiet: bool = True, debug: bool = False):
+        """
+        Args:
+            timeframe_config (dict): 시간대별 캔들 수 (ex. {'5m': 125, '4h': 125}). 실거래의 TIMEFRAME_CONFIG와 같음
+            dca (float): 매수 시 사용할 잔고 비율 (ex. 0.01 = 1%)
+            initial_balance (int): 초기 잔고(KRW)
+            quiet (bool): 거래 경로의 이벤트별 출력(결정/매매 로그)을 버릴지 여부. debug이면 항상 출력
+            debug (bool): 디버그 모드 활성화 여부
+        """
+        self.__timeframe_config = timeframe_config
+        self.__dca = dca
+        self.__initial_balance = initial_balance
+        self.__quiet = quiet and not debug
+        self.__debug = debug
+        self.__decision_service = None
+
+    def set_decision_service(self, decision_service: DecisionService):
+        self.__decision_service = decision_service
+
+    def _log_debug(self, message: str, shouldDebugMode: bool = True):
+        """디버그 메시지를 출력하는 헬퍼 메서드"""
+        if self.__debug or not shouldDebugMode:
+            print(f"BacktestService: {message}")
+
+    def _parse_timeframe_to_minutes(self, timeframe: str) -> int:
+        """시간 프레임 문자열을 분 단위로 변환 (예: '1d', '4h', '15m')"""
+        match = re.match(r"(\d+)([mhd])$", timeframe, re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Invalid timeframe format: {timeframe}")
+        value, unit = int(match.group(1)), match.group(2).lower()
+        return value * {'m': 1, 'h': 60, 'd': 60 * 24}[unit]
+
+    def get_base_timeframe(self) -> str:
+        """재생할 기준 시간대 (설정 중 가장 짧은 시간대)"""
+        return min(self.__timeframe_config, key=self._parse_timeframe_to_minutes)
+
+    async def run(self, market: str, base: CandleSeries, start: int = None, end: int = None) -> dict:
+        """
+        기준 시간대 캔들 이력을 재생합니다. 결정 서비스의 결정 로그는 이 실행의 메모리 저장소에 기록됩니다.
+
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            base (CandleSeries): 기준 시간대(get_base_timeframe()) 캔들 이력 (과거 순, 모두 마감된 캔들)
+            start (int, optional): 첫 이벤트의 기준 캔들 index. 없으면 모든 시간대의 윈도우가 찰 때부터
+            end (int, optional): 마지막 이벤트 다음 index. 없으면 이력 끝까지
+
+        Returns:
+            dict: 기간, 손익, 수익률, 최대 낙폭, 거래 수, 결정 분포, 처리 속도와 거래 내역
+        """
+        if self.__decision_service is None:
+            raise ValueError("결정 서비스가 설정되지 않았습니다.")
+        units = {timeframe: self._parse_timeframe_to_minutes(timeframe) for timeframe in self.__timeframe_config}
+        client = HistoricalCandleClient(market, base, units[self.get_base_timeframe()], units)
+        ready = client.first_ready_index(self.__timeframe_config)
+        start = ready if start is None else max(start, ready)
+        end = len(client) if end is None else min(end, len(client))
+        if start >= end:
+            raise ValueError(f"캔들 이력이 부족합니다. (기준 캔들 {len(client)}개, 워밍업 {ready}개)")
+
+        # MySQL 대신 메모리 저장소로 실거래와 같은 서비스 그래프를 구성
+        dbms = InMemoryDBMS()
+        member = Member(id=self.MEMBER_ID, name=self.MEMBER_NAME, balance=self.__initial_balance)
+        member_repo = InMemoryMemberRepo([member])
+        action_repo = InMemoryActionRepo()
+        decision_log_repo = InMemoryDecisionLogRepo()
+
+        action_service = ActionService(self.__dca, self.__debug)
+        action_service.set_action_repo(action_repo)
+        action_service.set_coin_repo(InMemoryCoinRepo(member_repo))
+        action_service.set_member_repo(member_repo)
+
+        decision_service = self.__decision_service
+        decision_service.set_dbms(dbms)
+        decision_service.set_decision_log_repo(decision_log_repo)
+        decision_service.set_decision_log_writer(None)
+
+        trade_service = TradeService(self.__timeframe_config, self.__debug)
+        trade_service.set_upbit_client(client)
+        trade_service.set_action_service(action_service)
+        trade_service.set_decision_service(decision_service)
+        trade_service.set_member_repo(member_repo)
+        trade_service.set_dbms(dbms)
+
+        self._log_debug(f"Replaying {end - start} {self.get_base_timeframe()} candles of {market} "
+                        f"({epoch_to_kst(base.times[start])} ~ {epoch_to_kst(base.times[end - 1])})")
+        trades = []
+        peak = float(self.__initial_balance)
+        max_drawdown = 0.0
+        equity = peak
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) if self.__quiet else contextlib.nullcontext() as sink:
+            for index in range(start, end):
+                client.seek(index)
+                await trade_service.execute_trade_logic(self.MEMBER_ID, market)
+                if sink is not None:
+                    # 버린 출력이 쌓이지 않도록 비움
+                    sink.seek(0)
+                    sink.truncate()
+                while len(trades) < len(action_repo.actions):
+                    action = action_repo.actions[len(trades)]
+                    trades.append({**action, "time": epoch_to_kst(client.now())})
+
+                # 보유 코인은 현재가로 평가
+                price = client.current_price()
+                coin = member.coin
+                equity = float(member.balance) + (float(coin.amount) * price if coin is not None else 0.0)
+                if equity > peak:
+                    peak = equity
+                elif peak > 0:
+                    max_drawdown = max(max_drawdown, (peak - equity) / peak)
+        elapsed = time.perf_counter() - started
+
+        return self.__report(market, base, start, end, equity, max_drawdown, trades, decision_log_repo.logs, elapsed)
+
+    def __report(self, market: str, base: CandleSeries, start: int, end: int, equity: float, max_drawdown: float,
+                 trades: list, decision_logs: list, elapsed: float) -> dict:
+        """실행 결과 요약"""
+        # 매도마다 직전 매수 금액과 비교한 왕복 거래 손익
+        round_trips = wins = 0
+        bought = None
+        for trade in trades:
+            if trade["action"] == ActionType.BUY:
+                bought = trade["total_price"]
+            elif bought is not None:
+                round_trips += 1
+                wins += trade["total_price"] > bought
+                bought = None
+
+        decisions = Counter(str(getattr(log["action"], "value", log["action"])) for log in decision_logs)
+        first_price, last_price = base.closes[start], base.closes[end - 1]
+        pnl = equity - self.__initial_balance
+        steps = end - start
+        return {
+            "market": market,
+            "timeframes": dict(self.__timeframe_config),
+            "start": epoch_to_kst(base.times[start]),
+            "end": epoch_to_kst(base.times[end - 1]),
+            "steps": steps,
+            "initial_balance": self.__initial_balance,
+            "final_equity": round(equity, 2),
+            "pnl": round(pnl, 2),
+            "return_pct": round(pnl / self.__initial_balance * 100, 4),
+            "buy_and_hold_return_pct": round((last_price / first_price - 1) * 100, 4),
+            "max_drawdown_pct": round(max_drawdown * 100, 4),
+            "trades": len(trades),
+            "buys": sum(1 for trade in trades if trade["action"] == ActionType.BUY),
+            "sells": sum(1 for trade in trades if trade["action"] == ActionType.SELL),
+            "round_trips": round_trips,
+            "win_rate_pct": round(wins / round_trips * 100, 2) if round_trips else None,
+            "open_position": bool(trades) and trades[-1]["action"] == ActionType.BUY,
+            "decisions": dict(decisions),
+            "elapsed_seconds": round(elapsed, 3),
+            "steps_per_second": round(steps / elapsed, 1) if elapsed > 0 else None,
+            "trade_log": [
+                {
+                    "time": trade["time"],
+                    "action": trade["action"].value,
+                    "price": trade["entry_price"],
+                    "amount": float(trade["amount"]),
+                    "total_price": trade["total_price"],
+                }
+                for trade in trades
+            ],
+        }
@@ -1,14 +1,21 @@
-import pandas as pd # 데이터 처리를 위해 pandas 사용
 from dtos.candle_chart import CandleChart
+from dtos.candle_series import CandleSeries
 from dtos.decision import Decision
 from repos.decision_log_repo import DecisionLogRepo
+from repos.decision_log_writer import DecisionLogWriter
+from services.decision_executor import DecisionExecutor, SharedArrays
 from services.decision_service import DecisionService
-import numpy as np # NaN 값 처리를 위해 numpy 사용
+from services.ichimoku_calculator import IchimokuCalculator, calculate_shared_rows
+import math # NaN 값 처리를 위해 math 사용
 import re # 시간 프레임 문자열 파싱을 위해 re 사용
 from enum import Enum
+from typing import TYPE_CHECKING
 
 from settings.db_connection import DBMS
 
+if TYPE_CHECKING:
+    import pandas as pd # _calculate_ichimoku()(DataFrame 기준 경로)에서만 사용. 결정 경로는 IchimokuCalculator
+
 # Action 열거형 정의
 class Action(str, Enum):
     BUY = "BUY"
@@ -54,12 +61,22 @@ class CandleAnalysisService(DecisionService):
         self.senkou_b_period = senkou_b_period
         self.chikou_offset = chikou_offset
         self.senkou_offset = senkou_offset
+        # (마켓, 시간대)별 증분 Ichimoku 계산기
+        self.__calculators = {}
+        self.__decision_log_writer = None # 설정되면 결정 로그를 write-behind로 기록
+        self.__decision_executor = DecisionExecutor() # Ichimoku 계산 실행 위치 (기본값: 이벤트 루프에서 바로 실행)
         
     def set_decision_log_repo(self, decision_log_repo: DecisionLogRepo):
         self.__decision_log_repo = decision_log_repo
         
     def set_dbms(self, dbms: DBMS):
         self.__dbms = dbms
+
+    def set_decision_log_writer(self, decision_log_writer: DecisionLogWriter):
+        self.__decision_log_writer = decision_log_writer
+
+    def set_decision_executor(self, decision_executor: DecisionExecutor):
+        self.__decision_executor = decision_executor
         
     def _log_debug(self, message: str):
         """디버그 메시지를 출력하는 헬퍼 메서드"""
@@ -83,19 +100,78 @@ class CandleAnalysisService(DecisionService):
         else:
             raise ValueError(f"Unknown timeframe unit: {unit}")
         
-    def _create_decision(self, action: Action, reason: str, current_price: int = None, market: str = None) -> Decision:
+    async def _create_decision(self, action: Action, reason: str, current_price: int = None, market: str = None) -> Decision:
         try:
             decision = Decision({"action": action, "reason": reason})
             decision.set_market(market)
             decision.set_current_price(current_price)
-            with self.__dbms.get_session() as session:
-                self.__decision_log_repo.log_decision(decision, session)
+            if self.__decision_log_writer is not None:
+                # write-behind: 큐에 넣기만 하고 DB 기록은 백그라운드에서 일괄 처리
+                await self.__decision_log_writer.put(decision)
+            else:
+                await self.__dbms.run_in_session(lambda session: self.__decision_log_repo.log_decision(decision, session))
             return decision
         except Exception as e:
             self._log_debug(f"Error creating decision: {e}")
             return Decision({"action": Action.NEUTRAL, "reason": f"Error creating decision: {e}"})
 
-    def _calculate_ichimoku(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _get_calculator(self, market: str, timeframe: str) -> IchimokuCalculator:
+        """(마켓, 시간대)에 해당하는 증분 Ichimoku 계산기를 반환합니다. 없으면 새로 생성합니다."""
+        key = (market, timeframe)
+        calculator = self.__calculators.get(key)
+        if calculator is None:
+            calculator = IchimokuCalculator(
+                tenkan_period=self.tenkan_period,
+                kijun_period=self.kijun_period,
+                senkou_b_period=self.senkou_b_period,
+                chikou_offset=self.chikou_offset,
+                senkou_offset=self.senkou_offset
+            )
+            self.__calculators[key] = calculator
+        return calculator
+
+    def _get_ichimoku_params(self) -> tuple:
+        """IchimokuCalculator 생성자 인자"""
+        return (self.tenkan_period, self.kijun_period, self.senkou_b_period, self.chikou_offset, self.senkou_offset)
+
+    def _to_arrays(self, series: CandleSeries) -> list:
+        """시계열의 고가/저가/종가 열 (복사 없는 memoryview)"""
+        return [series.highs, series.lows, series.closes]
+
+    def _sync_calculators(self, windows: list) -> list:
+        """
+        (계산기, 캔들 시계열) 쌍마다 증분 계산기를 동기화하고 (최신 행, 직전 행)을 반환합니다.
+        inline 모드에서는 이벤트 루프에서, thread 모드에서는 풀 스레드에서 실행됩니다.
+        같은 마켓의 틱은 동시에 실행되지 않으므로(TickScheduler) 한 계산기를 두 스레드가 함께 갱신하지 않습니다.
+        """
+        rows = []
+        for calculator, series in windows:
+            calculator.sync(series)
+            rows.append((calculator.latest(), calculator.previous()))
+        return rows
+
+    async def _calculate_rows(self, market: str, htf: str, htf_candles: CandleSeries, ltf: str, ltf_candles: CandleSeries) -> list:
+        """
+        HTF/LTF의 Ichimoku (최신 행, 직전 행)을 설정된 실행기에서 계산합니다.
+        inline/thread 모드는 (마켓, 시간대)별 증분 계산기를 사용하고(새로 마감된 캔들만 누적),
+        process 모드는 시계열의 고가/저가/종가 열을 공유 메모리에 복사해 작업 프로세스에서 윈도우 전체로 계산합니다.
+
+        Returns:
+            list: [(htf_latest, htf_previous), (ltf_latest, ltf_previous)]
+        """
+        if self.__decision_executor.is_process():
+            self._log_debug("Calculating Ichimoku for HTF and LTF in process pool")
+            with SharedArrays(self._to_arrays(htf_candles) + self._to_arrays(ltf_candles)) as shared:
+                return await self.__decision_executor.run(
+                    calculate_shared_rows, self._get_ichimoku_params(), shared.name, shared.lengths
+                )
+
+        # 증분 Ichimoku 계산기 동기화 (계산기 생성은 이벤트 루프에서, 누적은 설정된 실행기에서)
+        self._log_debug("Updating incremental Ichimoku calculators for HTF and LTF")
+        windows = [(self._get_calculator(market, htf), htf_candles), (self._get_calculator(market, ltf), ltf_candles)]
+        return await self.__decision_executor.run(self._sync_calculators, windows)
+
+    def _calculate_ichimoku(self, df: "pd.DataFrame") -> "pd.DataFrame":
         """Ichimoku 지표 계산"""
         self._log_debug("Calculating Ichimoku indicators")
         # Tenkan-sen (Conversion Line)
@@ -141,7 +217,7 @@ class CandleAnalysisService(DecisionService):
         available_timeframes = candle_chart.get_all_timeframes()
         if len(available_timeframes) < 2:
             self._log_debug("Insufficient timeframes: requires at least two timeframes")
-            return self._create_decision(Action.NEUTRAL, "Requires at least two timeframes in CandleChart")
+            return await self._create_decision(Action.NEUTRAL, "Requires at least two timeframes in CandleChart")
 
         # 시간 프레임을 분 단위로 변환하여 정렬
         try:
@@ -149,7 +225,7 @@ class CandleAnalysisService(DecisionService):
             self._log_debug(f"Parsed timeframes to minutes: {timeframes_minutes}")
         except ValueError as e:
              self._log_debug(f"Error parsing timeframes: {e}")
-             return self._create_decision(Action.NEUTRAL, f"Error parsing timeframes: {e}")
+             return await self._create_decision(Action.NEUTRAL, f"Error parsing timeframes: {e}")
              
         sorted_timeframes = sorted(timeframes_minutes.keys(), key=lambda tf: timeframes_minutes[tf])
         
@@ -158,63 +234,37 @@ class CandleAnalysisService(DecisionService):
         htf = sorted_timeframes[-1]
         self._log_debug(f"Using LTF: {ltf}, HTF: {htf}")
 
-        htf_candles = candle_chart.get_candles(htf)
-        ltf_candles = candle_chart.get_candles(ltf)
+        htf_candles = candle_chart.get_series(htf)
+        ltf_candles = candle_chart.get_series(ltf)
         current_price = candle_chart.current_price
         market = candle_chart.market
 
         if not htf_candles or not ltf_candles or len(htf_candles) < self.senkou_b_period or len(ltf_candles) < self.senkou_b_period:
             self._log_debug(f"Insufficient candle data for HTF({htf}) or LTF({ltf})")
-            return self._create_decision(Action.NEUTRAL, f"Insufficient candle data for HTF({htf}) or LTF({ltf})")
-
-        # 데이터프레임 생성 (컬럼명은 일반적인 형태 가정, 필요시 조정)
-        self._log_debug("Creating dataframes for HTF and LTF")
-        htf_df = pd.DataFrame(htf_candles)
-        htf_df.rename(columns={'high_price': 'high', 'low_price': 'low', 'trade_price': 'close', 'opening_price': 'open'}, inplace=True)
-        htf_df['timestamp'] = pd.to_datetime(htf_df['candle_date_time_kst'])
-        htf_df.set_index('timestamp', inplace=True)
-        htf_df.sort_index(inplace=True)
-
-        ltf_df = pd.DataFrame(ltf_candles)
-        ltf_df.rename(columns={'high_price': 'high', 'low_price': 'low', 'trade_price': 'close', 'opening_price': 'open'}, inplace=True)
-        ltf_df['timestamp'] = pd.to_datetime(ltf_df['candle_date_time_kst'])
-        ltf_df.set_index('timestamp', inplace=True)
-        ltf_df.sort_index(inplace=True)
-
-        # Ichimoku 지표 계산
-        self._log_debug("Calculating Ichimoku indicators for HTF and LTF")
-        htf_ichimoku = self._calculate_ichimoku(htf_df.copy())
-        ltf_ichimoku = self._calculate_ichimoku(ltf_df.copy())
-
-        # 최신 데이터 가져오기 (NaN 값 제거 후)
-        htf_analysis = htf_ichimoku.dropna()
-        if htf_analysis.empty:
+            return await self._create_decision(Action.NEUTRAL, f"Insufficient candle data for HTF({htf}) or LTF({ltf})")
+
+        # 최신 데이터 가져오기 (DataFrame 경로의 dropna() 이후 행과 동일)
+        (htf_latest, _), (ltf_latest, ltf_previous) = await self._calculate_rows(market, htf, htf_candles, ltf, ltf_candles)
+        if htf_latest is None:
             self._log_debug(f"HTF({htf}) data insufficient after dropna()")
-            return self._create_decision(Action.NEUTRAL, f"HTF({htf}) data insufficient after dropna()")
-        htf_latest = htf_analysis.iloc[-1]
+            return await self._create_decision(Action.NEUTRAL, f"HTF({htf}) data insufficient after dropna()")
         # LTF는 현재와 이전 캔들 필요 (크로스오버 확인용)
-        ltf_analysis = ltf_ichimoku.dropna()
-        if len(ltf_analysis) < 2:
+        if ltf_latest is None or ltf_previous is None:
              self._log_debug(f"Insufficient LTF({ltf}) data for crossover analysis")
-             return self._create_decision(Action.NEUTRAL, f"Insufficient LTF({ltf}) data for crossover analysis")
-        ltf_latest = ltf_analysis.iloc[-1]
-        ltf_previous = ltf_analysis.iloc[-2]
+             return await self._create_decision(Action.NEUTRAL, f"Insufficient LTF({ltf}) data for crossover analysis")
 
         # --- HTF Trend Assessment ---
         self._log_debug("Assessing HTF trend")
         htf_trend = Trend.NEUTRAL
         # Chikou Span 비교를 위한 과거 가격 (chikou_offset 이전 캔들)
-        htf_price_at_chikou_time_index = htf_ichimoku.index.get_loc(htf_latest.name) - self.chikou_offset
-        htf_price_at_chikou_time = np.nan
-        if htf_price_at_chikou_time_index >= 0 and htf_price_at_chikou_time_index < len(htf_ichimoku): # 인덱스 범위 확인 추가
-             htf_price_at_chikou_time = htf_ichimoku.iloc[htf_price_at_chikou_time_index]['close']
+        htf_price_at_chikou_time = htf_latest['price_at_chikou_time']
 
         is_htf_bullish = (htf_latest['close'] > htf_latest['kumo_top'] and 
-                          not np.isnan(htf_price_at_chikou_time) and
+                          not math.isnan(htf_price_at_chikou_time) and
                           htf_latest['chikou_span'] > htf_price_at_chikou_time)
                           
         is_htf_bearish = (htf_latest['close'] < htf_latest['kumo_bottom'] and
-                          not np.isnan(htf_price_at_chikou_time) and
+                          not math.isnan(htf_price_at_chikou_time) and
                           htf_latest['chikou_span'] < htf_price_at_chikou_time)
 
         if self.strict_mode:
@@ -237,10 +287,7 @@ class CandleAnalysisService(DecisionService):
         reason = f"HTF({htf}) Trend: {htf_trend}"
 
         # Chikou Span 비교를 위한 과거 가격 (chikou_offset 이전 캔들)
-        ltf_price_at_chikou_time_index = ltf_ichimoku.index.get_loc(ltf_latest.name) - self.chikou_offset
-        ltf_price_at_chikou_time = np.nan
-        if ltf_price_at_chikou_time_index >= 0 and ltf_price_at_chikou_time_index < len(ltf_ichimoku): # 인덱스 범위 확인 추가
-             ltf_price_at_chikou_time = ltf_ichimoku.iloc[ltf_price_at_chikou_time_index]['close']
+        ltf_price_at_chikou_time = ltf_latest['price_at_chikou_time']
 
         if htf_trend == Trend.BULLISH:
             # LTF Buy Signal (TK Cross Above Kumo)
@@ -248,7 +295,7 @@ class CandleAnalysisService(DecisionService):
                              ltf_latest['tenkan_sen'] > ltf_latest['kijun_sen'])
             cross_above_kumo = ltf_latest['tenkan_sen'] > ltf_latest['kumo_top'] # 크로스 지점 또는 현재 종가 기준
             price_above_kumo = ltf_latest['close'] > ltf_latest['kumo_top']
-            chikou_confirms = (not np.isnan(ltf_price_at_chikou_time) and 
+            chikou_confirms = (not math.isnan(ltf_price_at_chikou_time) and 
                                ltf_latest['chikou_span'] > ltf_price_at_chikou_time)
 
             if tk_crossed_up and cross_above_kumo and price_above_kumo and chikou_confirms:
@@ -262,7 +309,7 @@ class CandleAnalysisService(DecisionService):
                                ltf_latest['tenkan_sen'] < ltf_latest['kijun_sen'])
             cross_below_kumo = ltf_latest['tenkan_sen'] < ltf_latest['kumo_bottom'] # 크로스 지점 또는 현재 종가 기준
             price_below_kumo = ltf_latest['close'] < ltf_latest['kumo_bottom']
-            chikou_confirms = (not np.isnan(ltf_price_at_chikou_time) and 
+            chikou_confirms = (not math.isnan(ltf_price_at_chikou_time) and 
                                ltf_latest['chikou_span'] < ltf_price_at_chikou_time)
 
             if tk_crossed_down and cross_below_kumo and price_below_kumo and chikou_confirms:
@@ -270,6 +317,6 @@ class CandleAnalysisService(DecisionService):
                 reason = f"HTF({htf}) Bearish & LTF({ltf}) TK Cross Below Kumo Confirmed. HTF Close: {htf_latest['close']:.2f}, HTF Kumo Bottom: {htf_latest['kumo_bottom']:.2f}. LTF Close: {ltf_latest['close']:.2f}, LTF Kumo Bottom: {ltf_latest['kumo_bottom']:.2f}"
                 self._log_debug(f"SELL signal generated: {reason}")
 
-        decision = self._create_decision(action, reason, current_price, market)
+        decision = await self._create_decision(action, reason, current_price, market)
         self._log_debug(f"Final decision: {action} with reason: {reason}")
         return decision
\ No newline at end of file
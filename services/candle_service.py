@@ -1,13 +1,107 @@
 import json
+from datetime import datetime
+
+from dtos.candle_series import CandleSeries, epoch_to_kst
 
 class CandleService:
-    def candle_to_json(self, candles: list) -> str:
+    """
+    캔들 데이터를 LLM 프롬프트용 텍스트로 변환하는 서비스.
+    기본 JSON 외에 키 반복을 없앤 압축 인코딩을 제공합니다.
+        - table: 헤더 한 줄 + 쉼표 구분 행
+        - delta: table + 가격을 기준가(base_price) 대비 차이로 표기
+        - indexed: table + ISO 시각을 t0 기준 인덱스와 간격으로 표기
+        - compact: delta + indexed
+    """
+
+    FORMAT_JSON = "json"
+    FORMAT_TABLE = "table"
+    FORMAT_DELTA = "delta"
+    FORMAT_INDEXED = "indexed"
+    FORMAT_COMPACT = "compact"
+    FORMATS = (FORMAT_JSON, FORMAT_TABLE, FORMAT_DELTA, FORMAT_INDEXED, FORMAT_COMPACT)
+
+    PRICE_KEYS = ('opening_price', 'trade_price', 'high_price', 'low_price') # open, close, high, low 순서
+
+    def candle_to_json(self, candles) -> str:
+        if isinstance(candles, CandleSeries):
+            times, prices, volumes = self.__columns(candles)
+            converted_list = [
+                {'open_time': time_value, 'open': row[0], 'close': row[1], 'high': row[2], 'low': row[3], 'volume': volume}
+                for time_value, row, volume in zip(times, prices, volumes)
+            ]
+            return json.dumps(converted_list)
         converted_list = []
         for candle in candles:
             converted_list.append(self.__candle_to_json(candle))
         ret = json.dumps(converted_list)
         return ret
-    
+
+    def encode_candles(self, candles, candle_format: str = FORMAT_JSON) -> str:
+        """
+        캔들 리스트를 지정한 형식의 텍스트로 변환합니다. 행 순서는 입력 순서(Upbit 응답은 최신 순)를 유지하며,
+        CandleSeries는 Upbit 응답과 같은 최신 순으로 출력합니다.
+
+        Args:
+            candles (CandleSeries | list): 캔들 시계열 또는 Upbit 캔들 리스트
+            candle_format (str): json, table, delta, indexed, compact 중 하나
+
+        Returns:
+            str: 인코딩된 캔들 텍스트
+        """
+        if candle_format == self.FORMAT_JSON:
+            return self.candle_to_json(candles)
+        if candle_format not in self.FORMATS:
+            raise ValueError(f"지원하지 않는 캔들 형식입니다: {candle_format}")
+        if not len(candles):
+            return ""
+
+        time_values, prices, volumes = self.__columns(candles)
+        use_delta = candle_format in (self.FORMAT_DELTA, self.FORMAT_COMPACT)
+        use_index = candle_format in (self.FORMAT_INDEXED, self.FORMAT_COMPACT)
+        lines = []
+
+        # 가격 열: 기준가 대비 차이 (소수 자릿수는 원본 가격의 최대 자릿수로 맞춰 부동소수점 오차 제거)
+        if use_delta:
+            base = prices[0][1]
+            decimals = max(self.__decimals(price) for row in prices for price in row)
+            prices = [[round(price - base, decimals) for price in row] for row in prices]
+            lines.append(f"base_price: {self.__format_number(base)} (open/close/high/low are differences from base_price)")
+
+        # 시각 열: t0 기준 몇 번째 간격 전인지 (거래가 없어 빠진 캔들은 인덱스가 건너뜀)
+        if use_index:
+            times = [datetime.fromisoformat(time_value) for time_value in time_values]
+            t0 = times[0]
+            interval = self.__infer_interval_seconds(times)
+            time_column = [round(abs((t0 - t).total_seconds()) / interval) for t in times]
+            direction = "-" if times[-1] <= t0 else "+" # 최신 순이면 과거로 갈수록 인덱스 증가
+            lines.append(f"t0: {t0.isoformat()}, interval: {self.__format_interval(interval)} "
+                         f"(open_time = t0 {direction} i * interval)")
+            lines.append("columns: i,open,close,high,low,volume")
+        else:
+            time_column = time_values
+            lines.append("columns: open_time,open,close,high,low,volume")
+
+        for time_value, row, volume in zip(time_column, prices, volumes):
+            values = [str(time_value)] + [self.__format_number(price) for price in row]
+            values.append(self.__format_number(volume))
+            lines.append(",".join(values))
+        return "\n".join(lines)
+
+    def __columns(self, candles) -> tuple:
+        """
+        (시각 문자열, [시가, 종가, 고가, 저가] 행, 거래량) 열을 입력 순서로 반환합니다.
+        CandleSeries는 dict를 만들지 않고 열 배열에서 바로 최신 순으로 읽습니다.
+        """
+        if isinstance(candles, CandleSeries):
+            order = range(len(candles) - 1, -1, -1)
+            opens, closes, highs, lows = candles.opens, candles.closes, candles.highs, candles.lows
+            return ([epoch_to_kst(candles.times[i]) for i in order],
+                    [[opens[i], closes[i], highs[i], lows[i]] for i in order],
+                    [candles.volumes[i] for i in order])
+        return ([candle['candle_date_time_kst'] for candle in candles],
+                [[candle[key] for key in self.PRICE_KEYS] for candle in candles],
+                [candle['candle_acc_trade_volume'] for candle in candles])
+
     def __candle_to_json(self, candle: dict) -> dict:
         converted = {
             'open_time': candle['candle_date_time_kst'], # 시간
@@ -17,4 +111,29 @@ class CandleService:
             'low': candle['low_price'], # 저가
             'volume': candle['candle_acc_trade_volume'], # 거래량
         }
-        return converted
\ No newline at end of file
+        return converted
+
+    def __format_number(self, value) -> str:
+        """정수로 표현 가능한 실수는 소수점 없이, 나머지는 가장 짧은 표현으로"""
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    def __decimals(self, value) -> int:
+        text = self.__format_number(value)
+        if "e-" in text:
+            return int(text.split("e-")[1]) + len(text.split("e")[0].partition(".")[2])
+        return len(text.partition(".")[2])
+
+    def __infer_interval_seconds(self, times: list) -> float:
+        """인접 캔들 시각 차이의 최솟값을 간격으로 사용 (빠진 캔들이 있어도 최소 간격은 유지됨)"""
+        gaps = [abs((a - b).total_seconds()) for a, b in zip(times, times[1:])]
+        gaps = [gap for gap in gaps if gap > 0]
+        return min(gaps) if gaps else 60.0
+
+    def __format_interval(self, seconds: float) -> str:
+        minutes = int(seconds // 60)
+        for unit, size in (("w", 10080), ("d", 1440), ("h", 60)):
+            if minutes and minutes % size == 0:
+                return f"{minutes // size}{unit}"
+        return f"{minutes}m"
@@ -0,0 +1,143 @@
+import asyncio
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+class SharedArrays:
+    """
+    실수 배열 여러 개를 하나의 공유 메모리 블록에 연달아 담아 프로세스 풀로 넘기는 핸들.
+    작업 프로세스에는 블록 이름과 배열 길이만 피클되어 전달되고, 데이터는 복사 없이 공유됩니다.
+    만든 쪽(이벤트 루프)이 with 블록을 벗어날 때 블록을 닫고 삭제합니다.
+    """
+
+    TYPECODE = "d"
+
+    def __init__(self, arrays: list):
+        """
+        Args:
+            arrays (list): array('d') 리스트 (ex. [고가, 저가, 종가])
+        """
+        self.lengths = tuple(len(values) for values in arrays)
+        itemsize = array(self.TYPECODE).itemsize
+        # 크기 0인 블록은 만들 수 없으므로 최소 1항목
+        self.__shm = SharedMemory(create=True, size=max(sum(self.lengths), 1) * itemsize)
+        self.name = self.__shm.name
+        offset = 0
+        for values in arrays:
+            size = len(values) * itemsize
+            self.__shm.buf[offset:offset + size] = values.tobytes()
+            offset += size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.__shm.close()
+        self.__shm.unlink()
+        return False
+
+def read_shared_arrays(name: str, lengths: tuple) -> list:
+    """
+    작업 프로세스에서 SharedArrays 블록을 열어 배열 리스트로 읽습니다.
+
+    Args:
+        name (str): 공유 메모리 블록 이름
+        lengths (tuple): 블록에 담긴 각 배열의 길이
+
+    Returns:
+        list: array('d') 리스트
+    """
+    # 풀 작업 프로세스는 만든 쪽과 같은 resource_tracker를 공유하므로, 여기서 등록을 해제하면 안 됨 (삭제는 만든 쪽 책임)
+    shm = SharedMemory(name=name)
+    try:
+        view = shm.buf.cast(SharedArrays.TYPECODE)
+        try:
+            arrays = []
+            offset = 0
+            for length in lengths:
+                arrays.append(array(SharedArrays.TYPECODE, view[offset:offset + length]))
+                offset += length
+            return arrays
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+class DecisionExecutor:
+    """
+    결정 서비스의 CPU 작업(지표 계산 등)을 실행할 위치를 정하는 실행기.
+    inline은 이벤트 루프에서 바로 실행하고(기존 동작), thread/process는 풀에 넘겨 기다리는 동안
+    다른 마켓의 네트워크 I/O가 계속 진행되도록 합니다. 풀은 처음 작업을 넘길 때 생성합니다.
+    process 모드에 넘기는 함수와 인자는 피클 가능해야 하므로 모듈 수준 함수와 SharedArrays를 사용합니다.
+    """
+
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+    MODES = (INLINE, THREAD, PROCESS)
+
+    def __init__(self, mode: str = INLINE, max_workers: int = None, debug: bool = False):
+        """
+        Args:
+            mode (str): 실행 위치 (inline, thread, process)
+            max_workers (int, optional): 풀 작업자 수 (기본값: CPU 코어 수)
+            debug (bool): 디버그 모드 활성화 여부
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"지원하지 않는 실행 모드입니다: {mode} (inline, thread, process 중 하나)")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers는 1 이상이어야 합니다.")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.debug = debug
+        self.__pool: Executor = None
+        self.__submitted = 0
+
+    def _log_debug(self, message: str):
+        """디버그 메시지를 출력하는 헬퍼 메서드"""
+        if self.debug:
+            print(f"DecisionExecutor: {message}")
+
+    def is_inline(self) -> bool:
+        return self.mode == self.INLINE
+
+    def is_process(self) -> bool:
+        return self.mode == self.PROCESS
+
+    def __get_pool(self) -> Executor:
+        if self.__pool is None:
+            if self.mode == self.THREAD:
+                self.__pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="decision")
+            else:
+                # 이벤트 루프와 스레드를 가진 프로세스를 fork하지 않도록 spawn 사용
+                self.__pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            self._log_debug(f"Started {self.mode} pool with {self.max_workers} workers")
+        return self.__pool
+
+    async def run(self, fn, *args):
+        """
+        fn(*args)를 설정된 위치에서 실행하고 결과를 반환합니다.
+
+        Args:
+            fn: 실행할 함수 (process 모드에서는 모듈 수준 함수)
+            *args: 함수 인자 (process 모드에서는 피클 가능해야 함)
+        """
+        self.__submitted += 1
+        if self.mode == self.INLINE:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.__get_pool(), fn, *args)
+
+    def get_stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers if self.mode != self.INLINE else 0,
+            "submitted": self.__submitted,
+        }
+
+    def close(self, wait: bool = True):
+        """풀을 종료합니다. 진행 중인 작업은 wait=True일 때 끝날 때까지 기다립니다."""
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=wait, cancel_futures=not wait)
+            self.__pool = None
@@ -1,7 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
 from dtos.candle_chart import CandleChart
 from dtos.decision import Decision
 from repos.decision_log_repo import DecisionLogRepo
+from repos.decision_log_writer import DecisionLogWriter
 from settings.db_connection import DBMS
 
 class DecisionService(ABC):
@@ -9,10 +11,26 @@ class DecisionService(ABC):
     async def execute_trade_decision(self, candle_chart: CandleChart) -> Decision:
         pass
     
+    async def execute_trade_decisions(self, candle_charts: list) -> list:
+        """
+        여러 마켓의 결정을 한 번에 요청합니다. 기본 구현은 마켓별 execute_trade_decision을 동시에 실행하며,
+        여러 마켓을 한 요청으로 묶을 수 있는 서비스(LLMService)는 이를 재정의합니다.
+
+        Returns:
+            list: candle_charts와 같은 순서의 Decision 리스트 (실패한 마켓은 예외 객체)
+        """
+        return list(await asyncio.gather(
+            *(self.execute_trade_decision(candle_chart) for candle_chart in candle_charts), return_exceptions=True
+        ))
+
     @abstractmethod
     def set_decision_log_repo(self, decision_log_repo: DecisionLogRepo):
         pass
         
     @abstractmethod
     def set_dbms(self, dbms: DBMS):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def set_decision_log_writer(self, decision_log_writer: DecisionLogWriter):
+        pass
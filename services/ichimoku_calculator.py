@@ -0,0 +1,220 @@
+from collections import deque
+
+from dtos.candle_series import CandleSeries
+from services.decision_executor import read_shared_arrays
+
+NAN = float('nan')
+
+class RollingExtremum:
+    """
+    단조 덱(monotonic deque)을 이용해 고정 길이 윈도우의 최댓값/최솟값을 O(1) 분할 상환 시간에 유지합니다.
+    pandas의 rolling(window).max()/min()과 동일하게, 윈도우가 가득 차기 전에는 값을 제공하지 않습니다.
+    """
+
+    def __init__(self, window: int, is_max: bool):
+        self.__window = window
+        self.__is_max = is_max
+        self.__deque = deque() # (인덱스, 값) 쌍
+        self.__count = 0
+
+    def push(self, value: float):
+        index = self.__count
+        self.__count += 1
+        if self.__is_max:
+            while self.__deque and self.__deque[-1][1] <= value:
+                self.__deque.pop()
+        else:
+            while self.__deque and self.__deque[-1][1] >= value:
+                self.__deque.pop()
+        self.__deque.append((index, value))
+        # 윈도우를 벗어난 값 제거
+        while self.__deque[0][0] <= index - self.__window:
+            self.__deque.popleft()
+
+    def value(self) -> float:
+        """현재 윈도우의 극값. 윈도우가 가득 차지 않았다면 NaN"""
+        if self.__count < self.__window:
+            return NAN
+        return self.__deque[0][1]
+
+class IchimokuCalculator:
+    """
+    한 (마켓, 시간대)에 대한 증분 Ichimoku 계산기.
+
+    마감된 캔들이 하나 추가될 때마다 Tenkan/Kijun/Senkou B의 롤링 고가·저가 윈도우와
+    Senkou/Chikou 비교에 필요한 과거 값 버퍼만 갱신하므로, 매 틱마다 전체 윈도우를
+    DataFrame으로 다시 계산하지 않아도 됩니다.
+
+    CandleAnalysisService._calculate_ichimoku() + dropna() 경로와 같은 결과를 내도록,
+    윈도우의 마지막 캔들(진행 중일 수 있는 캔들)은 누적하지 않고 Chikou Span 값으로만 사용합니다.
+    """
+
+    def __init__(self,
+                 tenkan_period: int,
+                 kijun_period: int,
+                 senkou_b_period: int,
+                 chikou_offset: int,
+                 senkou_offset: int):
+        if chikou_offset < 1:
+            raise ValueError("IchimokuCalculator는 1 이상의 chikou_offset이 필요합니다.")
+        self.tenkan_period = tenkan_period
+        self.kijun_period = kijun_period
+        self.senkou_b_period = senkou_b_period
+        self.chikou_offset = chikou_offset
+        self.senkou_offset = senkou_offset
+        self.reset()
+
+    def reset(self):
+        """누적된 상태를 모두 초기화합니다."""
+        self.__tenkan_high = RollingExtremum(self.tenkan_period, True)
+        self.__tenkan_low = RollingExtremum(self.tenkan_period, False)
+        self.__kijun_high = RollingExtremum(self.kijun_period, True)
+        self.__kijun_low = RollingExtremum(self.kijun_period, False)
+        self.__senkou_b_high = RollingExtremum(self.senkou_b_period, True)
+        self.__senkou_b_low = RollingExtremum(self.senkou_b_period, False)
+
+        # 평가 시점(마지막 누적 캔들로부터 chikou_offset - 1 이전)에 필요한 만큼만 보관
+        self.__tenkan = deque(maxlen=self.chikou_offset + 1)
+        self.__kijun = deque(maxlen=self.chikou_offset + 1)
+        self.__span_a = deque(maxlen=self.chikou_offset + self.senkou_offset + 1)
+        self.__span_b = deque(maxlen=self.chikou_offset + self.senkou_offset + 1)
+        self.__close = deque(maxlen=2 * self.chikou_offset)
+
+        self.__count = 0 # 누적한 캔들 수
+        self.__last_time = None # 마지막으로 누적한 캔들의 시작 시각(epoch 초)
+        self.__window_size = 0 # 마지막 sync() 윈도우 길이 (진행 중 캔들 포함)
+        self.__tail_close = NAN # 윈도우 마지막 캔들의 종가
+
+    def get_last_time(self) -> int:
+        return self.__last_time
+
+    def push(self, high: float, low: float, close: float, candle_time: int = None):
+        """마감된 캔들 하나를 누적합니다. O(1) 분할 상환 시간."""
+        self.__tenkan_high.push(high)
+        self.__tenkan_low.push(low)
+        self.__kijun_high.push(high)
+        self.__kijun_low.push(low)
+        self.__senkou_b_high.push(high)
+        self.__senkou_b_low.push(low)
+
+        tenkan = (self.__tenkan_high.value() + self.__tenkan_low.value()) / 2
+        kijun = (self.__kijun_high.value() + self.__kijun_low.value()) / 2
+        self.__tenkan.append(tenkan)
+        self.__kijun.append(kijun)
+        self.__span_a.append((tenkan + kijun) / 2)
+        self.__span_b.append((self.__senkou_b_high.value() + self.__senkou_b_low.value()) / 2)
+        self.__close.append(close)
+        self.__count += 1
+        self.__last_time = candle_time
+
+    def sync(self, series: CandleSeries):
+        """
+        캔들 시계열 윈도우와 상태를 동기화합니다.
+        이전 sync() 이후 새로 마감된 캔들만 누적하며, 윈도우가 기존 상태와 이어지지 않으면
+        (재시작, 누락된 틱이 윈도우보다 많은 경우 등) 윈도우 전체로 다시 시드합니다.
+
+        Args:
+            series (CandleSeries): 과거 순 캔들 시계열. 마지막 캔들은 진행 중일 수 있습니다.
+        """
+        times, highs, lows, closes = series.times, series.highs, series.lows, series.closes
+        self.__window_size = len(times)
+        if not len(times):
+            self.__tail_close = NAN
+            return
+
+        closed_count = len(times) - 1
+        start = 0
+        if self.__last_time is not None:
+            # 뒤에서부터 마지막으로 누적한 캔들을 찾음 (보통 1~2칸)
+            k = closed_count - 1
+            while k >= 0 and times[k] > self.__last_time:
+                k -= 1
+            # 윈도우 앞부분이 누적된 이력보다 길다면(윈도우 확장) 다시 시드해야 DataFrame 경로와 일치
+            if k >= 0 and times[k] == self.__last_time and self.__count > k:
+                start = k + 1
+            else:
+                self.reset()
+                self.__window_size = len(times)
+
+        for i in range(start, closed_count):
+            self.push(highs[i], lows[i], closes[i], times[i])
+
+        self.__tail_close = closes[-1]
+
+    def load(self, highs, lows, closes):
+        """
+        과거 순 고가/저가/종가 배열로 상태를 처음부터 다시 계산합니다. (상태 없이 작업 프로세스에서 계산할 때 사용)
+        sync()와 마찬가지로 마지막 캔들은 진행 중으로 보고 누적하지 않습니다.
+
+        Args:
+            highs, lows, closes: 같은 길이의 실수 시퀀스 (ex. array('d'))
+        """
+        self.reset()
+        self.__window_size = len(closes)
+        if not closes:
+            return
+        for i in range(len(closes) - 1):
+            self.push(highs[i], lows[i], closes[i])
+        self.__tail_close = closes[-1]
+
+    def __row(self, back: int) -> dict:
+        """
+        윈도우 기준 dropna() 이후 뒤에서 back번째 행을 반환합니다. (0 = 최신)
+        해당 행이 DataFrame 경로에서 NaN으로 제거될 경우 None을 반환합니다.
+        """
+        n = self.__window_size
+        # dropna() 후 남는 행: senkou_offset + max(기간) - 1 <= i <= n - 1 - chikou_offset
+        position = n - 1 - self.chikou_offset - back
+        first_valid = self.senkou_offset + max(self.tenkan_period, self.kijun_period, self.senkou_b_period) - 1
+        if position < first_valid:
+            return None
+
+        # 마지막 누적 캔들(위치 n - 2)로부터의 거리
+        distance = self.chikou_offset - 1 + back
+        senkou_a = self.__span_a[-1 - distance - self.senkou_offset]
+        senkou_b = self.__span_b[-1 - distance - self.senkou_offset]
+        row = {
+            'close': self.__close[-1 - distance],
+            'tenkan_sen': self.__tenkan[-1 - distance],
+            'kijun_sen': self.__kijun[-1 - distance],
+            'senkou_span_a': senkou_a,
+            'senkou_span_b': senkou_b,
+            'kumo_top': max(senkou_a, senkou_b),
+            'kumo_bottom': min(senkou_a, senkou_b),
+        }
+        if back == 0:
+            # Chikou Span은 최신 평가 행에서만 사용
+            row['chikou_span'] = self.__tail_close
+            chikou_index = position - self.chikou_offset
+            row['price_at_chikou_time'] = (self.__close[-1 - distance - self.chikou_offset]
+                                           if chikou_index >= 0 else NAN)
+        return row
+
+    def latest(self) -> dict:
+        """최신 평가 행 (DataFrame 경로의 dropna().iloc[-1]에 해당)"""
+        return self.__row(0)
+
+    def previous(self) -> dict:
+        """직전 평가 행 (DataFrame 경로의 dropna().iloc[-2]에 해당)"""
+        return self.__row(1)
+
+def calculate_shared_rows(params: tuple, name: str, lengths: tuple) -> list:
+    """
+    프로세스 풀 작업 함수. SharedArrays 블록에 (고가, 저가, 종가) 순으로 담긴 시간대별 윈도우마다
+    새 계산기로 Ichimoku를 계산해 (최신 행, 직전 행)을 반환합니다.
+
+    Args:
+        params (tuple): IchimokuCalculator 생성자 인자 (tenkan, kijun, senkou_b, chikou_offset, senkou_offset)
+        name (str): 공유 메모리 블록 이름
+        lengths (tuple): 블록에 담긴 배열 길이
+
+    Returns:
+        list: 시간대별 (latest, previous) 튜플 리스트
+    """
+    arrays = read_shared_arrays(name, lengths)
+    rows = []
+    for i in range(0, len(arrays), 3):
+        calculator = IchimokuCalculator(*params)
+        calculator.load(arrays[i], arrays[i + 1], arrays[i + 2])
+        rows.append((calculator.latest(), calculator.previous()))
+    return rows
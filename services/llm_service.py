@@ -1,18 +1,46 @@
+import asyncio
 import json
 import re
 import datetime
 from clients.gemini_client import GeminiClient
 from dtos.candle_chart import CandleChart
 from dtos.decision import Decision
+from repos.decision_cache import DecisionCache
 from repos.decision_log_repo import DecisionLogRepo
+from repos.decision_log_writer import DecisionLogWriter
 from services.candle_service import CandleService
 from services.decision_service import DecisionService
+from services.token_estimator import estimate_tokens
 from settings.db_connection import DBMS
 
 class LLMService(DecisionService):
-    def __init__(self, llm_request_scheme: str, debug = False):
+    DEFAULT_BATCH_TOKEN_BUDGET = 30000 # 배치 프롬프트 1건의 추정 토큰 상한
+    DEFAULT_MAX_BATCH_MARKETS = 10 # 배치 프롬프트 1건에 넣을 최대 마켓 수
+
+    def __init__(self,
+                 llm_request_scheme: str,
+                 debug = False,
+                 candle_format: str = CandleService.FORMAT_JSON,
+                 batch_token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+                 max_batch_markets: int = DEFAULT_MAX_BATCH_MARKETS):
+        """
+        Args:
+            llm_request_scheme (str): LLM 요청 스킴 템플릿
+            debug (bool): 디버그 모드 활성화 여부
+            candle_format (str): 프롬프트에 넣을 캔들 인코딩 (json, table, delta, indexed, compact)
+            batch_token_budget (int): 여러 마켓을 한 프롬프트로 묶을 때 프롬프트 1건의 추정 토큰 상한
+            max_batch_markets (int): 한 프롬프트에 묶을 최대 마켓 수
+        """
+        if candle_format not in CandleService.FORMATS:
+            raise ValueError(f"지원하지 않는 캔들 형식입니다: {candle_format}")
         self.__llm_request_scheme = llm_request_scheme
         self.__debug = debug
+        self.__candle_format = candle_format
+        self.__batch_token_budget = batch_token_budget
+        self.__max_batch_markets = max_batch_markets
+        self.__scheme_tokens = estimate_tokens(llm_request_scheme) # 마켓 섹션을 뺀 지시문 토큰 수
+        self.__decision_log_writer = None
+        self.__decision_cache = None # 설정되면 마감된 캔들이 같을 때 LLM 호출 없이 이전 결정을 재사용
 
     def _log_debug(self, message: str):
         """디버그 메시지를 출력하는 헬퍼 메서드"""
@@ -31,57 +59,137 @@ class LLMService(DecisionService):
     def set_dbms(self, dbms: DBMS):
         self.__dbms = dbms
 
-    def _generate_prompt(self, candle_chart: CandleChart) -> str:
-        """LLM 요청을 위한 프롬프트를 생성합니다."""
-        prompt = self.__llm_request_scheme
+    def set_decision_log_writer(self, decision_log_writer: DecisionLogWriter):
+        self.__decision_log_writer = decision_log_writer
+
+    def set_decision_cache(self, decision_cache: DecisionCache):
+        self.__decision_cache = decision_cache
+
+    def _generate_market_section(self, candle_chart: CandleChart) -> str:
+        """마켓 1개의 현재가와 시간대별 캔들 데이터 섹션을 생성합니다."""
         timeframes = candle_chart.get_all_timeframes()
 
         # 동적으로 캔들 데이터 섹션 생성
-        candle_data_markdown = ""
+        candle_data_markdown = f"### {candle_chart.market} (Current Price: {candle_chart.current_price} KRW)\n\n"
+        fence = "json" if self.__candle_format == CandleService.FORMAT_JSON else "csv"
         for timeframe in timeframes:
-            candles = candle_chart.get_candles(timeframe)
+            candles = candle_chart.get_series(timeframe)
             if candles:
-                json_string = self.__candle_service.candle_to_json(candles)
-                candle_data_markdown += f"*   {timeframe} chart:\n  ```json\n  {json_string}\n  ```\n\n"
+                encoded = self.__candle_service.encode_candles(candles, self.__candle_format)
+                encoded = encoded.replace("\n", "\n  ") # 목록 항목 들여쓰기 유지
+                candle_data_markdown += f"*   {timeframe} chart:\n  ```{fence}\n  {encoded}\n  ```\n\n"
             else:
-                candle_data_markdown += f"*   {timeframe} chart:\n  ```json\n  No data available for this timeframe\n  ```\n\n"
+                candle_data_markdown += f"*   {timeframe} chart:\n  ```{fence}\n  No data available for this timeframe\n  ```\n\n"
+        return candle_data_markdown.strip()
 
-        # 생성된 마크다운으로 플레이스홀더 교체
-        prompt = prompt.replace("$candle_data_section", candle_data_markdown.strip())
+    def _generate_batch_prompt(self, candle_charts: list, sections: list = None) -> str:
+        """
+        여러 마켓의 캔들 섹션을 하나의 프롬프트로 묶습니다.
 
-        prompt = prompt.replace("$current_price", str(candle_chart.current_price))
+        Args:
+            candle_charts (list): 마켓별 CandleChart 리스트
+            sections (list): 미리 만든 마켓 섹션 (없으면 생성)
+        """
+        if sections is None:
+            sections = [self._generate_market_section(candle_chart) for candle_chart in candle_charts]
+        prompt = self.__llm_request_scheme
+
+        # 생성된 마크다운으로 플레이스홀더 교체
+        prompt = prompt.replace("$candle_data_section", "\n\n".join(sections))
+        prompt = prompt.replace("$markets", ", ".join(candle_chart.market for candle_chart in candle_charts))
+        if len(candle_charts) == 1:
+            prompt = prompt.replace("$current_price", str(candle_charts[0].current_price))
         prompt = prompt.replace("$current_time", datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S'))
 
         self._log_debug(f"Generated prompt for LLM:\n{prompt}")
         return prompt
 
-    def _parse_llm_response(self, response_text: str, candle_chart: CandleChart) -> Decision:
-        """LLM 응답을 파싱하여 Decision 객체를 생성합니다."""
+    def _generate_prompt(self, candle_chart: CandleChart) -> str:
+        """LLM 요청을 위한 프롬프트를 생성합니다."""
+        return self._generate_batch_prompt([candle_chart])
+
+    def _split_into_batches(self, items: list, sections: list) -> list:
+        """
+        추정 토큰 수가 batch_token_budget을 넘지 않도록 마켓을 순서대로 묶습니다.
+        섹션 하나가 예산을 넘으면 그 마켓만 단독으로 요청합니다.
+
+        Args:
+            items (list): 마켓별 항목 (CandleChart 또는 인덱스)
+            sections (list): items와 같은 순서의 마켓 섹션
+
+        Returns:
+            list: (항목 리스트, 섹션 리스트) 튜플의 리스트
+        """
+        batches = []
+        batch_items, batch_sections, tokens = [], [], self.__scheme_tokens
+        for item, section in zip(items, sections):
+            section_tokens = estimate_tokens(section)
+            if batch_items and (tokens + section_tokens > self.__batch_token_budget or len(batch_items) >= self.__max_batch_markets):
+                batches.append((batch_items, batch_sections))
+                batch_items, batch_sections, tokens = [], [], self.__scheme_tokens
+            batch_items.append(item)
+            batch_sections.append(section)
+            tokens += section_tokens
+        if batch_items:
+            batches.append((batch_items, batch_sections))
+        return batches
+
+    def _parse_batch_response(self, response_text: str, candle_charts: list) -> list:
+        """
+        배치 응답({"decisions": [{market, action, reason}, ...]})을 마켓별 Decision으로 나눕니다.
+        응답에 없는 마켓은 'wait' 결정을 받고, 단일 결정 형식(오류 응답 등)은 모든 마켓에 적용합니다.
+
+        Returns:
+            list: candle_charts와 같은 순서의 Decision 리스트
+        """
         try:
-            decision_json = json.loads(response_text)
+            response_json = json.loads(response_text)
         except json.JSONDecodeError as e:
             error_message = f"Error parsing LLM response: {str(e)}"
             self._log_debug(error_message)
             self._log_debug(f"Invalid response: {response_text}")
             # 파싱 오류 시 기본 결정 생성
-            decision_json = {"action": "wait", "reason": error_message}
+            response_json = {"action": GeminiClient.WAIT_ACTION, "reason": error_message}
 
-        decision = Decision(decision_json)
-        decision.set_current_price(candle_chart.current_price)
-        decision.set_market(candle_chart.market)
-        return decision
+        by_market = {}
+        entries = response_json.get("decisions") if isinstance(response_json, dict) else None
+        if isinstance(entries, list):
+            for entry in entries:
+                if isinstance(entry, dict) and entry.get("market") and "action" in entry and "reason" in entry:
+                    by_market.setdefault(str(entry["market"]).strip().upper(), entry)
+        elif isinstance(response_json, dict) and "action" in response_json and "reason" in response_json:
+            by_market = {candle_chart.market.upper(): response_json for candle_chart in candle_charts}
+
+        decisions = []
+        for candle_chart in candle_charts:
+            decision_json = by_market.get(candle_chart.market.upper())
+            if decision_json is None:
+                self._log_debug(f"No decision for {candle_chart.market} in LLM response")
+                decision_json = {"action": GeminiClient.WAIT_ACTION, "reason": f"No decision for {candle_chart.market} in LLM response"}
+            decision = Decision({"action": decision_json["action"], "reason": decision_json["reason"]})
+            decision.set_current_price(candle_chart.current_price)
+            decision.set_market(candle_chart.market)
+            decisions.append(decision)
+        return decisions
 
-    def _log_decision(self, decision: Decision):
+    def _parse_llm_response(self, response_text: str, candle_chart: CandleChart) -> Decision:
+        """LLM 응답을 파싱하여 Decision 객체를 생성합니다."""
+        return self._parse_batch_response(response_text, [candle_chart])[0]
+
+    async def _log_decision(self, decision: Decision):
         """결정을 데이터베이스에 로깅합니다."""
         try:
-            with self.__dbms.get_session() as session:
-                self.__decision_log_repo.log_decision(decision, session)
-            self._log_debug("Logged decision to DB.")
+            if self.__decision_log_writer is not None:
+                await self.__decision_log_writer.put(decision)
+                self._log_debug("Queued decision log.")
+            else:
+                await self.__dbms.run_in_session(lambda session: self.__decision_log_repo.log_decision(decision, session))
+                self._log_debug("Logged decision to DB.")
         except Exception as log_error:
             self._log_debug(f"Error logging decision to DB: {str(log_error)}")
 
     def _handle_error(self, error: Exception, candle_chart: CandleChart) -> Decision:
-        """오류 발생 시 기본 결정을 생성하고 로깅합니다."""
+        """오류 발생 시 기본 결정을 생성합니다. (로깅은 호출한 쪽에서 다른 결정과 함께 처리)"""
         error_message = f"Error in LLM service: {str(error)}"
         self._log_debug(error_message)
 
@@ -89,35 +197,80 @@ class LLMService(DecisionService):
         decision = Decision(decision_json)
         decision.set_current_price(candle_chart.current_price)
         decision.set_market(candle_chart.market)
-
-        # 오류 발생 시에도 로깅 시도
-        self._log_decision(decision)
         return decision
 
     async def execute_trade_decision(self, candle_chart: CandleChart) -> Decision:
         """
         LLM(Large Language Model)을 사용하여 거래 결정을 실행합니다.
         """
-        self._log_debug(f"Executing trade decision for market {candle_chart.market}")
+        return (await self.execute_trade_decisions([candle_chart]))[0]
 
-        try:
-            # 1. 프롬프트 생성
-            prompt = self._generate_prompt(candle_chart)
+    async def execute_trade_decisions(self, candle_charts: list) -> list:
+        """
+        여러 마켓의 캔들 섹션을 토큰 예산에 맞춰 묶어 LLM 호출 수를 줄이고, 응답을 마켓별 Decision으로 나눕니다.
+        배치들은 동시에 요청하며(GeminiClient의 동시 요청 수 제한 적용), 캐시된 마켓은 요청에서 제외합니다.
+
+        Args:
+            candle_charts (list): 마켓별 CandleChart 리스트
+
+        Returns:
+            list: candle_charts와 같은 순서의 Decision 리스트
+        """
+        self._log_debug(f"Executing trade decisions for markets {[candle_chart.market for candle_chart in candle_charts]}")
+        decisions = [None] * len(candle_charts)
+        cache_keys = [None] * len(candle_charts)
 
-            # 2. LLM 응답 생성
-            # await 제거 - generate_answer는 비동기 함수가 아님
-            response_text = self.__gemini_client.generate_answer(prompt)
+        # 0. 마감된 캔들이 이전 틱과 같으면 캐시된 결정 재사용
+        pending = []
+        for index, candle_chart in enumerate(candle_charts):
+            if self.__decision_cache is not None:
+                # 캔들 인코딩이 다르면 프롬프트도 다르므로 키에 포함
+                cache_keys[index] = self.__decision_cache.make_key(
+                    candle_chart.market, self.__gemini_client.get_model(),
+                    f"{self.__candle_format}\x1f{self.__llm_request_scheme}", candle_chart
+                )
+                cached = self.__decision_cache.get(cache_keys[index])
+                if cached is not None:
+                    cached.set_current_price(candle_chart.current_price)
+                    cached.set_market(candle_chart.market)
+                    self._log_debug(f"Decision cache hit for {candle_chart.market}: {cached.action}")
+                    decisions[index] = cached
+                    continue
+            pending.append(index)
 
-            # 3. 응답 파싱 및 Decision 생성
-            decision = self._parse_llm_response(response_text, candle_chart)
+        async def run_batch(indexes: list, sections: list):
+            charts = [candle_charts[index] for index in indexes]
+            try:
+                # 1. 프롬프트 생성
+                prompt = self._generate_batch_prompt(charts, sections)
 
-            self._log_debug(f"Received decision from LLM: {decision.action} with reason: {decision.reason}")
+                # 2. LLM 응답 생성
+                # 비동기 호출로 이벤트 루프를 막지 않음 (마감 시간 초과 시 'wait' 응답)
+                response_text = await self.__gemini_client.generate_answer_async(prompt)
 
-            # 4. 결정 로깅
-            self._log_decision(decision)
+                # 3. 응답 파싱 및 마켓별 Decision 생성
+                for index, decision in zip(indexes, self._parse_batch_response(response_text, charts)):
+                    self._log_debug(f"Received decision from LLM for {decision.market}: {decision.action} with reason: {decision.reason}")
+                    # 오류/마감 초과/누락으로 만들어진 'wait' 결정은 캐시하지 않음
+                    if cache_keys[index] is not None and decision.action != GeminiClient.WAIT_ACTION:
+                        self.__decision_cache.put(cache_keys[index], decision)
+                    decisions[index] = decision
+            except Exception as e:
+                # 예외 처리: 배치에 포함된 마켓 모두 'wait'
+                for index in indexes:
+                    decisions[index] = self._handle_error(e, candle_charts[index])
 
-            return decision
+        if pending:
+            try:
+                sections = [self._generate_market_section(candle_charts[index]) for index in pending]
+                batches = self._split_into_batches(pending, sections)
+                self._log_debug(f"Sending {len(pending)} markets in {len(batches)} LLM request(s)")
+                await asyncio.gather(*(run_batch(indexes, batch_sections) for indexes, batch_sections in batches))
+            except Exception as e:
+                for index in pending:
+                    decisions[index] = decisions[index] or self._handle_error(e, candle_charts[index])
 
-        except Exception as e:
-            # 5. 예외 처리
-            return self._handle_error(e, candle_chart)
\ No newline at end of file
+        # 4. 결정 로깅
+        for decision in decisions:
+            await self._log_decision(decision)
+        return decisions
@@ -0,0 +1,432 @@
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from clients.historical_candle_client import HistoricalCandleClient
+from dtos.candle_series import CandleSeries, epoch_to_kst
+from dtos.decision import Decision
+from repos.action_repo import ActionRepo
+from services.action_service import ActionService
+from services.candle_analysis_service import CandleAnalysisService
+from services.decision_executor import SharedArrays, read_shared_arrays
+from services.ichimoku_calculator import RollingExtremum
+
+# 조합 튜플의 순서 (CandleAnalysisService 생성자 인자 이름)
+PARAM_NAMES = ("tenkan_period", "kijun_period", "senkou_b_period", "chikou_offset", "senkou_offset", "strict_mode")
+
+_data = None # 작업 프로세스별 공유 데이터 (키 -> array('d')). _init_worker()에서 한 번 읽음
+_settings = None # 작업 프로세스별 평가 설정
+
+def _init_worker(name: str, lengths: tuple, keys: tuple, settings: dict):
+    """
+    프로세스 풀 작업자 초기화. 공유 메모리 블록의 배열을 작업자마다 한 번만 읽어 두고,
+    이후 조합 평가 작업에는 조합 튜플과 구간만 피클되어 전달됩니다.
+    """
+    global _data, _settings
+    _data = dict(zip(keys, read_shared_arrays(name, lengths)))
+    _settings = settings
+
+def evaluate_combination(params: tuple, segments: tuple) -> list:
+    """
+    프로세스 풀 작업 함수. 한 파라미터 조합을 구간마다 새 잔고로 모의 거래합니다.
+
+    Args:
+        params (tuple): PARAM_NAMES 순서의 조합
+        segments (tuple): (시작 index, 끝 index) 기준 캔들 구간 튜플
+
+    Returns:
+        list: 구간별 결과 dict (수익률, 최대 낙폭, 거래 수, 왕복 거래 수, 승리 수)
+    """
+    return [_simulate(_data, _settings, params, start, end) for start, end in segments]
+
+def _simulate(data: dict, settings: dict, params: tuple, start: int, end: int) -> dict:
+    """
+    CandleAnalysisService.execute_trade_decision()과 TradeService의 매수/매도 규칙을 미리 계산한 열로 재현합니다.
+
+    윈도우가 가득 찬 구간(워밍업 이후)에서 계산기의 최신/직전 평가 행은 전체 이력 기준으로
+    LTF는 마감 캔들 index g = i + 1 - chikou_offset (직전 행은 g - 1), HTF는 G = (마감 상위 캔들 수) - chikou_offset이고,
+    Tenkan/Kijun/Senkou B는 해당 길이의 롤링 (최고가 + 최저가) / 2, Senkou Span은 senkou_offset만큼 이전 값,
+    Chikou Span은 현재가(진행 중 캔들 종가)입니다. 매수/매도 금액은 ActionService/ActionRepo의 DCA/수수료 계산을 그대로 사용합니다.
+    """
+    tenkan, kijun, senkou_b, chikou, senkou_offset, strict = params
+    initial_balance = settings["initial_balance"]
+    result = {"return_pct": 0.0, "max_drawdown_pct": 0.0, "trades": 0, "round_trips": 0, "wins": 0}
+
+    # 평가 행이 DataFrame 경로의 dropna()에서 남는지 (윈도우 길이가 고정이므로 구간 전체에서 같음)
+    first_valid = senkou_offset + max(tenkan, kijun, senkou_b) - 1
+    htf_window, ltf_window = settings["htf_count"] + 1, settings["ltf_count"] + 1
+    if (htf_window < senkou_b or ltf_window < senkou_b
+            or htf_window - 1 - chikou < first_valid or ltf_window - 2 - chikou < first_valid
+            or htf_window - 1 - 2 * chikou < 0 or ltf_window - 1 - 2 * chikou < 0):
+        return result # 결정이 항상 NEUTRAL
+
+    prices = data["close"]
+    ltf_tenkan, ltf_kijun, ltf_span_b = data[f"ltf_mid:{tenkan}"], data[f"ltf_mid:{kijun}"], data[f"ltf_mid:{senkou_b}"]
+    htf_close, htf_count = data["htf_close"], data["htf_count"]
+    htf_tenkan, htf_kijun, htf_span_b = data[f"htf_mid:{tenkan}"], data[f"htf_mid:{kijun}"], data[f"htf_mid:{senkou_b}"]
+
+    action_service = ActionService(settings["dca"])
+    action_repo = ActionRepo()
+    balance = initial_balance
+    amount = None # 보유 코인 수량 (없으면 None)
+    bought = 0
+    cash, held = float(balance), 0.0 # 평가액 계산용 float 잔고/수량 (거래할 때만 갱신)
+    peak = float(initial_balance)
+    max_drawdown = 0.0
+
+    for i in range(start, end):
+        price = prices[i]
+        g = i + 1 - chikou
+        tenkan_now, kijun_now = ltf_tenkan[g], ltf_kijun[g]
+        tenkan_before, kijun_before = ltf_tenkan[g - 1], ltf_kijun[g - 1]
+        action = None
+        # LTF TK 크로스가 없으면 HTF 추세와 관계없이 NEUTRAL이므로 가장 먼저 확인
+        if amount is None and tenkan_before <= kijun_before and tenkan_now > kijun_now:
+            span_a = (ltf_tenkan[g - senkou_offset] + ltf_kijun[g - senkou_offset]) / 2
+            kumo_top = max(span_a, ltf_span_b[g - senkou_offset])
+            if tenkan_now > kumo_top and prices[g] > kumo_top and price > prices[g - chikou]:
+                G = int(htf_count[i]) - chikou
+                htf_span_a = (htf_tenkan[G - senkou_offset] + htf_kijun[G - senkou_offset]) / 2
+                htf_span_b_now = htf_span_b[G - senkou_offset]
+                if (htf_close[G] > max(htf_span_a, htf_span_b_now) and price > htf_close[G - chikou]
+                        and (not strict or htf_span_a > htf_span_b_now)):
+                    action = "BUY"
+        elif amount is not None and tenkan_before >= kijun_before and tenkan_now < kijun_now:
+            span_a = (ltf_tenkan[g - senkou_offset] + ltf_kijun[g - senkou_offset]) / 2
+            kumo_bottom = min(span_a, ltf_span_b[g - senkou_offset])
+            if tenkan_now < kumo_bottom and prices[g] < kumo_bottom and price < prices[g - chikou]:
+                G = int(htf_count[i]) - chikou
+                htf_span_a = (htf_tenkan[G - senkou_offset] + htf_kijun[G - senkou_offset]) / 2
+                htf_span_b_now = htf_span_b[G - senkou_offset]
+                if (htf_close[G] < min(htf_span_a, htf_span_b_now) and price < htf_close[G - chikou]
+                        and (not strict or htf_span_a < htf_span_b_now)):
+                    action = "SELL"
+
+        if action is not None:
+            decision = Decision({"action": action, "reason": ""})
+            decision.set_current_price(price)
+            if action == "BUY":
+                total_price = action_service._calculate_total_price(balance)
+                amount = action_repo.calculate_buy_amount(decision, total_price)
+                balance -= total_price
+                bought = int(total_price)
+                held = float(amount)
+            else:
+                sold = action_repo.calculate_sell_price(decision, amount)
+                balance += sold
+                amount = None
+                held = 0.0
+                result["round_trips"] += 1
+                result["wins"] += int(sold) > bought
+            result["trades"] += 1
+            cash = float(balance)
+        elif amount is None:
+            continue # 현금만 보유 중이면 평가액이 그대로
+
+        # 보유 코인은 현재가로 평가 (BacktestService와 같은 방식)
+        equity = cash + held * price if amount is not None else cash
+        if equity > peak:
+            peak = equity
+        elif peak > 0 and (peak - equity) / peak > max_drawdown:
+            max_drawdown = (peak - equity) / peak
+
+    equity = cash + held * prices[end - 1] if amount is not None else cash
+    result["return_pct"] = (equity - initial_balance) / initial_balance * 100
+    result["max_drawdown_pct"] = max_drawdown * 100
+    return result
+
+class ParameterOptimizer:
+    """
+    CandleAnalysisService의 Ichimoku 파라미터(PARAM_NAMES) 조합을 과거 캔들로 평가하는 그리드/랜덤 탐색기.
+
+    조합마다 BacktestService 전체 경로를 실행하는 대신, 결정에 필요한 열(종가, 시점별 마감 상위 캔들 수,
+    길이별 롤링 (최고가 + 최저가) / 2)을 한 번 계산해 공유 메모리 블록(SharedArrays)에 올리고,
+    프로세스 풀 작업자가 그 열로 결정과 매수/매도를 재현합니다. 롤링 값은 윈도우 길이마다 한 번만 계산되어
+    Tenkan/Kijun/Senkou B 어느 자리에 쓰이든 모든 조합이 공유합니다. 캔들 집계와 룩어헤드 없는 시점 구성은
+    HistoricalCandleClient와 같으므로 결과는 같은 파라미터의 BacktestService 실행과 같습니다.
+
+    워크포워드 모드에서는 기간을 연속 블록으로 나눠, 학습 블록들에서 가장 좋은 조합을 고르고 바로 다음 블록에서 검증합니다.
+    """
+
+    OBJECTIVE_RETURN = "return" # 수익률
+    OBJECTIVE_CALMAR = "calmar" # 수익률 / 최대 낙폭
+    OBJECTIVES = (OBJECTIVE_RETURN, OBJECTIVE_CALMAR)
+    DEFAULT_TRAIN_BLOCKS = 3 # 워크포워드 학습 구간의 블록 수
+
+    def __init__(self, timeframe_config: dict, dca: float = 0.01, initial_balance: int = 10_000_000,
+                 objective: str = OBJECTIVE_RETURN, max_workers: int = None, debug: bool = False):
+        """
+        Args:
+            timeframe_config (dict): 시간대별 캔들 수 (ex. {'5m': 125, '4h': 125}). 가장 짧은 시간대가 LTF, 가장 긴 시간대가 HTF
+            dca (float): 매수 시 사용할 잔고 비율 (ex. 0.01 = 1%)
+            initial_balance (int): 구간마다 시작하는 잔고(KRW)
+            objective (str): 순위 기준 (return, calmar)
+            max_workers (int, optional): 프로세스 풀 작업자 수 (기본값: CPU 코어 수). 1이면 풀 없이 현재 프로세스에서 실행
+            debug (bool): 디버그 모드 활성화 여부
+        """
+        if objective not in self.OBJECTIVES:
+            raise ValueError(f"지원하지 않는 순위 기준입니다: {objective} (return, calmar 중 하나)")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers는 1 이상이어야 합니다.")
+        self.__timeframe_config = timeframe_config
+        self.__dca = dca
+        self.__initial_balance = initial_balance
+        self.__objective = objective
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__debug = debug
+        # 시간대 해석은 결정 서비스와 같은 규칙 사용
+        self.__units = {timeframe: CandleAnalysisService()._parse_timeframe_to_minutes(timeframe) for timeframe in timeframe_config}
+        self.__ltf = min(self.__units, key=self.__units.get)
+        self.__htf = max(self.__units, key=self.__units.get)
+
+    def _log_debug(self, message: str, shouldDebugMode: bool = True):
+        """디버그 메시지를 출력하는 헬퍼 메서드"""
+        if self.__debug or not shouldDebugMode:
+            print(f"ParameterOptimizer: {message}")
+
+    def get_base_timeframe(self) -> str:
+        """재생할 기준 시간대 (LTF, 설정 중 가장 짧은 시간대)"""
+        return self.__ltf
+
+    def get_minutes(self, timeframe: str) -> int:
+        return self.__units[timeframe]
+
+    @staticmethod
+    def grid(space: dict) -> list:
+        """
+        파라미터별 후보 값의 모든 조합을 만듭니다.
+
+        Args:
+            space (dict): 파라미터 이름(PARAM_NAMES) -> 후보 값 리스트. 없는 파라미터는 CandleAnalysisService 기본값
+
+        Returns:
+            list: PARAM_NAMES 순서의 조합 튜플 리스트
+        """
+        values = ParameterOptimizer.__candidates(space)
+        return [combination for combination in itertools.product(*values) if ParameterOptimizer.__is_valid(combination)]
+
+    @staticmethod
+    def sample(space: dict, count: int, seed: int = None) -> list:
+        """
+        전체 조합 중 중복 없이 count개를 무작위로 고릅니다. (전체 조합을 만들지 않고 번호로 뽑아 복원)
+
+        Args:
+            space (dict): 파라미터 이름(PARAM_NAMES) -> 후보 값 리스트
+            count (int): 고를 조합 수. 전체 조합 수보다 크면 전체
+            seed (int, optional): 난수 시드
+
+        Returns:
+            list: PARAM_NAMES 순서의 조합 튜플 리스트
+        """
+        values = ParameterOptimizer.__candidates(space)
+        total = 1
+        for candidates in values:
+            total *= len(candidates)
+        combinations = []
+        for number in random.Random(seed).sample(range(total), min(count, total)):
+            combination = []
+            for candidates in reversed(values):
+                number, position = divmod(number, len(candidates))
+                combination.append(candidates[position])
+            combination = tuple(reversed(combination))
+            if ParameterOptimizer.__is_valid(combination):
+                combinations.append(combination)
+        return combinations
+
+    @staticmethod
+    def __candidates(space: dict) -> list:
+        unknown = set(space) - set(PARAM_NAMES)
+        if unknown:
+            raise ValueError(f"알 수 없는 파라미터입니다: {', '.join(sorted(unknown))}")
+        defaults = {
+            "tenkan_period": CandleAnalysisService.DEFAULT_TENKAN_PERIOD,
+            "kijun_period": CandleAnalysisService.DEFAULT_KIJUN_PERIOD,
+            "senkou_b_period": CandleAnalysisService.DEFAULT_SENKOU_B_PERIOD,
+            "chikou_offset": CandleAnalysisService.DEFAULT_CHIKOU_OFFSET,
+            "senkou_offset": CandleAnalysisService.DEFAULT_SENKOU_OFFSET,
+            "strict_mode": False,
+        }
+        return [sorted(set(space.get(name) or [defaults[name]])) for name in PARAM_NAMES]
+
+    @staticmethod
+    def __is_valid(combination: tuple) -> bool:
+        """IchimokuCalculator가 받을 수 있는 조합인지 (기간 1 이상, chikou_offset 1 이상, senkou_offset 0 이상)"""
+        tenkan, kijun, senkou_b, chikou, senkou_offset, _ = combination
+        return min(tenkan, kijun, senkou_b, chikou) >= 1 and senkou_offset >= 0
+
+    def split_walk_forward(self, start: int, end: int, folds: int, train_blocks: int = DEFAULT_TRAIN_BLOCKS) -> list:
+        """
+        [start, end)를 folds + train_blocks개의 연속 블록으로 나눈 워크포워드 구간.
+        fold k는 블록 k ~ k + train_blocks - 1에서 학습하고 블록 k + train_blocks에서 검증합니다.
+
+        Returns:
+            list: ((학습 시작, 학습 끝), (검증 시작, 검증 끝)) 리스트
+        """
+        blocks = folds + train_blocks
+        if folds < 1 or train_blocks < 1 or end - start < blocks:
+            raise ValueError(f"워크포워드 구간을 나눌 수 없습니다. (캔들 {end - start}개, 블록 {blocks}개)")
+        edges = [start + (end - start) * k // blocks for k in range(blocks + 1)]
+        return [((edges[k], edges[k + train_blocks]), (edges[k + train_blocks], edges[k + train_blocks + 1]))
+                for k in range(folds)]
+
+    def _score(self, result: dict) -> float:
+        """순위 기준 값 (클수록 좋음)"""
+        if self.__objective == self.OBJECTIVE_CALMAR:
+            return result["return_pct"] / max(result["max_drawdown_pct"], 0.01)
+        return result["return_pct"]
+
+    def _build_columns(self, client: HistoricalCandleClient, combinations: list) -> dict:
+        """
+        작업자와 공유할 열을 만듭니다.
+        close(기준 종가), htf_close(마감 상위 캔들 종가), htf_count(기준 캔들 index 시점의 마감 상위 캔들 수),
+        ltf_mid:N / htf_mid:N(길이 N 롤링 (최고가 + 최저가) / 2, 조합에 쓰이는 길이만)
+        """
+        ltf_candles = client.get_closed_candles(self.__ltf)
+        htf_candles = client.get_closed_candles(self.__htf)
+        columns = {
+            "close": ltf_candles.closes,
+            "htf_close": htf_candles.closes,
+            "htf_count": array(CandleSeries.VALUE_TYPECODE, (client.count_closed(self.__htf, i) for i in range(len(client)))),
+        }
+        lengths = sorted({length for combination in combinations for length in combination[:3]})
+        for prefix, candles in (("ltf", ltf_candles), ("htf", htf_candles)):
+            for length in lengths:
+                columns[f"{prefix}_mid:{length}"] = self.__rolling_mid(candles, length)
+        self._log_debug(f"Built {len(columns)} shared columns for window lengths {lengths}")
+        return columns
+
+    def __rolling_mid(self, candles: CandleSeries, length: int) -> array:
+        """IchimokuCalculator와 같은 방식(RollingExtremum)으로 계산한 길이 length의 (최고가 + 최저가) / 2 열"""
+        high, low = RollingExtremum(length, True), RollingExtremum(length, False)
+        values = array(CandleSeries.VALUE_TYPECODE)
+        for high_price, low_price in zip(candles.highs, candles.lows):
+            high.push(high_price)
+            low.push(low_price)
+            values.append((high.value() + low.value()) / 2)
+        return values
+
+    def run(self, market: str, base: CandleSeries, combinations: list, folds: int = 0,
+            train_blocks: int = DEFAULT_TRAIN_BLOCKS) -> dict:
+        """
+        조합들을 평가해 순위를 매깁니다.
+
+        Args:
+            market (str): 거래소 마켓 (ex. KRW-BTC)
+            base (CandleSeries): LTF 캔들 이력 (과거 순, 모두 마감된 캔들)
+            combinations (list): PARAM_NAMES 순서의 조합 튜플 리스트 (grid(), sample())
+            folds (int): 워크포워드 검증 구간 수. 0이면 워밍업 이후 전체 기간 하나로 평가
+            train_blocks (int): 워크포워드 학습 구간의 블록 수
+
+        Returns:
+            dict: 기간, 처리 속도, 순위표(ranking), 워크포워드 fold별 선택 조합과 검증 결과
+        """
+        if not combinations:
+            raise ValueError("평가할 조합이 없습니다.")
+        client = HistoricalCandleClient(market, base, self.__units[self.__ltf], self.__units)
+        start, end = client.first_ready_index(self.__timeframe_config), len(client)
+        if start >= end:
+            raise ValueError(f"캔들 이력이 부족합니다. (기준 캔들 {len(client)}개, 워밍업 {start}개)")
+        splits = self.split_walk_forward(start, end, folds, train_blocks) if folds else []
+        segments = tuple(sorted({segment for split in splits for segment in split})) if splits else ((start, end),)
+
+        started = time.perf_counter()
+        columns = self._build_columns(client, combinations)
+        settings = {
+            "dca": self.__dca,
+            "initial_balance": self.__initial_balance,
+            "htf_count": self.__timeframe_config[self.__htf],
+            "ltf_count": self.__timeframe_config[self.__ltf],
+        }
+        prepared = time.perf_counter()
+        with SharedArrays(list(columns.values())) as shared:
+            initargs = (shared.name, shared.lengths, tuple(columns), settings)
+            if self.__max_workers == 1:
+                _init_worker(*initargs)
+                results = [evaluate_combination(combination, segments) for combination in combinations]
+            else:
+                chunksize = max(1, len(combinations) // (self.__max_workers * 8))
+                # 이벤트 루프와 스레드를 가진 프로세스를 fork하지 않도록 spawn 사용 (DecisionExecutor와 같음)
+                with ProcessPoolExecutor(max_workers=self.__max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker, initargs=initargs) as pool:
+                    results = list(pool.map(evaluate_combination, combinations, itertools.repeat(segments), chunksize=chunksize))
+        finished = time.perf_counter()
+        by_segment = [dict(zip(segments, result)) for result in results]
+
+        report = {
+            "market": market,
+            "timeframes": dict(self.__timeframe_config),
+            "objective": self.__objective,
+            "start": epoch_to_kst(base.times[start]),
+            "end": epoch_to_kst(base.times[end - 1]),
+            "steps": end - start,
+            "combinations": len(combinations),
+            "workers": self.__max_workers,
+            "prepare_seconds": round(prepared - started, 3),
+            "evaluate_seconds": round(finished - prepared, 3),
+            "combinations_per_second": round(len(combinations) / (finished - prepared), 1) if finished > prepared else None,
+        }
+        if not splits:
+            ranked = sorted(range(len(combinations)), key=lambda k: self._score(by_segment[k][segments[0]]), reverse=True)
+            report["ranking"] = [self.__row(rank, combinations[k], [by_segment[k][segments[0]]]) for rank, k in enumerate(ranked, 1)]
+            return report
+
+        # 워크포워드: fold마다 학습 구간 최고 조합을 다음 검증 구간에 적용
+        walk_forward = []
+        compounded = 1.0
+        for fold, (train, test) in enumerate(splits, 1):
+            best = max(range(len(combinations)), key=lambda k: self._score(by_segment[k][train]))
+            out_of_sample = by_segment[best][test]
+            compounded *= 1 + out_of_sample["return_pct"] / 100
+            walk_forward.append({
+                "fold": fold,
+                "train": [epoch_to_kst(base.times[train[0]]), epoch_to_kst(base.times[train[1] - 1])],
+                "test": [epoch_to_kst(base.times[test[0]]), epoch_to_kst(base.times[test[1] - 1])],
+                "params": dict(zip(PARAM_NAMES, combinations[best])),
+                "train_score": round(self._score(by_segment[best][train]), 4),
+                "test_score": round(self._score(out_of_sample), 4),
+                "test_return_pct": round(out_of_sample["return_pct"], 4),
+                "test_max_drawdown_pct": round(out_of_sample["max_drawdown_pct"], 4),
+                "test_trades": out_of_sample["trades"],
+            })
+        report["walk_forward"] = walk_forward
+        report["walk_forward_return_pct"] = round((compounded - 1) * 100, 4)
+
+        # 순위표는 검증 구간 평균 점수 기준 (학습 구간 평균 점수도 함께 표시)
+        tests = [test for _, test in splits]
+        trains = [train for train, _ in splits]
+        mean_test = [sum(self._score(by_segment[k][test]) for test in tests) / len(tests) for k in range(len(combinations))]
+        ranked = sorted(range(len(combinations)), key=lambda k: mean_test[k], reverse=True)
+        report["ranking"] = [
+            {**self.__row(rank, combinations[k], [by_segment[k][test] for test in tests]),
+             "train_score": round(sum(self._score(by_segment[k][train]) for train in trains) / len(trains), 4)}
+            for rank, k in enumerate(ranked, 1)
+        ]
+        return report
+
+    def __row(self, rank: int, combination: tuple, results: list) -> dict:
+        """순위표 한 행. 결과가 여러 구간이면 점수/수익률/낙폭은 평균, 거래 수는 합계"""
+        round_trips = sum(result["round_trips"] for result in results)
+        wins = sum(result["wins"] for result in results)
+        return {
+            "rank": rank,
+            **dict(zip(PARAM_NAMES, combination)),
+            "score": round(sum(self._score(result) for result in results) / len(results), 4),
+            "return_pct": round(sum(result["return_pct"] for result in results) / len(results), 4),
+            "max_drawdown_pct": round(sum(result["max_drawdown_pct"] for result in results) / len(results), 4),
+            "trades": sum(result["trades"] for result in results),
+            "win_rate_pct": round(wins / round_trips * 100, 2) if round_trips else None,
+        }
+
+    def write_table(self, path: str, ranking: list):
+        """순위표를 CSV로 저장합니다."""
+        if not ranking:
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(ranking[0]))
+            writer.writeheader()
+            writer.writerows(ranking)
@@ -0,0 +1,138 @@
+import asyncio
+import math
+import time
+from datetime import datetime
+
+class SystemClock:
+    """실제 시간을 사용하는 기본 시계. 테스트에서는 같은 인터페이스의 가짜 시계를 주입할 수 있습니다."""
+
+    def time(self) -> float:
+        """현재 epoch 초"""
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+class Tick:
+    """한 번의 캔들 마감 틱 정보"""
+
+    def __init__(self, boundary: float, fired_at: float, closed_timeframes: list, markets: list, skipped_markets: list, missed: int):
+        self.boundary = boundary # 마감된 캔들 경계 (epoch 초)
+        self.fired_at = fired_at # 실제 실행 시각 (epoch 초)
+        self.closed_timeframes = closed_timeframes # 이번 경계에서 마감된 시간대
+        self.markets = markets # 이번 틱에 실행할 마켓
+        self.skipped_markets = skipped_markets # 이전 틱이 아직 실행 중이라 건너뛴 마켓
+        self.missed = missed # 이번 틱 직전에 놓친 경계 수
+
+    def __str__(self):
+        boundary = datetime.fromtimestamp(self.boundary).strftime('%Y-%m-%d %H:%M:%S')
+        return (f"Tick(boundary={boundary}, delay={self.fired_at - self.boundary:.3f}s, "
+                f"closed={self.closed_timeframes}, markets={len(self.markets)}, "
+                f"skipped={len(self.skipped_markets)}, missed={self.missed})")
+
+class TickScheduler:
+    """
+    캔들 마감 경계에 맞춰 깨어나는 틱 스케줄러.
+    매초 폴링하지 않고 다음 마감 시각(+ 마감 후 지연)까지 정확히 대기하며, 경계는 이전 경계에
+    간격을 더해 계산하므로 실행 시간이 길어져도 누적 오차(drift)가 생기지 않습니다.
+    늦게 깨어나 지나친 경계는 missed로, 이전 틱이 끝나지 않아 건너뛴 마켓은 overrun으로 보고합니다.
+    같은 마켓의 틱은 동시에 두 번 실행되지 않습니다.
+    """
+
+    def __init__(self, timeframe_minutes: dict, post_close_delay: float = 1.0, clock=None, debug = False):
+        """
+        Args:
+            timeframe_minutes (dict): 시간대 -> 분 (예: {'5m': 5, '4h': 240})
+            post_close_delay (float): 캔들 마감 후 Upbit가 캔들을 확정할 때까지 기다릴 시간(초)
+            clock: time()/sleep()을 제공하는 시계 객체. 기본값은 SystemClock
+            debug (bool): 디버그 모드 활성화 여부
+        """
+        if not timeframe_minutes:
+            raise ValueError("TickScheduler에는 하나 이상의 시간대가 필요합니다.")
+        self.__timeframe_seconds = {tf: minutes * 60 for tf, minutes in timeframe_minutes.items()}
+        self.__interval = min(self.__timeframe_seconds.values())
+        self.__post_close_delay = post_close_delay
+        self.__clock = clock or SystemClock()
+        self.__debug = debug
+        self.__running_markets = set()
+        self.__tasks = set()
+        self.__stopped = False
+        self.__stats = {"ticks": 0, "missed": 0, "overrun": 0}
+
+    def _log_debug(self, message: str, shouldDebugMode: bool = True):
+        """디버그 메시지를 출력하는 헬퍼 메서드"""
+        if self.__debug or not shouldDebugMode:
+            print(f"TickScheduler: {message}")
+
+    def next_boundary(self, now: float) -> float:
+        """now 이후(포함하지 않음) 가장 가까운 마감 경계. Upbit 분봉과 같이 UTC epoch 기준으로 정렬"""
+        return (math.floor(now / self.__interval) + 1) * self.__interval
+
+    def closed_timeframes(self, boundary: float) -> list:
+        """해당 경계에서 마감되는 시간대 목록"""
+        return [tf for tf, seconds in self.__timeframe_seconds.items() if round(boundary) % seconds == 0]
+
+    def get_stats(self) -> dict:
+        return dict(self.__stats)
+
+    def stop(self):
+        self.__stopped = True
+
+    async def run(self, markets: list, on_tick):
+        """
+        stop()이 호출될 때까지 매 마감 경계마다 on_tick(tick)을 실행합니다.
+        on_tick은 Tick을 받는 코루틴 함수이며, 실행 중인 동안에도 다음 경계는 예정대로 도래합니다.
+
+        Args:
+            markets (list): 틱마다 실행할 마켓 리스트
+            on_tick: async def on_tick(tick: Tick)
+        """
+        boundary = self.next_boundary(self.__clock.time())
+        try:
+            while not self.__stopped:
+                fire_at = boundary + self.__post_close_delay
+                wait = fire_at - self.__clock.time()
+                if wait > 0:
+                    await self.__clock.sleep(wait)
+                if self.__stopped:
+                    break
+                now = self.__clock.time()
+
+                # 이벤트 루프 정체 등으로 다음 경계까지 지나쳤다면 가장 최근 경계로 건너뜀
+                missed = max(0, int((now - fire_at) // self.__interval))
+                if missed:
+                    boundary += missed * self.__interval
+                    self.__stats["missed"] += missed
+                    self._log_debug(f"Missed {missed} tick(s); resuming at latest boundary.", False)
+
+                runnable = [market for market in markets if market not in self.__running_markets]
+                skipped = [market for market in markets if market in self.__running_markets]
+                if skipped:
+                    self.__stats["overrun"] += len(skipped)
+                    self._log_debug(f"Previous tick still running for {len(skipped)} market(s); skipping them this tick.", False)
+
+                tick = Tick(boundary, now, self.closed_timeframes(boundary), runnable, skipped, missed)
+                self.__stats["ticks"] += 1
+                self._log_debug(str(tick))
+                if runnable:
+                    self.__dispatch(tick, on_tick)
+
+                boundary += self.__interval
+        finally:
+            # 진행 중인 틱이 끝날 때까지 대기
+            if self.__tasks:
+                await asyncio.gather(*self.__tasks, return_exceptions=True)
+
+    def __dispatch(self, tick: Tick, on_tick):
+        """틱을 별도 태스크로 실행하고, 끝날 때까지 해당 마켓을 실행 중으로 표시합니다."""
+        self.__running_markets.update(tick.markets)
+
+        async def run_tick():
+            try:
+                await on_tick(tick)
+            finally:
+                self.__running_markets.difference_update(tick.markets)
+
+        task = asyncio.create_task(run_tick())
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
@@ -0,0 +1,29 @@
+import math
+import re
+
+# 숫자, 영문 단어, 공백, 그 외 기호 단위로 나눔
+_TOKEN_PATTERN = re.compile(r"\d|[A-Za-z]+|\s+|[^\dA-Za-z\s]")
+
+def estimate_tokens(text: str) -> int:
+    """
+    오프라인에서 쓸 수 있는 대략적인 토큰 수 추정치.
+    Gemini 계열 토크나이저는 숫자를 한 자리씩 나누므로 숫자는 자리마다 1토큰,
+    영문 단어는 4글자당 1토큰, 공백 묶음과 기호는 각각 1토큰으로 계산합니다.
+    형식 간 상대 비교용이며 실제 과금 토큰 수와는 차이가 있을 수 있습니다.
+
+    Args:
+        text (str): 추정할 텍스트
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece[0].isalpha():
+            tokens += math.ceil(len(piece) / 4)
+        elif piece[0].isspace():
+            # 단어 앞 공백 한 칸은 보통 다음 토큰에 붙음
+            tokens += 0 if piece == " " else 1
+        else:
+            tokens += 1
+    return tokens
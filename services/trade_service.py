@@ -6,15 +6,22 @@ from repos.member_repo import MemberRepo
 from services.action_service import ActionService
 from services.candle_analysis_service import CandleAnalysisService
 from settings.db_connection import DBMS
+from settings.metrics import Metrics
 from dtos.candle_chart import CandleChart # CandleChart 임포트 추가 (타입 힌팅용)
 from tables.member import Member # Member 임포트 추가 (타입 힌팅용)
 from typing import Optional, Tuple # 타입 힌팅용 임포트 추가
+import asyncio
+import time
 
 class TradeService:
+    BATCH_MARKET_LABEL = "batch" # 배치 모드에서 모든 마켓을 한 번에 처리하는 단계의 market 레이블
+
     def __init__(self, timeframe_config: dict, debug = False):
         # 기본 시간대 구성 설정
         self.__timeframe_config = timeframe_config
         self.__debug = debug
+        self.__member_locks = {} # 회원 ID -> asyncio.Lock
+        self.__metrics = Metrics() # 기본값은 비활성 (수집하지 않음)
     
     def set_upbit_client(self, upbit_client: UpbitClient):
         self.__upbit_client = upbit_client
@@ -31,35 +38,61 @@ class TradeService:
     def set_dbms(self, dbms: DBMS):
         self.__dbms = dbms
 
+    def set_metrics(self, metrics: Metrics):
+        """단계별 지연 시간과 결정/오류 카운터를 기록할 메트릭 레지스트리를 설정합니다."""
+        self.__metrics = metrics
+
+    def _get_member_lock(self, member_id: int) -> asyncio.Lock:
+        """회원별 잠금. 여러 마켓의 결정이 같은 회원의 잔고/코인을 동시에 갱신하지 않도록 합니다."""
+        lock = self.__member_locks.get(member_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.__member_locks[member_id] = lock
+        return lock
+
     def _log_debug(self, message: str, shouldDebugMode: bool = True):
         """디버그 메시지를 출력하는 헬퍼 메서드"""
         if self.__debug or not shouldDebugMode:
             print(f"TradeService: {message}")
 
-    async def _fetch_trade_prerequisites(self, member_id: int, session) -> Optional[Tuple[CandleChart, Decision, Member]]:
-        """거래 로직 실행에 필요한 데이터를 가져옵니다."""
-        self._log_debug("Fetching candle chart...")
+    async def _fetch_candle_chart(self, market: str = None, deadline: float = None) -> Optional[CandleChart]:
+        """캔들 차트를 가져옵니다. 현재가가 없으면 None. deadline(monotonic)을 넘기는 Upbit 재시도는 하지 않습니다."""
+        self._log_debug(f"Fetching candle chart for market {market}...")
         # BUGFIX:
         self._log_debug(f"Passing timeframe_config to UpbitClient: {self.__timeframe_config}")
         # :END
-        candle_chart = await self.__upbit_client.fetch_candle_chart(self.__timeframe_config)
+        with self.__metrics.stage("candle_chart", market):
+            candle_chart = await self.__upbit_client.fetch_candle_chart(self.__timeframe_config, market, deadline)
         if not candle_chart or not candle_chart.current_price:
              print("TradeService: Failed to fetch candle chart or current price. Skipping logic.")
+             self.__metrics.record_error("candle_chart", market)
              return None
         self._log_debug("Candle chart fetched.")
+        return candle_chart
+
+    async def _fetch_market_decision(self, market: str = None, deadline: float = None) -> Optional[Tuple[CandleChart, Decision]]:
+        """캔들 차트를 가져와 거래 결정을 받습니다. (DB 세션 없이 실행)"""
+        candle_chart = await self._fetch_candle_chart(market, deadline)
+        if candle_chart is None:
+            return None
 
         self._log_debug("Requesting trade decision from Decision Service...")
-        decision: Decision = await self.__decision_service.execute_trade_decision(candle_chart)
+        with self.__metrics.stage("decision", market):
+            decision: Decision = await self.__decision_service.execute_trade_decision(candle_chart)
+        self.__metrics.record_decision(market, decision.action)
         self._log_debug(f"Received decision: {decision.action} (Desired state)")
 
+        return candle_chart, decision
+
+    def _fetch_member(self, member_id: int, session) -> Optional[Member]:
+        """회원과 보유 코인을 가져옵니다."""
         self._log_debug(f"Fetching member {member_id} and their coin...")
         member = self.__member_repo.get_member_by_id(member_id, session)
         if not member:
             print(f"TradeService: Member {member_id} not found. Skipping logic.")
             return None
         self._log_debug(f"Member fetched. Currently holding coin: {member.coin is not None}")
-
-        return candle_chart, decision, member
+        return member
 
     def _execute_action_based_on_decision(self, member: Member, decision: Decision, session):
         """CandleAnalysisService 결정과 현재 상태를 비교하여 매수/매도 액션을 실행합니다."""
@@ -67,6 +100,11 @@ class TradeService:
         has_coin = current_coin is not None
         action = decision.action # CandleAnalysisService는 'BUY', 'SELL', 'NEUTRAL' 등을 반환
 
+        # 회원은 코인을 하나만 보유할 수 있으므로, 다른 마켓의 코인을 보유 중이면 이 마켓에서는 매매하지 않음
+        if has_coin and decision.market and current_coin.market != decision.market:
+            self._log_debug(f"Member holds {current_coin.market}, not {decision.market}. No action taken for '{action}'.", False)
+            return
+
         # CandleAnalysisService의 'BUY' 액션 처리
         if action == "BUY":
             if not has_coin:
@@ -89,19 +127,149 @@ class TradeService:
             # 'BUY', 'SELL' 외 다른 값이거나 분석 결과가 중립일 경우 ('NEUTRAL' 등)
             self._log_debug(f"Decision is '{action}'. No action taken. Reason: {decision.reason}", False)
 
-    async def execute_trade_logic(self, member_id: int):
-        self._log_debug(f"Executing trade logic for member ID: {member_id}")
+    async def execute_trade_logic(self, member_id: int, market: str = None, deadline: float = None):
+        self._log_debug(f"Executing trade logic for member ID: {member_id}, market: {market}")
+        with self.__metrics.stage("total", market):
+            await self.__execute_trade_logic(member_id, market, deadline)
+        self._log_debug(f"Trade logic execution finished for member ID: {member_id}")
+
+    async def __execute_trade_logic(self, member_id: int, market: str = None, deadline: float = None):
+        # 1. 캔들 차트와 거래 결정 가져오기
+        # (여러 마켓이 동시에 실행되므로 네트워크 대기 중에는 DB 세션을 잡고 있지 않음)
+        prerequisites = await self._fetch_market_decision(market, deadline)
+        if prerequisites is None:
+            self._log_debug(f"Could not fetch prerequisites for member {member_id}. Aborting trade logic.")
+            return # 필수 데이터 없으면 중단
 
-        with self.__dbms.get_session() as session:
-            # 1. 거래 실행에 필요한 데이터 가져오기
-            prerequisites = await self._fetch_trade_prerequisites(member_id, session)
-            if prerequisites is None:
+        candle_chart, decision = prerequisites
+        metrics = self.__metrics
+        applied_at = []
+
+        def apply(session):
+            with metrics.stage("member_load", market):
+                member = self._fetch_member(member_id, session)
+            if member is None:
+                metrics.record_error("member_load", market)
                 self._log_debug(f"Could not fetch prerequisites for member {member_id}. Aborting trade logic.")
                 return # 필수 데이터 없으면 중단
 
-            candle_chart, decision, member = prerequisites
-
             # 2. LLM 결정과 현재 상태 비교하여 매수/매도 실행
-            self._execute_action_based_on_decision(member, decision, session)
+            with metrics.stage("action", market):
+                self._execute_action_based_on_decision(member, decision, session)
+            applied_at.append(time.perf_counter())
+
+        # 커넥션은 실제 조회/기록 동안에만 사용. 같은 회원에 대한 여러 마켓의 반영은 순서대로 실행
+        async with self._get_member_lock(member_id):
+            await self.__dbms.run_in_session(apply)
+        if applied_at:
+            # 작업이 끝난 뒤 run_in_session이 커밋하고 세션을 닫기까지 걸린 시간
+            metrics.observe(Metrics.STAGE_SECONDS, time.perf_counter() - applied_at[0], stage="db_commit", market=market or "default")
+
+    async def execute_trade_logic_for_markets(self, member_id: int, markets: list, tick_budget: float) -> dict:
+        """
+        여러 마켓의 fetch→decide→execute를 동시에 실행하고, 틱 예산 안에 끝난 마켓 수를 보고합니다.
+        Upbit 요청 속도는 UpbitClient에 설정된 공유 RateLimiter가 조절합니다.
+
+        Args:
+            member_id (int): 회원 ID.
+            markets (list): 거래할 마켓 리스트 (ex. ['KRW-BTC', 'KRW-ETH']).
+            tick_budget (float): 한 틱에 허용된 시간(초). Upbit 요청 재시도의 마감 시각으로도 사용합니다.
+
+        Returns:
+            dict: 전체/예산 내 완료/예산 초과/실패 마켓 수와 전체 소요 시간.
+        """
+        started = time.monotonic()
+        deadline = started + tick_budget # Upbit 재시도는 이 시각 안에서만
+
+        async def run(market: str) -> Tuple[bool, float]:
+            try:
+                await self.execute_trade_logic(member_id, market, deadline)
+                return True, time.monotonic() - started
+            except Exception as e:
+                print(f"TradeService: Error during trade logic for market {market}: {e}")
+                self.__metrics.record_error("trade_logic", market)
+                return False, time.monotonic() - started
+
+        results = await asyncio.gather(*(run(market) for market in markets))
+
+        report = {
+            "markets": len(markets),
+            "within_budget": sum(1 for ok, elapsed in results if ok and elapsed <= tick_budget),
+            "over_budget": sum(1 for ok, elapsed in results if ok and elapsed > tick_budget),
+            "failed": sum(1 for ok, _ in results if not ok),
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+        }
+        self._log_debug(f"Tick report: {report}", False)
+        return report
+
+    async def execute_batch_trade_logic(self, markets: list, tick_budget: float) -> dict:
+        """
+        배치 모드: 마켓별로 캔들 차트 조회와 결정을 한 번씩만 수행한 뒤,
+        그 결정을 모든 회원(페이퍼 계좌)에게 한 트랜잭션으로 일괄 적용합니다.
+
+        Args:
+            markets (list): 거래할 마켓 리스트 (ex. ['KRW-BTC', 'KRW-ETH']).
+            tick_budget (float): 한 틱에 허용된 시간(초). Upbit 요청 재시도의 마감 시각으로도 사용합니다.
+
+        Returns:
+            dict: 결정된 마켓 수, 실패 마켓 수, 회원 수, 매수/매도 건수, 소요 시간.
+        """
+        started = time.monotonic()
+
+        # 1. 마켓별 조회 후 결정 (회원 수와 무관하게 마켓당 1회, LLM 전략은 여러 마켓을 한 요청으로 묶음)
+        deadline = started + tick_budget # Upbit 재시도는 이 시각 안에서만
+        results = await asyncio.gather(*(self._fetch_candle_chart(market, deadline) for market in markets), return_exceptions=True)
+        charts = []
+        failed = 0
+        for market, result in zip(markets, results):
+            if isinstance(result, Exception):
+                print(f"TradeService: Error during fetch for market {market}: {result}")
+                self.__metrics.record_error("candle_chart", market)
+                failed += 1
+            elif result is None:
+                failed += 1
+            else:
+                charts.append(result)
+
+        decisions = {}
+        if charts:
+            self._log_debug(f"Requesting trade decisions for {len(charts)} markets from Decision Service...")
+            with self.__metrics.stage("decision", self.BATCH_MARKET_LABEL):
+                results = await self.__decision_service.execute_trade_decisions(charts)
+            for candle_chart, decision in zip(charts, results):
+                if isinstance(decision, Exception):
+                    print(f"TradeService: Error during decision for market {candle_chart.market}: {decision}")
+                    self.__metrics.record_error("decision", candle_chart.market)
+                    failed += 1
+                else:
+                    self.__metrics.record_decision(candle_chart.market, decision.action)
+                    decisions[candle_chart.market] = decision
+
+        # 2. 회원/코인 일괄 조회 후 한 트랜잭션으로 매수/매도 반영
+        metrics = self.__metrics
+        applied_at = []
+
+        def apply(session):
+            with metrics.stage("member_load", self.BATCH_MARKET_LABEL):
+                members = self.__member_repo.get_all_members_with_coin(session)
+            with metrics.stage("action", self.BATCH_MARKET_LABEL):
+                applied = self.__action_service.apply_decisions_bulk(members, decisions, session)
+            applied_at.append(time.perf_counter())
+            return len(members), applied
+
+        member_count, applied = await self.__dbms.run_in_session(apply)
+        metrics.observe(Metrics.STAGE_SECONDS, time.perf_counter() - applied_at[0], stage="db_commit", market=self.BATCH_MARKET_LABEL)
 
-        self._log_debug(f"Trade logic execution finished for member ID: {member_id}")
\ No newline at end of file
+        elapsed = time.monotonic() - started
+        report = {
+            "markets": len(markets),
+            "decided": len(decisions),
+            "failed": failed,
+            "members": member_count,
+            "buys": applied["buys"],
+            "sells": applied["sells"],
+            "within_budget": elapsed <= tick_budget,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+        self._log_debug(f"Batch tick report: {report}", False)
+        return report
@@ -1,24 +1,72 @@
-from contextlib import contextmanager
-from sqlalchemy import create_engine
+import hashlib
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy import Column, MetaData, String, Table, create_engine, delete, insert, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 Base = declarative_base()
 
+# 마지막으로 생성한 스키마의 버전(테이블 정의 해시). Base 메타데이터와 분리해 drop_all()의 영향을 받지 않음
+schema_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version", schema_metadata,
+    Column("version", String(64), primary_key=True)
+)
+
 class DBMS:
-    def __init__(self, host, port, user, password, name):
-        # SQLAlchemy 엔진 생성
+    def __init__(self, host, port, user, password, name,
+                 async_mode: bool = False,
+                 async_driver: str = "aiomysql",
+                 pool_size: int = 5,
+                 max_overflow: int = 10,
+                 pool_timeout: float = 30,
+                 pool_recycle: int = 3600):
+        """
+        Args:
+            async_mode (bool): True면 거래 경로의 DB 작업을 비동기 엔진(SQLAlchemy asyncio)으로 실행
+            async_driver (str): 비동기 MySQL 드라이버 (ex. aiomysql, asyncmy)
+            pool_size (int): 커넥션 풀 크기
+            max_overflow (int): 풀 크기를 넘어 추가로 열 수 있는 커넥션 수
+            pool_timeout (float): 풀에서 커넥션을 기다리는 최대 시간(초)
+            pool_recycle (int): 커넥션 재생성 주기(초)
+        """
+        pool_options = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": True,
+        }
+
+        # SQLAlchemy 엔진 생성 (스키마 초기화 및 동기 경로용)
         connection_string = f"mysql+pymysql://{user}:{password}@{host}:{port}/{name}"
-        self.__engine = create_engine(connection_string, echo=False)
+        self.__engine = create_engine(connection_string, echo=False, **pool_options)
         
         # 세션 팩토리 생성
         self.session_factory = sessionmaker(bind=self.__engine)
         self.Session = scoped_session(self.session_factory)
+
+        # 비동기 엔진 생성 (async_mode일 때만 드라이버 임포트)
+        self.__async_engine = None
+        self.async_session_factory = None
+        if async_mode:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            async_connection_string = f"mysql+{async_driver}://{user}:{password}@{host}:{port}/{name}"
+            self.__async_engine = create_async_engine(async_connection_string, echo=False, **pool_options)
+            self.async_session_factory = async_sessionmaker(bind=self.__async_engine, expire_on_commit=False)
+
+        self.__close_hooks = []
+
+    def is_async(self) -> bool:
+        return self.__async_engine is not None
     
     @contextmanager
     def get_session(self):
         """세션을 제공하고 완료 시 자동으로 닫는 컨텍스트 매니저"""
-        session = self.Session()
+        # 여러 마켓의 코루틴이 같은 스레드에서 동시에 실행되므로 스레드 로컬(scoped) 세션을 공유하지 않고 새 세션 사용
+        session = self.session_factory()
         try:
             yield session
             session.commit()
@@ -27,19 +75,81 @@ class DBMS:
             raise e
         finally:
             session.close()
+
+    @asynccontextmanager
+    async def get_async_session(self):
+        """비동기 세션을 제공하고 완료 시 자동으로 커밋/롤백 후 닫는 컨텍스트 매니저"""
+        session = self.async_session_factory()
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            raise e
+        finally:
+            await session.close()
+
+    async def run_in_session(self, work):
+        """
+        work(session)을 하나의 트랜잭션 안에서 실행하고 결과를 반환합니다.
+        async_mode에서는 AsyncSession.run_sync()로 실행하므로 기존 동기 레포지토리 코드를 그대로 쓰면서도
+        모든 I/O가 비동기 드라이버를 통해 이루어져 이벤트 루프를 막지 않습니다.
+        커넥션은 이 호출 동안에만 풀에서 빌려 씁니다.
+
+        Args:
+            work: 동기 Session을 인자로 받는 함수
+        """
+        if self.__async_engine is None:
+            with self.get_session() as session:
+                return work(session)
+        async with self.get_async_session() as session:
+            return await session.run_sync(work)
     
-    def setup(self, drop=False):
+    def setup(self, drop=False) -> bool:
         """
         데이터베이스 스키마를 초기화합니다.
-        이 메서드는 기존의 모든 테이블을 삭제하고 Base 메타데이터를 기반으로 새 테이블을 생성합니다.
+        drop이면 기존의 모든 테이블을 삭제하고 Base 메타데이터를 기반으로 새 테이블을 생성합니다.
+        drop이 아니고 저장된 스키마 버전이 현재 테이블 정의와 같으면 create_all()(테이블별 존재 확인)을 건너뜁니다.
+
+        Returns:
+            bool: create_all()을 실행했으면 True, 스키마가 최신이라 건너뛰었으면 False
         """
+        version = self.get_schema_version()
+        if not drop and self.__read_schema_version() == version:
+            return False
+
         if drop:
             self.drop_all()
         self.create_all()
+        self.__write_schema_version(version)
         
         if drop:
             # Create initial test member
             self.__create_test_member()
+        return True
+
+    def get_schema_version(self) -> str:
+        """Base 메타데이터의 테이블/컬럼 정의로 만든 스키마 버전 (sha256 앞 16자리)"""
+        parts = []
+        for table in sorted(Base.metadata.tables.values(), key=lambda table: table.name):
+            parts.append(table.name)
+            for column in table.columns:
+                foreign_keys = ",".join(sorted(key.target_fullname for key in column.foreign_keys))
+                parts.append(f"{column.name} {column.type} {column.nullable} {column.primary_key} {foreign_keys}")
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+    def __read_schema_version(self) -> (str | None):
+        try:
+            with self.__engine.connect() as connection:
+                return connection.execute(select(schema_version_table.c.version)).scalar()
+        except SQLAlchemyError:
+            return None # 버전 테이블이 없음 (처음 실행)
+
+    def __write_schema_version(self, version: str):
+        with self.__engine.begin() as connection:
+            schema_metadata.create_all(connection)
+            connection.execute(delete(schema_version_table))
+            connection.execute(insert(schema_version_table).values(version=version))
             
     def __create_test_member(self):
         from tables.member import Member
@@ -48,8 +158,22 @@ class DBMS:
             test_member = Member(name="test", balance=100000000)
             session.add(test_member)
     
+    def add_close_hook(self, hook):
+        """close_all()에서 세션을 정리하기 전에 호출할 함수를 등록합니다. (ex. 남은 로그 기록)"""
+        self.__close_hooks.append(hook)
+
     def close_all(self):
+        for hook in self.__close_hooks:
+            try:
+                hook()
+            except Exception as e:
+                print(f"DBMS: Error in close hook: {e}")
         self.Session.remove()
+
+    async def close_async(self):
+        """비동기 엔진의 커넥션 풀을 정리합니다. (이벤트 루프 안에서 호출)"""
+        if self.__async_engine is not None:
+            await self.__async_engine.dispose()
         
     def drop_all(self):
         Base.metadata.drop_all(self.__engine)
@@ -0,0 +1,204 @@
+import time
+from bisect import bisect_left
+
+from aiohttp import web
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram 형식)"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Span:
+    """with 블록의 실행 시간을 히스토그램에 기록하고, 예외가 나면 오류 카운터를 올리는 타이밍 스팬"""
+
+    __slots__ = ("metrics", "labels", "started")
+
+    def __init__(self, metrics: "Metrics", labels: dict):
+        self.metrics = metrics
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(Metrics.STAGE_SECONDS, time.perf_counter() - self.started, **self.labels)
+        if exc_type is not None:
+            # 오류 카운터는 record_error()와 같은 레이블(stage, market)만 사용 (timeframe 제외)
+            self.metrics.record_error(self.labels["stage"], self.labels["market"])
+        return False
+
+class NullSpan:
+    """메트릭 비활성 시 사용하는 아무 일도 하지 않는 스팬"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Metrics:
+    """
+    거래 틱의 단계별 지연 시간과 결정/오류 카운터를 모아 Prometheus 텍스트 형식으로 내보내는 레지스트리.
+    비활성(enabled=False)일 때 stage()는 공유 NullSpan을, inc()/observe()는 바로 반환하므로 비용이 거의 없습니다.
+    단일 이벤트 루프 안에서만 갱신하므로 잠금을 쓰지 않습니다.
+    """
+
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    DEFAULT_HOST = "127.0.0.1"
+
+    STAGE_SECONDS = "trade_stage_duration_seconds"
+    DECISIONS_TOTAL = "trade_decisions_total"
+    ERRORS_TOTAL = "trade_errors_total"
+
+    def __init__(self, enabled: bool = False, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Args:
+            enabled (bool): 메트릭 수집 여부
+            buckets (tuple): 지연 시간 히스토그램 버킷 상한(초)
+        """
+        self.enabled = enabled
+        self.__buckets = tuple(sorted(buckets))
+        self.__counters = {} # 이름 -> {레이블 튜플: 값}
+        self.__histograms = {} # 이름 -> {레이블 튜플: Histogram}
+        self.__gauges = {} # 이름 -> {레이블 튜플: 값}
+        self.__help = {
+            self.STAGE_SECONDS: "Duration of each trade tick stage in seconds.",
+            self.DECISIONS_TOTAL: "Trade decisions by market and action.",
+            self.ERRORS_TOTAL: "Trade tick errors by stage and market.",
+        }
+        self.__runner: web.AppRunner = None
+
+    def describe(self, name: str, help_text: str):
+        """메트릭 설명(# HELP)을 등록합니다."""
+        self.__help[name] = help_text
+
+    def stage(self, stage: str, market: str, timeframe: str = None):
+        """
+        단계 실행 시간을 재는 스팬을 반환합니다. 예외로 끝나면 stage/market 레이블로 오류 카운터를 올립니다.
+
+        Args:
+            stage (str): 단계 이름 (ex. candle_fetch, decision, member_load, action, db_commit)
+            market (str): 마켓 (ex. KRW-BTC)
+            timeframe (str, optional): 시간대 (캔들 조회 단계)
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        labels = {"stage": stage, "market": market or "default"}
+        if timeframe:
+            labels["timeframe"] = timeframe
+        return Span(self, labels)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """카운터를 amount만큼 올립니다."""
+        if not self.enabled:
+            return
+        series = self.__counters.setdefault(name, {})
+        key = tuple(labels.items())
+        series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """게이지를 value로 설정합니다."""
+        if not self.enabled:
+            return
+        self.__gauges.setdefault(name, {})[tuple(labels.items())] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """히스토그램에 값을 기록합니다."""
+        if not self.enabled:
+            return
+        series = self.__histograms.setdefault(name, {})
+        key = tuple(labels.items())
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(self.__buckets)
+        histogram.observe(value)
+
+    def record_decision(self, market: str, action):
+        """마켓/액션별 결정 카운터를 올립니다."""
+        if not self.enabled:
+            return
+        self.inc(self.DECISIONS_TOTAL, market=market or "default", action=str(getattr(action, "value", action)))
+
+    def record_error(self, stage: str, market: str):
+        """예외 없이 실패한 단계(ex. 현재가 없음, 회원 없음)의 오류 카운터를 올립니다."""
+        self.inc(self.ERRORS_TOTAL, stage=stage, market=market or "default")
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식(0.0.4)으로 모든 메트릭을 반환합니다."""
+        lines = []
+        for name, series in self.__counters.items():
+            self.__render_header(lines, name, "counter")
+            for key, value in series.items():
+                lines.append(f"{name}{self.__format_labels(key)} {self.__format_value(value)}")
+        for name, series in self.__gauges.items():
+            self.__render_header(lines, name, "gauge")
+            for key, value in series.items():
+                lines.append(f"{name}{self.__format_labels(key)} {self.__format_value(value)}")
+        for name, series in self.__histograms.items():
+            self.__render_header(lines, name, "histogram")
+            for key, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(self.__buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self.__format_labels(key, ('le', self.__format_value(bound)))} {cumulative}")
+                lines.append(f"{name}_bucket{self.__format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                lines.append(f"{name}_sum{self.__format_labels(key)} {self.__format_value(histogram.sum)}")
+                lines.append(f"{name}_count{self.__format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def __render_header(self, lines: list, name: str, metric_type: str):
+        if name in self.__help:
+            lines.append(f"# HELP {name} {self.__help[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    def __format_labels(self, key: tuple, extra: tuple = None) -> str:
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{label}="{self.__escape(value)}"' for label, value in pairs) + "}"
+
+    def __escape(self, value) -> str:
+        """레이블 값의 역슬래시, 큰따옴표, 줄바꿈을 이스케이프합니다."""
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def __format_value(self, value: float) -> str:
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    async def start_server(self, port: int, host: str = DEFAULT_HOST) -> str:
+        """
+        GET /metrics를 제공하는 로컬 HTTP 서버를 시작합니다. 실행 중인 이벤트 루프 안에서 호출해야 합니다.
+
+        Returns:
+            str: 메트릭 엔드포인트 URL
+        """
+        async def handle(request: web.Request) -> web.Response:
+            return web.Response(body=self.render().encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self.__runner = web.AppRunner(app, access_log=None)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}/metrics"
+
+    async def stop_server(self):
+        """start_server()로 시작한 HTTP 서버를 닫습니다."""
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
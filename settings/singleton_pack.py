@@ -1,19 +1,29 @@
 import os
 import json
+import time
+from contextlib import contextmanager
 
 from dotenv import load_dotenv
 from clients.gemini_client import GeminiClient
+from clients.rate_limiter import RateLimiter
 from clients.upbit_client import UpbitClient
+from clients.upbit_stream import UpbitStream
 from repos.action_repo import ActionRepo
+from repos.candle_repo import CandleRepo
 from repos.coin_repo import CoinRepo
+from repos.decision_cache import DecisionCache
 from repos.decision_log_repo import DecisionLogRepo
+from repos.decision_log_writer import DecisionLogWriter
 from repos.member_repo import MemberRepo
 from services.action_service import ActionService
 from services.candle_analysis_service import CandleAnalysisService
 from services.candle_service import CandleService
+from services.decision_executor import DecisionExecutor
 from services.decision_service import DecisionService
+from services.llm_service import LLMService
 from services.trade_service import TradeService
 from settings.db_connection import DBMS
+from settings.metrics import Metrics
 
 class SingletonPack:
     """
@@ -22,43 +32,149 @@ class SingletonPack:
         전역적으로 접근할 수 있도록 한다. DBMS, GeminiClient, UpbitClient, ActionService,
         TradeService, CandleService 등의 객체를 생성하고,
         각 객체 간의 의존성을 설정하여 전체 시스템을 구성한다.
+        LLM 결정 경로에서만 쓰는 객체(GeminiClient, LLMService, CandleService, DecisionCache)는
+        처음 접근할 때 생성하며(지연 생성), 단계별 초기화 시간은 get_startup_report()로 확인한다.
         Attributes:
-            LLM_API_KEY (str): LLM API 키. 환경 변수에서 로드.
+            DECISION_SERVICE (str): 결정 서비스 (analysis: CandleAnalysisService, llm: LLMService). 환경 변수에서 로드. (기본값: analysis)
+            DECISION_EXECUTOR (str): 분석 결정 서비스의 Ichimoku 계산 실행 위치 (inline, thread, process). 환경 변수에서 로드. (기본값: inline)
+            DECISION_WORKERS (int): thread/process 실행기의 작업자 수. 환경 변수에서 로드. (기본값: CPU 코어 수)
+            LLM_API_KEY (str): LLM API 키. 환경 변수에서 로드. (LLM 결정 서비스 사용 시 필수)
             LLM_REQUEST_SCHEME (str): LLM 요청 구조. 파일에서 읽어옴.
             LLM_RESPONSE_SCHEME (str): LLM 응답 구조. 파일에서 읽어옴.
             LLM_MODEL (str): LLM 모델 이름. 환경 변수에서 로드.
+            LLM_TIMEOUT_SECONDS (float): LLM 호출 1건의 마감 시간(초). 환경 변수에서 로드. (기본값: 30)
+            LLM_MAX_CONCURRENCY (int): 동시에 진행할 수 있는 LLM 요청 수. 환경 변수에서 로드. (기본값: 4)
+            LLM_HEDGE_PERCENTILE (float): 헤지 요청 기준 지연 시간 백분위. 환경 변수에서 로드. (기본값: 없음, 헤지 안 함)
+            LLM_BASE_URL (str): Gemini API 주소. 로컬 가짜 서버 사용 시 환경 변수에서 지정.
+            LLM_CANDLE_FORMAT (str): 프롬프트 캔들 인코딩 (json, table, delta, indexed, compact). 환경 변수에서 로드. (기본값: json)
+            LLM_BATCH_TOKEN_BUDGET (int): 여러 마켓을 묶은 LLM 프롬프트 1건의 추정 토큰 상한. 환경 변수에서 로드. (기본값: 30000)
+            LLM_MAX_BATCH_MARKETS (int): LLM 프롬프트 1건에 묶을 최대 마켓 수. 환경 변수에서 로드. (기본값: 10)
             MARKET (str): 거래소 마켓. 환경 변수에서 로드. (ex. KRW-BTC)
+            MARKETS (list): 동시에 거래할 마켓 리스트. MARKETS 환경 변수(쉼표 구분)에서 로드하며, 없으면 [MARKET].
+            UPBIT_BASE_URL (str): Upbit API 주소. 로컬 가짜 서버 사용 시 환경 변수에서 지정. (기본값: https://api.upbit.com)
+            UPBIT_RATE_PER_SECOND (float): Upbit 초당 요청 제한. 환경 변수에서 로드. (기본값: 10)
+            UPBIT_RATE_PER_MINUTE (float): Upbit 분당 요청 제한. 환경 변수에서 로드. (기본값: 600)
+            POST_CLOSE_DELAY_SECONDS (float): 캔들 마감 후 틱 실행까지 기다릴 시간(초). 환경 변수에서 로드. (기본값: 1)
+            STREAM_MODE (bool): Upbit WebSocket 체결 스트림으로 캔들을 만들고 캔들 마감 시 결정을 실행할지 여부. 환경 변수에서 로드.
+            UPBIT_WS_URL (str): Upbit WebSocket 주소. 로컬 재생 서버 사용 시 환경 변수에서 지정. (기본값: wss://api.upbit.com/websocket/v1)
+            STREAM_CLOSE_DELAY_SECONDS (float): 경계 후 거래가 없는 마켓의 캔들을 마감할 때까지 기다릴 시간(초). 환경 변수에서 로드. (기본값: 0.3)
+            DB_ASYNC (bool): 거래 경로 DB 작업을 비동기 엔진으로 실행할지 여부. 환경 변수에서 로드.
+            DB_ASYNC_DRIVER (str): 비동기 MySQL 드라이버. 환경 변수에서 로드. (기본값: aiomysql)
+            DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE: 커넥션 풀 설정. 환경 변수에서 로드.
+            BATCH_MODE (bool): 배치 모드 여부. 마켓별 결정을 모든 회원에게 일괄 적용. 환경 변수에서 로드.
+            TICK_BUDGET_SECONDS (float): 한 틱에서 모든 마켓이 끝나야 하는 시간(초). 환경 변수에서 로드. (기본값: 가장 작은 시간대)
             DCA (float): DCA 비율. 환경 변수에서 로드하여 퍼센트(%)로 변환. (ex. 0.01 = 1%)
             TIMEFRAME_CONFIG (dict): 시간대 설정. 환경 변수에서 JSON 형태로 로드.
+            CANDLE_STORE_PATH (str): 로컬 캔들 저장소(SQLite) 경로. 환경 변수에서 로드. (기본값: ./candles.db)
+            RESAMPLE_BASE_TIMEFRAME (str): 상위 시간대를 로컬에서 만들 기준 시간대 (ex. 5m). 환경 변수에서 로드. (기본값: 없음, 시간대별로 요청. 스트리밍 모드에서는 가장 작은 시간대)
+            RESAMPLE_MAX_BASE_CANDLES (int): 리샘플링용 기준 시간대 윈도우 최대 캔들 수. 환경 변수에서 로드. (기본값: 2000)
+            DECISION_LOG_QUEUE_SIZE (int): 결정 로그 큐 최대 크기. 환경 변수에서 로드. (기본값: 10000)
+            DECISION_LOG_BATCH_SIZE (int): 결정 로그를 한 번에 기록할 개수. 환경 변수에서 로드. (기본값: 500)
+            DECISION_LOG_FLUSH_INTERVAL (float): 결정 로그 기록 주기(초). 환경 변수에서 로드. (기본값: 1)
+            DECISION_LOG_OVERFLOW_POLICY (str): 큐가 가득 찼을 때의 정책. 환경 변수에서 로드. (기본값: drop_oldest)
+            DECISION_CACHE_TTL_SECONDS (float): LLM 결정 캐시 유효 시간(초). 환경 변수에서 로드. (기본값: 3600)
+            DECISION_CACHE_MAX_ENTRIES (int): LLM 결정 캐시 메모리 계층 최대 항목 수. 환경 변수에서 로드. (기본값: 1024)
+            DECISION_CACHE_PATH (str): LLM 결정 캐시 디스크 계층(SQLite) 경로. 환경 변수에서 로드. (기본값: 없음, 메모리만 사용)
+            METRICS_PORT (int): Prometheus 텍스트 형식 메트릭 엔드포인트(/metrics) 포트. 환경 변수에서 로드. (기본값: 없음, 수집 안 함)
+            METRICS_HOST (str): 메트릭 엔드포인트 주소. 환경 변수에서 로드. (기본값: 127.0.0.1)
             dbms (DBMS): 데이터베이스 관리 시스템 객체.
-            gemini_client (GeminiClient): Gemini API 클라이언트 객체.
+            gemini_client (GeminiClient): Gemini API 클라이언트 객체. (지연 생성)
+            llm_service (LLMService): LLM 결정 서비스 객체. (지연 생성)
             upbit_client (UpbitClient): Upbit API 클라이언트 객체.
+            upbit_stream (UpbitStream): Upbit WebSocket 캔들 스트림 객체. (스트리밍 모드가 아니면 None)
+            candle_repo (CandleRepo): 로컬 캔들 저장소 객체.
+            rate_limiter (RateLimiter): 모든 마켓이 공유하는 Upbit 요청 스케줄러 객체.
+            decision_log_writer (DecisionLogWriter): 결정 로그를 모아 일괄 기록하는 write-behind 로거 객체.
+            decision_cache (DecisionCache): 캔들 차트 지문을 키로 LLM 결정을 보관하는 캐시 객체. (지연 생성)
+            decision_executor (DecisionExecutor): 결정 서비스의 CPU 작업을 스레드/프로세스 풀에서 실행하는 실행기 객체.
+            metrics (Metrics): 틱 단계별 지연 시간과 결정/오류 카운터를 모으는 메트릭 레지스트리 객체.
             action_service (ActionService): 액션 서비스 객체.
             trade_service (TradeService): 거래 서비스 객체.
-            candle_service (CandleService): 캔들 서비스 객체.
+            candle_service (CandleService): 캔들 서비스 객체. (지연 생성)
         Methods:
             initialize_dependencies(): 객체 간의 의존성을 초기화한다. 각 서비스 객체에 필요한 저장소 및 클라이언트를 설정한다.
+            is_initialized(name: str): 지연 생성 객체가 이미 생성되었는지 여부를 반환한다.
+            get_startup_report(): 단계별 초기화 시간(ms), 스키마 생성 여부, 아직 생성하지 않은 객체 목록을 반환한다.
+            startup(): 이벤트 루프 안에서 필요한 비동기 자원(HTTP 세션 등)을 시작한다.
+            shutdown(): startup()에서 시작한 비동기 자원을 정리한다.
             set_action_service(action_service: ActionService): ActionService 객체를 설정한다.
             set_dbms(dbms: DBMS): DBMS 객체를 설정한다.
             set_candle_service(candle_service: CandleService): CandleService 객체를 설정한다.
             set_gemini_client(gemini_client: GeminiClient): GeminiClient 객체를 설정한다.
             set_upbit_client(upbit_client: UpbitClient): UpbitClient 객체를 설정한다.
+            set_upbit_stream(upbit_stream: UpbitStream): UpbitStream 객체를 설정한다.
             set_trade_service(trade_service: TradeService): TradeService 객체를 설정한다.
     """
     
+    DECISION_SERVICE_ANALYSIS = "analysis"
+    DECISION_SERVICE_LLM = "llm"
+
     def __init__(self):
+        self.__started = time.perf_counter()
+        self.__startup_timings = {} # 단계 이름 -> 소요 시간(초)
+        self.__factories = {} # 지연 생성 객체 이름 -> 생성 함수
+        self.__schema_created = None
+
         # 환경변수 로드
+        with self.__timed("env"):
+            self.__load_env()
+
+        # 싱글톤
+        with self.__timed("dbms"):
+            self.set_dbms(DBMS(
+                host=os.environ.get("DB_HOST"),
+                port=int(os.environ.get("DB_PORT")),
+                user=os.environ.get("DB_USER"),
+                password=os.environ.get("DB_PASSWORD"),
+                name=os.environ.get("DB_NAME"),
+                async_mode=self.DB_ASYNC,
+                async_driver=self.DB_ASYNC_DRIVER,
+                pool_size=int(os.environ.get("DB_POOL_SIZE") or 5),
+                max_overflow=int(os.environ.get("DB_MAX_OVERFLOW") or 10),
+                pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT") or 30),
+                pool_recycle=int(os.environ.get("DB_POOL_RECYCLE") or 3600)
+            ))
+        with self.__timed("services"):
+            self.__create_singletons()
+        with self.__timed("wiring"):
+            self.initialize_dependencies()
+        self.__startup_total = time.perf_counter() - self.__started
+
+    def __load_env(self):
         load_dotenv()
         
         # 상수
-        self.LLM_API_KEY = os.environ.get("API_KEY") # LLM API 키
-        if not self.LLM_API_KEY:
-            raise ValueError("API_KEY 환경 변수가 설정되지 않았습니다.")
+        self.DECISION_SERVICE = (os.environ.get("DECISION_SERVICE") or self.DECISION_SERVICE_ANALYSIS).lower()
+        if self.DECISION_SERVICE not in (self.DECISION_SERVICE_ANALYSIS, self.DECISION_SERVICE_LLM):
+            raise ValueError(f"지원하지 않는 DECISION_SERVICE입니다: {self.DECISION_SERVICE}")
+        self.DECISION_EXECUTOR = (os.environ.get("DECISION_EXECUTOR") or DecisionExecutor.INLINE).lower()
+        temp = os.environ.get("DECISION_WORKERS")
+        self.DECISION_WORKERS = int(temp) if temp else None
+        self.LLM_API_KEY = os.environ.get("API_KEY") # LLM API 키 (LLM 결정 서비스의 GeminiClient 생성 시 확인)
         self.LLM_REQUEST_SCHEME = open("./scheme/request.scheme.md", "r").read() # LLM 요청 구조
         self.LLM_RESPONSE_SCHEME = open("./scheme/response.scheme.json", "r").read() # LLM 응답 구조
         self.LLM_MODEL = os.environ.get("LLM_MODEL") # LLM 모델 (ex. gemini-2.0-pro-exp-02-05)
+        temp = os.environ.get("LLM_TIMEOUT_SECONDS")
+        self.LLM_TIMEOUT_SECONDS = float(temp) if temp else GeminiClient.DEFAULT_TIMEOUT
+        temp = os.environ.get("LLM_MAX_CONCURRENCY")
+        self.LLM_MAX_CONCURRENCY = int(temp) if temp else GeminiClient.DEFAULT_MAX_CONCURRENCY
+        temp = os.environ.get("LLM_HEDGE_PERCENTILE")
+        self.LLM_HEDGE_PERCENTILE = float(temp) if temp else None
+        self.LLM_BASE_URL = os.environ.get("LLM_BASE_URL") # 로컬 가짜 Gemini 서버 주소 (ex. http://127.0.0.1:8090)
+        self.LLM_CANDLE_FORMAT = os.environ.get("LLM_CANDLE_FORMAT") or CandleService.FORMAT_JSON # 프롬프트 캔들 인코딩
+        temp = os.environ.get("LLM_BATCH_TOKEN_BUDGET")
+        self.LLM_BATCH_TOKEN_BUDGET = int(temp) if temp else LLMService.DEFAULT_BATCH_TOKEN_BUDGET
+        temp = os.environ.get("LLM_MAX_BATCH_MARKETS")
+        self.LLM_MAX_BATCH_MARKETS = int(temp) if temp else LLMService.DEFAULT_MAX_BATCH_MARKETS
         self.MARKET = os.environ.get("MARKET") # 거래소 마켓 (ex. KRW-BTC)
+        markets_str = os.environ.get("MARKETS") # 거래소 마켓 리스트 (ex. KRW-BTC,KRW-ETH)
+        self.MARKETS = [market.strip() for market in markets_str.split(",") if market.strip()] if markets_str else [self.MARKET]
+        if not self.MARKET:
+            self.MARKET = self.MARKETS[0]
         self.DEBUG = bool(os.environ.get("DEBUG"))
+        self.BATCH_MODE = bool(os.environ.get("BATCH_MODE"))
+        self.DB_ASYNC = bool(os.environ.get("DB_ASYNC"))
+        self.DB_ASYNC_DRIVER = os.environ.get("DB_ASYNC_DRIVER") or "aiomysql"
         
         # DCA 비율 설정
         temp = os.environ.get("DCA")
@@ -79,46 +195,214 @@ class SingletonPack:
             # 기본값 설정 또는 오류 발생 (오류 발생 선택)
             raise ValueError("TIMEFRAME_CONFIG 환경 변수가 설정되지 않았습니다.")
 
-        # 싱글톤
-        self.set_dbms(DBMS(
-            host=os.environ.get("DB_HOST"),
-            port=int(os.environ.get("DB_PORT")),
-            user=os.environ.get("DB_USER"),
-            password=os.environ.get("DB_PASSWORD"),
-            name=os.environ.get("DB_NAME")
-        ))
-        self.set_gemini_client(GeminiClient(
-            llm_key=self.LLM_API_KEY,
-            llm_model = self.LLM_MODEL,
-            llm_response_scheme=self.LLM_RESPONSE_SCHEME,
-            debug=self.DEBUG
+        # Upbit API 주소 (로컬 가짜 서버 ex. http://127.0.0.1:8091), 요청 제한 및 틱 예산
+        self.UPBIT_BASE_URL = os.environ.get("UPBIT_BASE_URL") or UpbitClient.BASE_URL
+        temp = os.environ.get("UPBIT_RATE_PER_SECOND")
+        self.UPBIT_RATE_PER_SECOND = float(temp) if temp else RateLimiter.DEFAULT_PER_SECOND
+        temp = os.environ.get("UPBIT_RATE_PER_MINUTE")
+        self.UPBIT_RATE_PER_MINUTE = float(temp) if temp else RateLimiter.DEFAULT_PER_MINUTE
+        temp = os.environ.get("POST_CLOSE_DELAY_SECONDS")
+        self.POST_CLOSE_DELAY_SECONDS = float(temp) if temp else 1.0
+        self.STREAM_MODE = bool(os.environ.get("STREAM_MODE"))
+        self.UPBIT_WS_URL = os.environ.get("UPBIT_WS_URL") or UpbitStream.WS_URL
+        temp = os.environ.get("STREAM_CLOSE_DELAY_SECONDS")
+        self.STREAM_CLOSE_DELAY_SECONDS = float(temp) if temp else UpbitStream.CLOSE_DELAY
+        temp = os.environ.get("TICK_BUDGET_SECONDS")
+        self.TICK_BUDGET_SECONDS = float(temp) if temp else self.get_smallest_timeframe_minutes() * 60
+
+        # 로컬 캔들 저장소 경로
+        self.CANDLE_STORE_PATH = os.environ.get("CANDLE_STORE_PATH") or "./candles.db"
+
+        # 상위 시간대 로컬 리샘플링 설정 (기준 시간대를 지정한 경우에만)
+        self.RESAMPLE_BASE_TIMEFRAME = os.environ.get("RESAMPLE_BASE_TIMEFRAME") or None
+        if self.STREAM_MODE and not self.RESAMPLE_BASE_TIMEFRAME:
+            # 스트림은 가장 작은 시간대만 만들므로 상위 시간대는 그 캔들로 리샘플링
+            self.RESAMPLE_BASE_TIMEFRAME = min(self.TIMEFRAME_CONFIG, key=self.__parse_timeframe_to_minutes)
+        temp = os.environ.get("RESAMPLE_MAX_BASE_CANDLES")
+        self.RESAMPLE_MAX_BASE_CANDLES = int(temp) if temp else UpbitClient.DEFAULT_MAX_BASE_CANDLES
+
+        # 결정 로그 write-behind 설정
+        self.DECISION_LOG_QUEUE_SIZE = int(os.environ.get("DECISION_LOG_QUEUE_SIZE") or 10000)
+        self.DECISION_LOG_BATCH_SIZE = int(os.environ.get("DECISION_LOG_BATCH_SIZE") or 500)
+        self.DECISION_LOG_FLUSH_INTERVAL = float(os.environ.get("DECISION_LOG_FLUSH_INTERVAL") or 1.0)
+        self.DECISION_LOG_OVERFLOW_POLICY = os.environ.get("DECISION_LOG_OVERFLOW_POLICY") or DecisionLogWriter.DROP_OLDEST
+
+        # LLM 결정 캐시 설정
+        temp = os.environ.get("DECISION_CACHE_TTL_SECONDS")
+        self.DECISION_CACHE_TTL_SECONDS = float(temp) if temp else DecisionCache.DEFAULT_TTL_SECONDS
+        temp = os.environ.get("DECISION_CACHE_MAX_ENTRIES")
+        self.DECISION_CACHE_MAX_ENTRIES = int(temp) if temp else DecisionCache.DEFAULT_MAX_ENTRIES
+        self.DECISION_CACHE_PATH = os.environ.get("DECISION_CACHE_PATH") # ex. ./decision_cache.db
+
+        # 메트릭 엔드포인트 설정 (포트를 지정한 경우에만 수집)
+        temp = os.environ.get("METRICS_PORT")
+        self.METRICS_PORT = int(temp) if temp else None
+        self.METRICS_HOST = os.environ.get("METRICS_HOST") or Metrics.DEFAULT_HOST
+
+    def __get_candle_retention(self) -> int:
+        """캔들 저장소 보관 개수. 리샘플링을 사용하면 기준 시간대 윈도우까지 보관"""
+        retention = max(CandleRepo.DEFAULT_RETENTION, max(self.TIMEFRAME_CONFIG.values()) + 1)
+        if self.RESAMPLE_BASE_TIMEFRAME:
+            retention = max(retention, self.RESAMPLE_MAX_BASE_CANDLES)
+        return retention
+
+    def __create_singletons(self):
+        # LLM 결정 경로 전용 객체는 처음 접근할 때 생성
+        self.__factories["gemini_client"] = self.__create_gemini_client
+        self.__factories["llm_service"] = self.__create_llm_service
+        self.__factories["candle_service"] = CandleService
+        self.__factories["decision_cache"] = lambda: DecisionCache(
+            ttl_seconds=self.DECISION_CACHE_TTL_SECONDS,
+            max_entries=self.DECISION_CACHE_MAX_ENTRIES,
+            path=self.DECISION_CACHE_PATH
+        )
+
+        self.set_upbit_client(UpbitClient(
+            self.MARKET, self.DEBUG, base_url=self.UPBIT_BASE_URL,
+            resample_base=self.RESAMPLE_BASE_TIMEFRAME, max_base_candles=self.RESAMPLE_MAX_BASE_CANDLES
         ))
-        self.set_upbit_client(UpbitClient(self.MARKET, self.DEBUG))
         self.set_action_service(ActionService(self.DCA, self.DEBUG))
         self.set_trade_service(TradeService(self.TIMEFRAME_CONFIG, self.DEBUG))
-        self.set_decision_service(CandleAnalysisService(debug=self.DEBUG))
-        self.set_candle_service(CandleService())
         self.set_decision_log_repo(DecisionLogRepo())
         self.set_member_repo(MemberRepo())
         self.set_action_repo(ActionRepo())
         self.set_coin_repo(CoinRepo())
-        self.initialize_dependencies()
+        self.set_candle_repo(CandleRepo(
+            path=self.CANDLE_STORE_PATH,
+            retention=self.__get_candle_retention()
+        ))
+        self.set_rate_limiter(RateLimiter(self.UPBIT_RATE_PER_SECOND, self.UPBIT_RATE_PER_MINUTE))
+        self.set_upbit_stream(UpbitStream(
+            self.MARKETS,
+            self.get_smallest_timeframe_minutes(),
+            url=self.UPBIT_WS_URL,
+            max_candles=self.__get_candle_retention(),
+            close_delay=self.STREAM_CLOSE_DELAY_SECONDS,
+            debug=self.DEBUG
+        ) if self.STREAM_MODE else None)
+        self.set_decision_log_writer(DecisionLogWriter(
+            dbms=self.dbms,
+            decision_log_repo=self.decision_log_repo,
+            max_queue_size=self.DECISION_LOG_QUEUE_SIZE,
+            batch_size=self.DECISION_LOG_BATCH_SIZE,
+            flush_interval=self.DECISION_LOG_FLUSH_INTERVAL,
+            overflow_policy=self.DECISION_LOG_OVERFLOW_POLICY,
+            debug=self.DEBUG
+        ))
+        self.set_metrics(Metrics(enabled=self.METRICS_PORT is not None))
+        self.set_decision_executor(DecisionExecutor(self.DECISION_EXECUTOR, self.DECISION_WORKERS, self.DEBUG))
+        if self.DECISION_SERVICE == self.DECISION_SERVICE_LLM:
+            self.set_decision_service(self.llm_service)
+        else:
+            self.set_decision_service(CandleAnalysisService(debug=self.DEBUG))
+
+    def __create_gemini_client(self) -> GeminiClient:
+        if not self.LLM_API_KEY:
+            raise ValueError("API_KEY 환경 변수가 설정되지 않았습니다.")
+        return GeminiClient(
+            llm_key=self.LLM_API_KEY,
+            llm_model = self.LLM_MODEL,
+            llm_response_scheme=self.LLM_RESPONSE_SCHEME,
+            debug=self.DEBUG,
+            timeout=self.LLM_TIMEOUT_SECONDS,
+            max_concurrency=self.LLM_MAX_CONCURRENCY,
+            hedge_percentile=self.LLM_HEDGE_PERCENTILE,
+            base_url=self.LLM_BASE_URL
+        )
+
+    def __create_llm_service(self) -> LLMService:
+        llm_service = LLMService(
+            self.LLM_REQUEST_SCHEME,
+            debug=self.DEBUG,
+            candle_format=self.LLM_CANDLE_FORMAT,
+            batch_token_budget=self.LLM_BATCH_TOKEN_BUDGET,
+            max_batch_markets=self.LLM_MAX_BATCH_MARKETS
+        )
+        llm_service.set_gemini_client(self.gemini_client)
+        llm_service.set_candle_service(self.candle_service)
+        llm_service.set_decision_cache(self.decision_cache)
+        return llm_service
+
+    def __getattr__(self, name: str):
+        """ 등록된 지연 생성 객체를 처음 접근할 때 생성합니다. (ex. s_pack.gemini_client) """
+        factories = self.__dict__.get("_SingletonPack__factories")
+        if not factories or name not in factories:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        factory = factories.pop(name)
+        with self.__timed(name):
+            instance = factory()
+        getattr(self, f"set_{name}")(instance)
+        return instance
+
+    def is_initialized(self, name: str) -> bool:
+        """ 객체가 이미 생성되었는지 여부. 지연 생성 객체를 생성하지 않고 확인할 때 사용합니다. """
+        return name in self.__dict__
+
+    @contextmanager
+    def __timed(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__startup_timings[name] = self.__startup_timings.get(name, 0.0) + time.perf_counter() - started
+
+    def get_startup_report(self) -> dict:
+        """ 초기화 전체/단계별 소요 시간(ms), 스키마 생성 여부, 아직 생성하지 않은 지연 생성 객체 목록 """
+        return {
+            "total_ms": round(self.__startup_total * 1000, 1),
+            "steps_ms": {name: round(seconds * 1000, 1) for name, seconds in self.__startup_timings.items()},
+            "schema_created": self.__schema_created,
+            "lazy_pending": sorted(self.__factories),
+        }
         
     def initialize_dependencies(self):
         self.decision_service.set_dbms(self.dbms)
         self.decision_service.set_decision_log_repo(self.decision_log_repo)
+        self.decision_service.set_decision_log_writer(self.decision_log_writer)
+        if self.DECISION_SERVICE == self.DECISION_SERVICE_ANALYSIS:
+            # LLM 결정 경로는 I/O 대기가 대부분이라 실행기를 쓰지 않음
+            self.decision_service.set_decision_executor(self.decision_executor)
+        # 종료 시 DBMS.close_all()에서 큐에 남은 결정 로그를 모두 기록
+        self.dbms.add_close_hook(self.decision_log_writer.flush_sync)
+        self.upbit_client.set_candle_repo(self.candle_repo)
+        self.upbit_client.set_rate_limiter(self.rate_limiter)
+        self.upbit_client.set_metrics(self.metrics)
+        if self.upbit_stream is not None:
+            # 스트림이 관측하지 못한 캔들은 REST(저장소 경유)로 채움
+            timeframe = min(self.TIMEFRAME_CONFIG, key=self.__parse_timeframe_to_minutes)
+            self.upbit_stream.set_backfill(lambda market, count: self.upbit_client.fetch_candles(market, timeframe, count))
+            self.upbit_stream.set_metrics(self.metrics)
+            self.upbit_client.set_candle_stream(self.upbit_stream)
         self.trade_service.set_upbit_client(self.upbit_client)
         self.trade_service.set_action_service(self.action_service)
         self.trade_service.set_dbms(self.dbms)
         self.trade_service.set_member_repo(self.member_repo)
         self.trade_service.set_decision_service(self.decision_service)
-        # LLMService 클래스 사용 시시
-        # self.llm_service.set_gemini_client(self.gemini_client)
-        # self.llm_service.set_candle_service(self.candle_service)
-        # self.llm_service.set_llm_log_repo(self.llm_log_repo)
-        # self.llm_service.set_dbms(self.dbms)
+        self.trade_service.set_metrics(self.metrics)
         self.action_service.set_action_repo(self.action_repo)
         self.action_service.set_coin_repo(self.coin_repo)
+        self.action_service.set_member_repo(self.member_repo)
+
+    async def startup(self):
+        """ 이벤트 루프 안에서 필요한 비동기 자원을 시작합니다. (Upbit 장기 HTTP 세션, 결정 로그 기록 태스크 등) """
+        await self.upbit_client.start()
+        if self.upbit_stream is not None:
+            await self.upbit_stream.start()
+        self.decision_log_writer.start()
+        if self.metrics.enabled:
+            url = await self.metrics.start_server(self.METRICS_PORT, self.METRICS_HOST)
+            print(f"Metrics endpoint listening on {url}")
+
+    async def shutdown(self):
+        """ startup()에서 시작한 비동기 자원을 정리합니다. """
+        await self.metrics.stop_server()
+        if self.upbit_stream is not None:
+            await self.upbit_stream.close()
+        await self.upbit_client.close()
+        # 큐에 남은 결정 로그를 기록한 뒤 비동기 엔진 정리
+        await self.decision_log_writer.stop()
+        self.decision_executor.close()
+        await self.dbms.close_async()
     
     def __parse_timeframe_to_minutes(self, timeframe: str) -> int:
         """ 시간대 문자열을 분 단위 정수로 변환합니다. (예: '5m' -> 5, '1h' -> 60) """
@@ -137,6 +421,10 @@ class SingletonPack:
             except ValueError:
                 raise ValueError(f"지원하지 않거나 잘못된 시간대 형식입니다: {timeframe}")
     
+    def get_timeframe_minutes(self) -> dict:
+        """ TIMEFRAME_CONFIG의 각 시간대를 분 단위로 변환한 딕셔너리를 반환합니다. (예: {'5m': 5, '4h': 240}) """
+        return {tf: self.__parse_timeframe_to_minutes(tf) for tf in self.TIMEFRAME_CONFIG.keys()}
+
     def get_smallest_timeframe_minutes(self) -> int:
         """ TIMEFRAME_CONFIG에서 가장 작은 시간 간격(분)을 반환합니다. """
         if not self.TIMEFRAME_CONFIG:
@@ -160,7 +448,8 @@ class SingletonPack:
     
     def set_dbms(self, dbms: DBMS):
         self.dbms = dbms
-        self.dbms.setup(drop=self.DEBUG)
+        # 스키마 버전이 최신이면 create_all()을 건너뜀
+        self.__schema_created = self.dbms.setup(drop=self.DEBUG)
         
     def set_candle_service(self, candle_service: CandleService):
         self.candle_service = candle_service
@@ -187,4 +476,28 @@ class SingletonPack:
         self.action_repo = action_repo
         
     def set_coin_repo(self, coin_repo: CoinRepo):
-        self.coin_repo = coin_repo
\ No newline at end of file
+        self.coin_repo = coin_repo
+        
+    def set_candle_repo(self, candle_repo: CandleRepo):
+        self.candle_repo = candle_repo
+        
+    def set_rate_limiter(self, rate_limiter: RateLimiter):
+        self.rate_limiter = rate_limiter
+
+    def set_upbit_stream(self, upbit_stream: UpbitStream):
+        self.upbit_stream = upbit_stream
+
+    def set_decision_log_writer(self, decision_log_writer: DecisionLogWriter):
+        self.decision_log_writer = decision_log_writer
+
+    def set_decision_cache(self, decision_cache: DecisionCache):
+        self.decision_cache = decision_cache
+
+    def set_metrics(self, metrics: Metrics):
+        self.metrics = metrics
+
+    def set_decision_executor(self, decision_executor: DecisionExecutor):
+        self.decision_executor = decision_executor
+
+    def set_llm_service(self, llm_service: LLMService):
+        self.llm_service = llm_service